@@ -6,6 +6,7 @@ from sklearn.preprocessing import StandardScaler
 import logging
 from typing import List, Dict, Tuple, Optional
 import json
+from instana_synthetic import tsdb
 
 log = logging.getLogger("anomaly_detector")
 
@@ -227,15 +228,49 @@ def detect_anomalies_in_timeseries(timeseries_data: List[Dict], method="isolatio
 
     return enhanced_data
 
-def load_timeseries_with_anomalies(filepath: str, method="isolation_forest") -> List[Dict]:
-    """Load timeseries data and detect anomalies."""
-    try:
-        data = []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                data.append(json.loads(line.strip()))
+def detect_anomalies_in_store(store, method="isolation_forest", start=None, end=None) -> List[Dict]:
+    """
+    Detect anomalies per series of a time-series store.
+
+    Args:
+        store: tsdb.TimeSeriesStore of a metric dataset with a 'value' field
+        method: Anomaly detection method
+        start, end: Optional time range (epoch ms) to analyse
+
+    Returns:
+        One record per series, shaped like the JSONL records, with anomaly flags
+    """
+    enhanced_data = []
+    for series, timestamps, fields in store.iter_series(start, end, fields=["value"]):
+        values = fields["value"]
+        record = {
+            store.id_key: series["id"],
+            "metric_name": series["metric_name"],
+            "aggregation": series.get("aggregation"),
+            "timeframe": {"from": int(timestamps[0]), "to": int(timestamps[-1])} if len(timestamps) else {},
+            "points": [{"timestamp": t, "value": v} for t, v in zip(timestamps.tolist(), store.to_list(series, "value", values))],
+            "anomalies": [],
+        }
+        enhanced_data.append(record)
+        if len(values) < 10:
+            continue
+
+        # Fit detector on first 70% of data
+        detector = AnomalyDetector(method=method)
+        detector.fit(values[:int(len(values) * 0.7)])
+        for idx, val, is_anomaly in detector.detect_anomalies(values):
+            if is_anomaly:
+                record["anomalies"].append({
+                    'timestamp': int(timestamps[idx]),
+                    'value': float(val),
+                    'anomaly_score': detector.get_anomaly_score(val)
+                })
+    return enhanced_data
 
-        return detect_anomalies_in_timeseries(data, method)
+def load_timeseries_with_anomalies(filepath: str, method="isolation_forest", start=None, end=None) -> List[Dict]:
+    """Detect anomalies in a metric dataset, read from its time-series store."""
+    try:
+        return detect_anomalies_in_store(tsdb.open_store(filepath), method, start, end)
     except FileNotFoundError:
         log.warning(f"Timeseries file not found: {filepath}")
         return []
@@ -2,7 +2,11 @@ import dash
 from dash import html, dcc, Input, Output, State
 import plotly.graph_objects as go
 import plotly.express as px
+from plotly.io.json import to_json_plotly
 import pandas as pd
+import functools
+import glob
+import hashlib
 import json
 from datetime import datetime
 import os
@@ -11,14 +15,21 @@ import logging
 from anomaly_detector import load_timeseries_with_anomalies
 from predictive_analytics import forecast_timeseries
 from audit_logger import audit_logger
+from instana_synthetic import columnar, compression, downsample, eventstore, frames, lineindex, overview, rollups, snapshots, tenants, tsdb
+from instana_synthetic.cache import dataset_cache, figure_cache, file_signature
+from instana_synthetic.refresher import Refresher
 from sso_connector import sso_connector
-from flask import Flask, request, redirect, session, url_for
+from contextlib import ExitStack
+from flask import Flask, g, request, redirect, session, url_for
 
 logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] %(message)s')
 
 # Session management for v1.7.0
+# The selected user and tenant live in the browser tab's 'session-user'
+# dcc.Store and are passed into every callback, so concurrent users and
+# gunicorn workers never see each other's selection.
 user_sessions = {}
-current_user = {'user_id': 'admin', 'role': 'admin', 'tenant_id': 'default'}
+DEFAULT_USER = 'admin_user'
 
 # RBAC Permissions
 ROLE_PERMISSIONS = {
@@ -36,6 +47,19 @@ SAMPLE_USERS = {
     'operator_user': {'user_id': 'operator_user', 'role': 'operator', 'tenant_id': 'default'}
 }
 
+def session_user(data):
+    """
+    User of a callback's session, from the 'session-user' store data.
+
+    The store only holds the selected user key and tenant; the role always
+    comes from SAMPLE_USERS on the server, so a client cannot raise it.
+    """
+    data = data or {}
+    user = dict(SAMPLE_USERS.get(data.get('user'), SAMPLE_USERS[DEFAULT_USER]))
+    if data.get('tenant_id'):
+        user['tenant_id'] = tenants.check_tenant_id(data['tenant_id'])
+    return user
+
 def check_permission(user, permission):
     """Check if user has the required permission."""
     if not user:
@@ -44,102 +68,272 @@ def check_permission(user, permission):
     return ROLE_PERMISSIONS.get(role, {}).get(permission, False)
 
 def get_available_tenants():
-    """Get list of available tenants."""
-    return ['default', 'tenant-1', 'tenant-2', 'tenant-3']
+    """Get list of available tenants: the configured ones plus any partition found on disk."""
+    configured = ['default', 'tenant-1', 'tenant-2', 'tenant-3']
+    return configured + [t for t in tenants.list_tenants(snapshots.data_dir()) if t not in configured]
 
 # Data loading functions
+# Loaders go through the process-wide dataset cache: each file is parsed once
+# per change (mtime/size) no matter how many callbacks and refresh ticks ask
+# for it, and callbacks get read-only copies of the cached frames.
+#
+# Every loader reads only the current tenant's partition (see
+# instana_synthetic/tenants.py), so there is no tenant filter after parsing.
+# Frames are built column by column with instana_synthetic/frames.py, never
+# row by row.
+#
+# Each request pins one snapshot version of the data directory (see
+# instana_synthetic/snapshots.py): all its loaders read the same generation,
+# and cache entries built from a snapshot are keyed by its version.
+def cached(name, paths, build, cache=dataset_cache):
+    """dataset_cache (or figure_cache) lookup, keyed by the pinned snapshot version when the files are in it."""
+    version, directory = snapshots.pinned_version(), os.path.abspath(snapshots.data_dir())
+    inside = version is not None and all(
+        os.path.commonpath([directory, os.path.abspath(p)]) == directory for p in paths)
+    return cache.get(name, paths, build, version=version if inside else None)
+
 def load_jsonl_data(filepath):
-    """Load JSONL data into a list of dictionaries."""
+    """Load JSONL data into a list of dictionaries (plain, .gz or .zst), cached per file version."""
+    return cached(('records', filepath), [filepath], lambda: read_jsonl_data(filepath))
+
+def read_jsonl_data(filepath):
+    """Parse a JSONL file without going through the cache."""
     data = []
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
+        with compression.open_dataset(filepath) as f:
             for line in f:
                 data.append(json.loads(line.strip()))
     except FileNotFoundError:
         logging.warning(f"Data file not found: {filepath}")
     return data
 
+def load_frame(filepath, nested=(), time_columns=('timestamp',)):
+    """Parse a JSONL dataset into a DataFrame (empty if the file is missing), see frames.read_frame()."""
+    try:
+        return frames.read_frame(filepath, nested, time_columns)
+    except FileNotFoundError:
+        logging.warning(f"Data file not found: {filepath}")
+        return pd.DataFrame()
+
+def metric_files(filepath):
+    """Files a metric store is synced from: the JSONL file and its columnar copy."""
+    return [filepath, columnar.manifest_path(filepath), columnar.data_path(filepath)]
+
 def load_website_metrics(tenant_id=None):
     """Load website metrics data."""
-    data = load_jsonl_data('data/instana/website_metrics.jsonl')
-    if data:
-        df = pd.DataFrame(data)
-        # Filter by tenant if specified
-        if tenant_id:
-            df = df[df.get('tenant_id') == tenant_id]
-        # Expand points into separate rows
-        rows = []
-        for _, row in df.iterrows():
-            website_id = row['website_id']
-            for point in row['points']:
-                rows.append({
-                    'website_id': website_id,
-                    'timestamp': datetime.fromtimestamp(point['timestamp'] / 1000),
-                    'value': point['value']
-                })
-        return pd.DataFrame(rows)
-    return pd.DataFrame()
-
-def load_synthetic_runs(tenant_id=None):
-    """Load synthetic check runs data."""
-    data = load_jsonl_data('data/instana/synthetic_runs.jsonl')
-    if data:
-        df = pd.DataFrame(data)
-        # Filter by tenant if specified
-        if tenant_id:
-            df = df[df.get('tenant_id') == tenant_id]
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df
-    return pd.DataFrame()
-
-def load_logs(tenant_id=None):
-    """Load logs data."""
-    data = load_jsonl_data('data/instana/logs.jsonl')
-    if data:
-        df = pd.DataFrame(data)
-        # Filter by tenant if specified
-        if tenant_id:
-            df = df[df.get('tenant_id') == tenant_id]
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df
-    return pd.DataFrame()
+    filepath = tenants.dataset_path('website_metrics.jsonl', tenant_id)
+    return cached(('website_metrics', filepath), metric_files(filepath),
+                  lambda: _load_website_metrics(filepath))
+
+def _load_website_metrics(filepath):
+    try:
+        store = tsdb.open_store(filepath)
+    except FileNotFoundError:
+        logging.warning(f"Data file not found: {filepath}")
+        return pd.DataFrame()
+    df = store.to_frame(fields=['value'])
+    df['timestamp'] = frames.to_datetimes(df['timestamp'], local=True)
+    return df[['website_id', 'timestamp', 'value']]
+
+def load_metric_rollup(dataset, tier, field='value', tenant_id=None, below=None):
+    """Per-series rollup rows (count/sum/min/max/avg per bucket) of a metric dataset."""
+    filepath = tenants.dataset_path(f'{dataset}.jsonl', tenant_id)
+    return cached(('rollup', filepath, tier, field, below), metric_files(filepath),
+                  lambda: _load_metric_rollup(filepath, tier, field, below))
+
+def _load_metric_rollup(filepath, tier, field, below):
+    try:
+        df = rollups.frame(filepath, tier, field, below=below)
+    except FileNotFoundError:
+        logging.warning(f"Data file not found: {filepath}")
+        return pd.DataFrame()
+    df['timestamp'] = frames.to_datetimes(df['timestamp'])
+    return df
+
+def load_indexed(filepath, start=None, end=None, **ids):
+    """
+    Records of a logs, events, issues or synthetic runs dataset in a time
+    range (epoch ms) and/or with the given IDs as a DataFrame, read through
+    the dataset's line index (see instana_synthetic/lineindex.py).
+    """
+    try:
+        records = lineindex.query(filepath, start, end, **ids)
+    except FileNotFoundError:
+        logging.warning(f"Data file not found: {filepath}")
+        return pd.DataFrame()
+    time_key = lineindex.INDEXED[os.path.basename(compression.strip_extension(filepath))][0]
+    return frames.records_frame(records, time_columns=(time_key,))
+
+def load_synthetic_runs(tenant_id=None, start=None, end=None, **ids):
+    """Load synthetic check runs data, optionally a time range (epoch ms) or one check_id."""
+    filepath = tenants.dataset_path('synthetic_runs.jsonl', tenant_id)
+    return cached(('synthetic_runs', filepath, start, end, tuple(sorted(ids.items()))), [filepath],
+                  lambda: _load_synthetic_runs(filepath, start, end, **ids))
+
+def _load_synthetic_runs(filepath, start=None, end=None, **ids):
+    return load_indexed(filepath, start, end, **ids)
+
+def load_logs(tenant_id=None, start=None, end=None, **ids):
+    """Load logs data, optionally a time range (epoch ms) or one entity_id/correlation_id."""
+    filepath = tenants.dataset_path('logs.jsonl', tenant_id)
+    return cached(('logs', filepath, start, end, tuple(sorted(ids.items()))), [filepath],
+                  lambda: _load_logs(filepath, start, end, **ids))
+
+def _load_logs(filepath, start=None, end=None, **ids):
+    return load_indexed(filepath, start, end, **ids)
 
 def load_mobile_metrics(tenant_id=None):
     """Load mobile metrics data."""
-    data = load_jsonl_data('data/instana/mobile_metrics.jsonl')
-    if data:
-        rows = []
-        for record in data:
-            # Filter by tenant if specified
-            if tenant_id and record.get('tenant_id') != tenant_id:
-                continue
-            mobile_app_id = record['mobile_app_id']
-            for point in record['points']:
-                rows.append({
-                    'mobile_app_id': mobile_app_id,
-                    'timestamp': pd.to_datetime(point['timestamp'], unit='ms'),
-                    'crash_rate': point['crash_rate'],
-                    'response_time_ms': point['response_time_ms']
-                })
-        return pd.DataFrame(rows)
-    return pd.DataFrame()
+    filepath = tenants.dataset_path('mobile_metrics.jsonl', tenant_id)
+    return cached(('mobile_metrics', filepath), metric_files(filepath),
+                  lambda: _load_mobile_metrics(filepath))
+
+def _load_mobile_metrics(filepath):
+    try:
+        store = tsdb.open_store(filepath)
+    except FileNotFoundError:
+        logging.warning(f"Data file not found: {filepath}")
+        return pd.DataFrame()
+    df = store.to_frame(fields=['crash_rate', 'response_time_ms'])
+    df['timestamp'] = frames.to_datetimes(df['timestamp'])
+    return df[['mobile_app_id', 'timestamp', 'crash_rate', 'response_time_ms']]
 
 def load_mobile_analyze(tenant_id=None):
     """Load mobile analyze data."""
-    data = load_jsonl_data('data/instana/mobile_analyze.jsonl')
-    if data:
-        df = pd.DataFrame(data)
-        # Filter by tenant if specified
-        if tenant_id:
-            df = df[df.get('tenant_id') == tenant_id]
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df
-    return pd.DataFrame()
+    filepath = tenants.dataset_path('mobile_analyze.jsonl', tenant_id)
+    return cached(('mobile_analyze', filepath), [filepath],
+                  lambda: _load_mobile_analyze(filepath))
+
+def _load_mobile_analyze(filepath):
+    return load_frame(filepath)
+
+def load_kubernetes_clusters(tenant_id=None):
+    """Load Kubernetes clusters data."""
+    filepath = tenants.dataset_path('kubernetes_clusters.jsonl', tenant_id)
+    return cached(('kubernetes_clusters', filepath), [filepath],
+                  lambda: load_frame(filepath, time_columns=()))
+
+def load_kubernetes_deployments(tenant_id=None):
+    """Load Kubernetes deployments data."""
+    filepath = tenants.dataset_path('kubernetes_deployments.jsonl', tenant_id)
+    return cached(('kubernetes_deployments', filepath), [filepath],
+                  lambda: load_frame(filepath, time_columns=()))
+
+def load_kubernetes_pods(tenant_id=None):
+    """Load Kubernetes pods data, with the pod metrics as metrics.<name> columns."""
+    filepath = tenants.dataset_path('kubernetes_pods.jsonl', tenant_id)
+    return cached(('kubernetes_pods', filepath), [filepath],
+                  lambda: load_frame(filepath, nested=('metrics',), time_columns=()))
+
+# The Synthetic, Logging and Overview tabs query the SQLite event store of the
+# tenant's partition (see instana_synthetic/eventstore.py) for the counts and
+# columns they plot instead of loading whole DataFrames.
+def event_files(filepath):
+    """Files an event store query depends on: the JSONL file and the database with its WAL."""
+    db = eventstore.db_path(os.path.dirname(filepath))
+    return [filepath, db, db + '-wal']
+
+def open_event_store(filepath):
+    """Event store table of a dataset, or None if there is no data."""
+    try:
+        store = eventstore.open_store(filepath)
+    except FileNotFoundError:
+        logging.warning(f"Data file not found: {filepath}")
+        return None
+    return store if store.count() else None
+
+def load_synthetic_summary(tenant_id=None):
+    """Synthetic run counts per day and status, failures per day and check, and successful run times."""
+    filepath = tenants.dataset_path('synthetic_runs.jsonl', tenant_id)
+    return cached(('synthetic_summary', filepath), event_files(filepath),
+                  lambda: _load_synthetic_summary(filepath))
+
+def _load_synthetic_summary(filepath):
+    store = open_event_store(filepath)
+    if store is None:
+        return {}
+    success = pd.DataFrame(store.rows(['timestamp', 'duration_ms', 'check_id'], status='success'))
+    success['timestamp'] = frames.to_datetimes(success['timestamp'])
+    return {
+        'by_day': pd.DataFrame(store.count_by(['day', 'status'])),
+        'failures': pd.DataFrame(store.count_by(['day', 'check_id'], status='failure')),
+        'success': success,
+    }
+
+def load_log_summary(tenant_id=None, severity='all'):
+    """Log counts per severity, top correlation IDs, counts per hour and severity, and the plotted rows."""
+    filepath = tenants.dataset_path('logs.jsonl', tenant_id)
+    return cached(('log_summary', filepath, severity), event_files(filepath),
+                  lambda: _load_log_summary(filepath, severity))
+
+def _load_log_summary(filepath, severity):
+    store = open_event_store(filepath)
+    if store is None:
+        return {}
+    filters = {} if severity == 'all' else {'severity': severity}
+    points = pd.DataFrame(store.rows(['timestamp', 'correlation_id', 'severity'], **filters))
+    points['timestamp'] = frames.to_datetimes(points['timestamp'])
+    return {
+        'by_severity': pd.DataFrame(store.count_by(['severity'], **filters)),
+        'top_correlations': pd.DataFrame(store.count_by(['correlation_id'], limit=10, **filters)),
+        'by_hour': pd.DataFrame(store.count_by(['hour', 'severity'], **filters)),
+        'points': points,
+    }
+
+def load_overview_summary(tenant_id=None):
+    """KPIs and chart series of the Overview tab, from one pass per dataset (see instana_synthetic/overview.py)."""
+    directory = tenants.tenant_dir(snapshots.data_dir(), tenant_id)
+    files = [f for dataset in overview.METRICS for f in metric_files(os.path.join(directory, f'{dataset}.jsonl'))]
+    files += [f for dataset in overview.EVENTS for f in event_files(os.path.join(directory, f'{dataset}.jsonl'))]
+    return cached(('overview_summary', directory), files, lambda: overview.summarize(directory))
+
+def load_anomalous_timeseries(tenant_id=None):
+    """Metric series with detected anomalies, from the metrics_timeseries store."""
+    filepath = tenants.dataset_path('metrics_timeseries.jsonl', tenant_id)
+    return cached(('anomalous_timeseries', filepath), metric_files(filepath),
+                  lambda: load_timeseries_with_anomalies(filepath))
+
+def load_forecast_data(tenant_id=None):
+    """Forecasts per series, from the metrics_timeseries store."""
+    filepath = tenants.dataset_path('metrics_timeseries.jsonl', tenant_id)
+    return cached(('forecasts', filepath), metric_files(filepath), lambda: forecast_timeseries(filepath))
+
+# Seconds between the browsers' data version checks and the refresher's polls
+REFRESH_SECONDS = int(os.environ.get('INSTANA_REFRESH_SECONDS', '15'))
+
+# Line charts are downsampled to the browser width, reported in steps of
+# VIEWPORT_STEP_PX so that similar screens share cached figures; they sit
+# LINE_CHARTS_PER_ROW to a row
+DEFAULT_VIEWPORT_PX = 1920
+VIEWPORT_STEP_PX = 320
+LINE_CHARTS_PER_ROW = 2
+
+# Line charts that re-query the zoomed range at full resolution
+ZOOMABLE_CHARTS = ['website-response-time-chart', 'mobile-crash-rate-chart',
+                   'mobile-response-time-chart', 'synthetic-response-time-chart']
 
 # Initialize Dash app
 app = dash.Dash(__name__, title="Instana Monitoring Dashboard v1.7.0")
 server = app.server
 
+@server.before_request
+def pin_snapshot():
+    """Read one snapshot version for the whole request."""
+    refresher.start()
+    g.snapshot = ExitStack()
+    g.snapshot.enter_context(snapshots.pin())
+
+@server.teardown_request
+def unpin_snapshot(exc):
+    snapshot = g.pop('snapshot', None)
+    if snapshot is not None:
+        snapshot.close()
+
+@server.route('/cache-stats')
+def cache_stats():
+    """Hit/miss counters and size of the dataset cache (and of the figure cache under "figures"), as JSON."""
+    return dict(dataset_cache.stats(), figures=figure_cache.stats())
+
 # --- Add Authentication from Environment Variables ---
 # In production, set these on your hosting platform (e.g., Heroku config vars)
 # Example: heroku config:set DASH_USERNAME=myuser DASH_PASSWORD=mypassword
@@ -176,12 +370,21 @@ app.layout = html.Div([
         ], style={'display': 'flex', 'alignItems': 'center', 'marginBottom': '20px'}),
     ]),
 
-    # Interval component for automatic refresh
+    # Selected user and tenant of this browser tab
+    dcc.Store(id='session-user', storage_type='session'),
+
+    # Interval component for automatic refresh: it only polls the published
+    # data version; the charts update when 'data-version' changes
     dcc.Interval(
         id='interval-component',
-        interval=60*1000,  # in milliseconds (60 seconds)
+        interval=REFRESH_SECONDS*1000,  # in milliseconds
         n_intervals=0
     ),
+    dcc.Store(id='data-version'),
+
+    # Browser width and the zoomed x range of each zoomable chart
+    dcc.Store(id='viewport-width'),
+    *[dcc.Store(id=f'{chart}-zoom') for chart in ZOOMABLE_CHARTS],
 
     # Navigation tabs
     dcc.Tabs(id='tabs', value='overview', children=[
@@ -199,25 +402,23 @@ app.layout = html.Div([
     html.Div(id='tab-content')
 ])
 
-# Callback to render tab content
-@app.callback(Output('tab-content', 'children'),
-              Input('tabs', 'value'))
-def render_content(tab):
+# Tab content; registered as a callback through render_content_with_audit()
+def render_content(tab, user):
     # Check permissions for tab access
-    if not check_permission(current_user, 'read'):
+    if not check_permission(user, 'read'):
         return html.Div([
             html.H2("Access Denied"),
             html.P("You do not have permission to view this dashboard.")
         ])
 
     # Enforce RBAC for specific tabs
-    if tab == 'audit' and not check_permission(current_user, 'admin'):
+    if tab == 'audit' and not check_permission(user, 'admin'):
         return html.Div([
             html.H2("Access Denied"),
             html.P("Only administrators can view audit logs.")
         ])
 
-    if tab == 'cloud' and not check_permission(current_user, 'write'):
+    if tab == 'cloud' and not check_permission(user, 'write'):
         return html.Div([
             html.H2("Access Denied"),
             html.P("You need write permissions to access cloud native features.")
@@ -309,11 +510,12 @@ def render_content(tab):
                 dcc.Graph(id='log-severity-distribution'),
                 dcc.Graph(id='log-correlation-analysis'),
             ], style={'display': 'flex', 'flexDirection': 'row'}),
+            html.Div(id='log-correlation-lines'),
             dcc.Graph(id='log-timeline'),
             dcc.Graph(id='log-correlation-scatter')
         ])
     elif tab == 'audit':
-        if not check_permission(current_user, 'admin'):
+        if not check_permission(user, 'admin'):
             return html.Div([
                 html.H2("Access Denied"),
                 html.P("Only administrators can view audit logs.")
@@ -353,40 +555,125 @@ def render_content(tab):
                 dcc.Graph(id='prometheus-export-status'),
             ], style={'display': 'flex', 'flexDirection': 'row'}),
             html.Button('Export to Prometheus', id='export-prometheus-btn', n_clicks=0,
-                       disabled=not check_permission(current_user, 'write')),
+                       disabled=not check_permission(user, 'write')),
             html.Div(id='export-status')
         ])
 
 # This callback was moved to the end
 
+# Tab callbacks serve their outputs from figure_cache: the figures and KPI
+# strings of a (callback, tenant, filter values) combination are rendered once per
+# data version and serialized, and every refresh tick and every user on the
+# same tab gets the stored payload until the tab's datasets change.
+def cached_figures(tab_value, files):
+    """
+    Decorator for a tab callback taking (tab, *filters, data version, session).
+
+    Args:
+        tab_value: Tab the callback renders; other tabs call it directly
+        files: Callable(tenant_id) -> dataset files the outputs are built from
+    """
+    def decorator(callback):
+        @functools.wraps(callback)
+        def wrapper(tab, *args):
+            if tab != tab_value:
+                return callback(tab, *args)
+            filters = args[:-2]  # the data version and session are not part of the key, the session's tenant is
+            tenant_id = session_user(args[-1])['tenant_id']
+            payload = cached((callback.__name__, tenant_id, json.dumps(filters)), files(tenant_id),
+                             lambda: to_json_plotly(list(callback(tab, *args))), cache=figure_cache)
+            return json.loads(payload)
+        return wrapper
+    return decorator
+
+def dataset_files(*datasets, metrics=(), events=()):
+    """files() callable for cached_figures: plain datasets, metric stores and event-store datasets."""
+    def files(tenant_id):
+        paths = [tenants.dataset_path(f'{d}.jsonl', tenant_id) for d in datasets]
+        for d in metrics:
+            paths += metric_files(tenants.dataset_path(f'{d}.jsonl', tenant_id))
+        for d in events:
+            paths += event_files(tenants.dataset_path(f'{d}.jsonl', tenant_id))
+        return paths
+    return files
+
+OVERVIEW_FILES = dataset_files(metrics=('website_metrics', 'mobile_metrics'), events=('synthetic_runs', 'logs'))
+
+# Line chart downsampling
+# Raw metric frames hold a point per minute and series; the line charts get
+# at most a couple of points per pixel of their width per series (LTTB, see
+# instana_synthetic/downsample.py). Zooming a chart stores its new x range,
+# and the chart is rebuilt from the raw points of that range alone, so detail
+# grows as the range shrinks. Double-clicking resets the range.
+app.clientside_callback(
+    f"function(id) {{ return Math.ceil(window.innerWidth / {VIEWPORT_STEP_PX}) * {VIEWPORT_STEP_PX}; }}",
+    Output('viewport-width', 'data'),
+    Input('viewport-width', 'id')
+)
+
+def zoom_range(relayout):
+    """x range of a chart's relayoutData: [start, end] after a zoom, None after a reset."""
+    if not relayout:
+        return dash.no_update
+    if relayout.get('xaxis.autorange'):
+        return None
+    if 'xaxis.range[0]' in relayout and 'xaxis.range[1]' in relayout:
+        return [relayout['xaxis.range[0]'], relayout['xaxis.range[1]']]
+    if 'xaxis.range' in relayout:
+        return list(relayout['xaxis.range'])
+    return dash.no_update
+
+for chart in ZOOMABLE_CHARTS:
+    app.callback(Output(f'{chart}-zoom', 'data'), Input(chart, 'relayoutData'))(zoom_range)
+
+def line_points(df, y, by, width, zoom, x='timestamp'):
+    """Rows of a line chart: df within the zoomed x range, downsampled per series to the chart width."""
+    if zoom:
+        start, end = pd.Timestamp(zoom[0]), pd.Timestamp(zoom[1])
+        df = df[(df[x] >= start) & (df[x] <= end)]
+    chart_px = (width or DEFAULT_VIEWPORT_PX) // LINE_CHARTS_PER_ROW
+    return downsample.downsample_frame(df, x, y, by, downsample.series_budget(chart_px, df[by].nunique()))
+
+def line_chart(df, y, by, width, zoom, **kwargs):
+    """px.line of line_points(), keeping the zoomed range on screen."""
+    fig = px.line(line_points(df, y, by, width, zoom), x='timestamp', y=y, color=by, **kwargs)
+    if zoom:
+        fig.update_xaxes(range=zoom)
+    return fig
+
 # Website monitoring callbacks
 @app.callback(
     [Output('website-uptime-chart', 'figure'),
      Output('website-response-time-chart', 'figure'),
      Output('website-error-distribution', 'figure')],
     [Input('tabs', 'value'),
-     Input('interval-component', 'n_intervals')]
+     Input('viewport-width', 'data'),
+     Input('website-response-time-chart-zoom', 'data'),
+     Input('data-version', 'data'),
+     Input('session-user', 'data')]
 )
-def update_website_charts(tab, n):
+@cached_figures('website', dataset_files(metrics=('website_metrics',)))
+def update_website_charts(tab, width, zoom, version, session):
     if tab != 'website':
         return {}, {}, {}
+    tenant_id = session_user(session)['tenant_id']
 
-    df = load_website_metrics(current_user.get('tenant_id'))
+    df = load_website_metrics(tenant_id)
     if df.empty:
         empty_fig = go.Figure()
         empty_fig.add_annotation(text="No website metrics data available", showarrow=False)
         return empty_fig, empty_fig, empty_fig
 
-    # Uptime chart (simplified - assuming response time < 5000ms means up)
-    df['status'] = df['value'].apply(lambda x: 'Up' if x < 5000 else 'Down')
-    uptime_df = df.groupby([df['timestamp'].dt.date, 'website_id'])['status'].apply(lambda x: (x == 'Up').mean() * 100).reset_index()
+    # Uptime chart (simplified - assuming response time < 5000ms means up), from the daily rollups
+    uptime_df = load_metric_rollup('website_metrics', '1d', 'value', tenant_id, below=5000)
+    uptime_df['status'] = uptime_df['below'] * 100
 
     uptime_fig = px.line(uptime_df, x='timestamp', y='status', color='website_id',
                         title='Website Uptime Percentage', labels={'status': 'Uptime %'})
 
     # Response time chart
-    response_fig = px.line(df, x='timestamp', y='value', color='website_id',
-                          title='Response Time Trends (ms)', labels={'value': 'Response Time (ms)'})
+    response_fig = line_chart(df, 'value', 'website_id', width, zoom,
+                              title='Response Time Trends (ms)', labels={'value': 'Response Time (ms)'})
 
     # Error distribution (response time > 3000ms considered error)
     df['error'] = df['value'] > 3000
@@ -404,41 +691,47 @@ def update_website_charts(tab, n):
      Output('synthetic-error-rates', 'figure'),
      Output('synthetic-error-threshold', 'figure')],
     [Input('tabs', 'value'),
-     Input('interval-component', 'n_intervals')]
+     Input('viewport-width', 'data'),
+     Input('synthetic-response-time-chart-zoom', 'data'),
+     Input('data-version', 'data'),
+     Input('session-user', 'data')]
 )
-def update_synthetic_charts(tab, n):
+@cached_figures('synthetic', dataset_files(events=('synthetic_runs',)))
+def update_synthetic_charts(tab, width, zoom, version, session):
     if tab != 'synthetic':
         return {}, {}, {}, {}, {}
+    tenant_id = session_user(session)['tenant_id']
 
-    df = load_synthetic_runs(current_user.get('tenant_id'))
-    if df.empty:
+    summary = load_synthetic_summary(tenant_id)
+    if not summary:
         empty_fig = go.Figure()
         empty_fig.add_annotation(text="No synthetic runs data available", showarrow=False)
         return empty_fig, empty_fig, empty_fig, empty_fig, empty_fig
 
     # Pass/Fail chart
-    pass_fail = df.groupby(df['timestamp'].dt.date)['status'].value_counts().unstack().fillna(0)
+    pass_fail = summary['by_day'].pivot_table(index='day', columns='status', values='count', fill_value=0)
+    pass_fail.index.name = 'timestamp'
     pass_fail_fig = px.bar(pass_fail, title='Synthetic Check Pass/Fail Counts',
                           labels={'value': 'Count', 'timestamp': 'Date'})
 
     # Response time chart
-    success_df = df[df['status'] == 'success']
-    response_fig = px.line(success_df, x='timestamp', y='duration_ms', color='check_id',
-                          title='Synthetic Check Response Times')
+    response_fig = line_chart(summary['success'], 'duration_ms', 'check_id', width, zoom,
+                              title='Synthetic Check Response Times')
 
     # Failure trends (rolling failure count)
-    failure_df = df[df['status'] == 'failure']
-    failure_trends = failure_df.groupby([failure_df['timestamp'].dt.date, 'check_id']).size().reset_index(name='failures')
+    failure_trends = summary['failures'].rename(columns={'day': 'timestamp', 'count': 'failures'}).sort_values('timestamp')
     failure_fig = px.line(failure_trends, x='timestamp', y='failures', color='check_id',
                          title='Synthetic Check Failure Windows')
 
     # Error rates (failure rate over time)
-    error_rates = df.groupby(df['timestamp'].dt.date)['status'].apply(lambda x: (x == 'failure').mean()).reset_index(name='error_rate')
+    runs_per_day = pass_fail.sum(axis=1)
+    failures_per_day = pass_fail['failure'] if 'failure' in pass_fail else runs_per_day * 0
+    error_rates = (failures_per_day / runs_per_day).reset_index(name='error_rate')
     error_fig = px.line(error_rates, x='timestamp', y='error_rate',
                        title='Synthetic Check Error Rates Over Time', labels={'error_rate': 'Error Rate'})
 
     # Error rate threshold gauge
-    current_error_rate = df['status'].apply(lambda x: 1 if x == 'failure' else 0).mean() * 100
+    current_error_rate = failures_per_day.sum() / runs_per_day.sum() * 100
     threshold_fig = go.Figure(go.Indicator(
         mode="gauge+number",
         value=current_error_rate,
@@ -456,70 +749,106 @@ def update_synthetic_charts(tab, n):
      Output('log-correlation-scatter', 'figure')],
     [Input('tabs', 'value'),
      Input('severity-filter', 'value'),
-     Input('interval-component', 'n_intervals')]
+     Input('data-version', 'data'),
+     Input('session-user', 'data')]
 )
-def update_log_charts(tab, severity, n):
+@cached_figures('logs', dataset_files(events=('logs',)))
+def update_log_charts(tab, severity, version, session):
     if tab != 'logs':
         return {}, {}, {}, {}
+    tenant_id = session_user(session)['tenant_id']
 
-    df = load_logs(current_user.get('tenant_id'))
-    if df.empty:
+    summary = load_log_summary(tenant_id, severity or 'all')
+    if not summary:
         empty_fig = go.Figure()
         empty_fig.add_annotation(text="No logs data available", showarrow=False)
         return empty_fig, empty_fig, empty_fig, empty_fig
 
-    if severity != 'all':
-        df = df[df['severity'] == severity]
-
     # Severity distribution
-    severity_counts = df['severity'].value_counts()
-    severity_fig = px.pie(values=severity_counts.values, names=severity_counts.index,
+    severity_counts = summary['by_severity']
+    severity_fig = px.pie(values=severity_counts['count'], names=severity_counts['severity'],
                          title='Log Severity Distribution')
 
     # Correlation analysis (correlation IDs)
-    corr_counts = df['correlation_id'].value_counts().head(10)
-    corr_fig = px.bar(x=corr_counts.index, y=corr_counts.values,
+    corr_counts = summary['top_correlations']
+    corr_fig = px.bar(x=corr_counts['correlation_id'], y=corr_counts['count'],
                      title='Top Correlation IDs', labels={'x': 'Correlation ID', 'y': 'Count'})
 
     # Log timeline
-    timeline_df = df.groupby([df['timestamp'].dt.hour, 'severity']).size().reset_index(name='count')
+    timeline_df = summary['by_hour'].rename(columns={'hour': 'timestamp'}).sort_values(['severity', 'timestamp'])
     timeline_fig = px.line(timeline_df, x='timestamp', y='count', color='severity',
                           title='Log Events by Hour and Severity')
 
     # Correlation scatter plot (linking synthetic runs to logs)
     # For simplicity, we'll plot correlation_id vs timestamp
-    scatter_fig = px.scatter(df, x='timestamp', y='correlation_id', color='severity',
+    scatter_fig = px.scatter(summary['points'], x='timestamp', y='correlation_id', color='severity',
                             title='Correlation IDs Over Time', labels={'correlation_id': 'Correlation ID'})
     return severity_fig, corr_fig, timeline_fig, scatter_fig
 
+# Clicking a bar of the top correlation IDs lists that correlation's log
+# lines, looked up through the line index instead of a scan of logs.jsonl
+@app.callback(
+    Output('log-correlation-lines', 'children'),
+    Input('log-correlation-analysis', 'clickData'),
+    State('session-user', 'data')
+)
+def show_correlation_logs(click, session):
+    if not click:
+        return ""
+    correlation_id = click['points'][0]['x']
+    logs = load_logs(session_user(session)['tenant_id'], correlation_id=correlation_id)
+    if logs.empty:
+        return html.P(f"No log lines for {correlation_id}.")
+    logs = logs.sort_values('timestamp')
+    return html.Div([
+        html.H4(f"Log lines for {correlation_id}"),
+        html.Table([
+            html.Thead(html.Tr([html.Th("Timestamp"), html.Th("Severity"), html.Th("Entity"), html.Th("Message")])),
+            html.Tbody([
+                html.Tr([
+                    html.Td(row.timestamp.strftime('%Y-%m-%d %H:%M:%S')),
+                    html.Td(row.severity),
+                    html.Td(row.entity_id),
+                    html.Td(row.message)
+                ]) for row in logs.itertuples()
+            ])
+        ])
+    ])
+
 # Mobile monitoring callbacks
 @app.callback(
     [Output('mobile-crash-rate-chart', 'figure'),
      Output('mobile-response-time-chart', 'figure'),
      Output('mobile-battery-memory-chart', 'figure')],
     [Input('tabs', 'value'),
-     Input('interval-component', 'n_intervals')]
+     Input('viewport-width', 'data'),
+     Input('mobile-crash-rate-chart-zoom', 'data'),
+     Input('mobile-response-time-chart-zoom', 'data'),
+     Input('data-version', 'data'),
+     Input('session-user', 'data')]
 )
-def update_mobile_charts(tab, n):
+@cached_figures('mobile', dataset_files('mobile_analyze', metrics=('mobile_metrics',)))
+def update_mobile_charts(tab, width, crash_zoom, response_zoom, version, session):
     if tab != 'mobile':
         return {}, {}, {}
+    tenant_id = session_user(session)['tenant_id']
 
-    df = load_mobile_metrics(current_user.get('tenant_id'))
+    df = load_mobile_metrics(tenant_id)
     if df.empty:
         empty_fig = go.Figure()
         empty_fig.add_annotation(text="No mobile metrics data available", showarrow=False)
         return empty_fig, empty_fig, empty_fig
 
     # Crash rate chart
-    crash_fig = px.line(df, x='timestamp', y='crash_rate', color='mobile_app_id',
-                       title='Mobile App Crash Rate Trends', labels={'crash_rate': 'Crash Rate'})
+    crash_fig = line_chart(df, 'crash_rate', 'mobile_app_id', width, crash_zoom,
+                           title='Mobile App Crash Rate Trends', labels={'crash_rate': 'Crash Rate'})
 
     # Response time chart
-    response_fig = px.line(df, x='timestamp', y='response_time_ms', color='mobile_app_id',
-                          title='Mobile App Response Time Trends (ms)', labels={'response_time_ms': 'Response Time (ms)'})
+    response_fig = line_chart(df, 'response_time_ms', 'mobile_app_id', width, response_zoom,
+                              title='Mobile App Response Time Trends (ms)', labels={'response_time_ms': 'Response Time (ms)'})
 
     # Battery and memory usage chart (stacked bar for consumption trends)
-    analyze_df = load_mobile_analyze(current_user.get('tenant_id'))
+    analyze_df = load_mobile_analyze(tenant_id)
     if not analyze_df.empty:
         battery_memory_fig = go.Figure()
         battery_memory_fig.add_trace(go.Bar(name='Battery Drain %', x=analyze_df['mobile_app_id'], y=analyze_df['battery_drain_percent'], marker_color='orange'))
@@ -543,34 +872,35 @@ def update_mobile_charts(tab, n):
      Output('overview-kpi-crash-rate', 'children'),
      Output('overview-kpi-error-rate', 'children')],
     [Input('tabs', 'value'),
-     Input('interval-component', 'n_intervals')]
+     Input('data-version', 'data'),
+     Input('session-user', 'data')]
 )
-def update_overview_kpis(tab, n):
+@cached_figures('overview', OVERVIEW_FILES)
+def update_overview_kpis(tab, version, session):
     if tab != 'overview':
         return "...", "...", "...", "..."
+    tenant_id = session_user(session)['tenant_id']
 
-    # Load data
-    website_df = load_website_metrics(current_user.get('tenant_id'))
-    mobile_df = load_mobile_metrics(current_user.get('tenant_id'))
-    synthetic_df = load_synthetic_runs(current_user.get('tenant_id'))
+    summary = load_overview_summary(tenant_id)
+    website, mobile = summary['website_metrics'], summary['mobile_metrics']
+    run_counts = summary['synthetic_runs']
 
     # Calculate KPIs
     uptime = "N/A"
-    if not website_df.empty:
-        uptime_val = (website_df['value'] < 5000).mean() * 100
-        uptime = f"{uptime_val:.2f}%"
+    if website:
+        uptime = f"{website['below']['value'] * 100:.2f}%"
 
     avg_response = "N/A"
-    if not website_df.empty:
-        avg_response = f"{website_df['value'].mean():.0f} ms"
+    if website:
+        avg_response = f"{website['mean']['value']:.0f} ms"
 
     crash_rate = "N/A"
-    if not mobile_df.empty:
-        crash_rate = f"{mobile_df['crash_rate'].mean() * 100:.3f}%"
+    if mobile:
+        crash_rate = f"{mobile['mean']['crash_rate'] * 100:.3f}%"
 
     error_rate = "N/A"
-    if not synthetic_df.empty:
-        error_rate = f"{(synthetic_df['status'] == 'failure').mean() * 100:.2f}%"
+    if run_counts:
+        error_rate = f"{run_counts.get('failure', 0) / sum(run_counts.values()) * 100:.2f}%"
 
     return uptime, avg_response, crash_rate, error_rate
 
@@ -581,29 +911,31 @@ def update_overview_kpis(tab, n):
      Output('overview-system-health', 'figure'),
      Output('overview-quick-gauges', 'figure')],
     [Input('tabs', 'value'),
-     Input('interval-component', 'n_intervals')]
+     Input('data-version', 'data'),
+     Input('session-user', 'data')]
 )
-def update_overview_charts(tab, n):
+@cached_figures('overview', OVERVIEW_FILES)
+def update_overview_charts(tab, version, session):
     if tab != 'overview':
         return {}, {}, {}, {}
+    tenant_id = session_user(session)['tenant_id']
 
-    # Load data
-    website_df = load_website_metrics(current_user.get('tenant_id'))
-    mobile_df = load_mobile_metrics(current_user.get('tenant_id'))
-    synthetic_df = load_synthetic_runs(current_user.get('tenant_id'))
-    logs_df = load_logs(current_user.get('tenant_id'))
+    summary = load_overview_summary(tenant_id)
+    website, mobile = summary['website_metrics'], summary['mobile_metrics']
+    run_counts, log_counts = summary['synthetic_runs'], summary['logs']
 
     # Website vs Mobile comparison
     comparison_fig = go.Figure()
 
-    if not website_df.empty:
-        website_avg = website_df.groupby(website_df['timestamp'].dt.date)['value'].mean().reset_index()
-        comparison_fig.add_trace(go.Scatter(x=website_avg['timestamp'], y=website_avg['value'],
+    # Daily averages across all series
+    if website:
+        comparison_fig.add_trace(go.Scatter(x=frames.to_datetimes(website['daily']['timestamp']),
+                                          y=website['daily']['avg'],
                                           mode='lines+markers', name='Website Response Time'))
 
-    if not mobile_df.empty:
-        mobile_avg = mobile_df.groupby(mobile_df['timestamp'].dt.date)['response_time_ms'].mean().reset_index()
-        comparison_fig.add_trace(go.Scatter(x=mobile_avg['timestamp'], y=mobile_avg['response_time_ms'],
+    if mobile:
+        comparison_fig.add_trace(go.Scatter(x=frames.to_datetimes(mobile['daily']['timestamp']),
+                                          y=mobile['daily']['avg'],
                                           mode='lines+markers', name='Mobile Response Time'))
 
     comparison_fig.update_layout(title='Website vs Mobile Response Time Comparison',
@@ -612,9 +944,9 @@ def update_overview_charts(tab, n):
     # Alert summary (simplified - count failures)
     alert_fig = go.Figure()
 
-    if not synthetic_df.empty:
-        failure_count = len(synthetic_df[synthetic_df['status'] == 'failure'])
-        success_count = len(synthetic_df[synthetic_df['status'] == 'success'])
+    if run_counts:
+        failure_count = run_counts.get('failure', 0)
+        success_count = run_counts.get('success', 0)
         alert_fig.add_trace(go.Bar(x=['Success', 'Failure'], y=[success_count, failure_count],
                                  marker_color=['green', 'red']))
 
@@ -624,8 +956,8 @@ def update_overview_charts(tab, n):
     health_fig = go.Figure()
 
     # Website health
-    if not website_df.empty:
-        website_health = (website_df['value'] < 5000).mean() * 100
+    if website:
+        website_health = website['below']['value'] * 100
         health_fig.add_trace(go.Indicator(
             mode="gauge+number",
             value=website_health,
@@ -635,8 +967,8 @@ def update_overview_charts(tab, n):
         ))
 
     # Mobile health (crash rate < 0.05)
-    if not mobile_df.empty:
-        mobile_health = (mobile_df['crash_rate'] < 0.05).mean() * 100
+    if mobile:
+        mobile_health = mobile['below']['crash_rate'] * 100
         health_fig.add_trace(go.Indicator(
             mode="gauge+number",
             value=mobile_health,
@@ -651,8 +983,8 @@ def update_overview_charts(tab, n):
     quick_gauges_fig = go.Figure()
 
     # Synthetic Success Rate
-    if not synthetic_df.empty:
-        synthetic_success_rate = (synthetic_df['status'] == 'success').mean() * 100
+    if run_counts:
+        synthetic_success_rate = run_counts.get('success', 0) / sum(run_counts.values()) * 100
         quick_gauges_fig.add_trace(go.Indicator(
             mode="gauge+number",
             value=synthetic_success_rate,
@@ -662,8 +994,8 @@ def update_overview_charts(tab, n):
         ))
 
     # Log Error Count
-    if not logs_df.empty:
-        log_error_count = len(logs_df[logs_df['severity'] == 'ERROR'])
+    if log_counts:
+        log_error_count = log_counts.get('ERROR', 0)
         quick_gauges_fig.add_trace(go.Indicator(
             mode="number",
             value=log_error_count,
@@ -688,14 +1020,16 @@ def update_overview_charts(tab, n):
      Output('anomaly-summary-stats', 'figure')],
     [Input('tabs', 'value'),
      Input('anomaly-entity-filter', 'value'),
-     Input('interval-component', 'n_intervals')]
+     Input('data-version', 'data'),
+     Input('session-user', 'data')]
 )
-def update_anomaly_charts(tab, selected_entity, n):
+@cached_figures('anomalies', dataset_files(metrics=('metrics_timeseries',)))
+def update_anomaly_charts(tab, selected_entity, version, session):
     if tab != 'anomalies':
         return [], {}, {}, {}, {}
 
-    anomalous_data = load_anomalous_timeseries()
-    if anomalous_data.empty:
+    anomalous_data = load_anomalous_timeseries(session_user(session)['tenant_id'])
+    if not anomalous_data:
         empty_fig = go.Figure()
         empty_fig.add_annotation(text="No anomaly data available", showarrow=False)
         return [], empty_fig, empty_fig, empty_fig, empty_fig
@@ -729,15 +1063,11 @@ def update_anomaly_charts(tab, selected_entity, n):
     timeseries_fig = go.Figure()
 
     # Normal data points
-    timestamps = []
-    values = []
-    for point in record['points']:
-        timestamps.append(datetime.fromtimestamp(point['timestamp'] / 1000))
-        values.append(point['value'])
+    points = frames.points_frame([record], 'entity_id', fields=['value'], local=True)
 
     timeseries_fig.add_trace(go.Scatter(
-        x=timestamps,
-        y=values,
+        x=points['timestamp'],
+        y=points['value'],
         mode='lines+markers',
         name='Metric Values',
         line=dict(color='blue')
@@ -745,7 +1075,7 @@ def update_anomaly_charts(tab, selected_entity, n):
 
     # Anomaly points
     if record.get('anomalies'):
-        anomaly_timestamps = [datetime.fromtimestamp(a['timestamp'] / 1000) for a in record['anomalies']]
+        anomaly_timestamps = frames.to_datetimes([a['timestamp'] for a in record['anomalies']], local=True)
         anomaly_values = [a['value'] for a in record['anomalies']]
         anomaly_scores = [a['anomaly_score'] for a in record['anomalies']]
 
@@ -800,13 +1130,15 @@ def update_anomaly_charts(tab, selected_entity, n):
      Output('forecast-confidence', 'figure')],
     [Input('tabs', 'value'),
      Input('forecast-entity-filter', 'value'),
-     Input('interval-component', 'n_intervals')]
+     Input('data-version', 'data'),
+     Input('session-user', 'data')]
 )
-def update_forecast_charts(tab, selected_entity, n):
+@cached_figures('predictions', dataset_files(metrics=('metrics_timeseries',)))
+def update_forecast_charts(tab, selected_entity, version, session):
     if tab != 'predictions':
         return [], {}, {}, {}, {}
 
-    forecast_data = load_forecast_data()
+    forecast_data = load_forecast_data(session_user(session)['tenant_id'])
 
     if not forecast_data:
         empty_fig = go.Figure()
@@ -831,7 +1163,7 @@ def update_forecast_charts(tab, selected_entity, n):
 
     # Historical data
     if 'historical' in entity_forecast:
-        hist_times = [datetime.fromtimestamp(t / 1000) for t in entity_forecast['historical']['timestamps']]
+        hist_times = frames.to_datetimes(entity_forecast['historical']['timestamps'], local=True)
         forecast_fig.add_trace(go.Scatter(
             x=hist_times,
             y=entity_forecast['historical']['values'],
@@ -842,7 +1174,7 @@ def update_forecast_charts(tab, selected_entity, n):
 
     # Forecast data
     if 'forecast' in entity_forecast:
-        forecast_times = [datetime.fromtimestamp(t / 1000) for t in entity_forecast['forecast']['timestamps']]
+        forecast_times = frames.to_datetimes(entity_forecast['forecast']['timestamps'], local=True)
         forecast_fig.add_trace(go.Scatter(
             x=forecast_times,
             y=entity_forecast['forecast']['values'],
@@ -854,7 +1186,7 @@ def update_forecast_charts(tab, selected_entity, n):
         # Confidence intervals
         if 'lower_bound' in entity_forecast['forecast'] and 'upper_bound' in entity_forecast['forecast']:
             forecast_fig.add_trace(go.Scatter(
-                x=forecast_times + forecast_times[::-1],
+                x=forecast_times.append(forecast_times[::-1]),
                 y=entity_forecast['forecast']['upper_bound'] + entity_forecast['forecast']['lower_bound'][::-1],
                 fill='toself',
                 fillcolor='rgba(255,165,0,0.2)',
@@ -889,15 +1221,18 @@ def update_forecast_charts(tab, selected_entity, n):
      Output('kubernetes-deployment-health', 'figure'),
      Output('prometheus-export-status', 'figure')],
     [Input('tabs', 'value'),
-     Input('interval-component', 'n_intervals')]
+     Input('data-version', 'data'),
+     Input('session-user', 'data')]
 )
-def update_cloud_charts(tab, n):
+@cached_figures('cloud', dataset_files('kubernetes_clusters', 'kubernetes_deployments', 'kubernetes_pods'))
+def update_cloud_charts(tab, version, session):
     if tab != 'cloud':
         return {}, {}, {}, {}
+    tenant_id = session_user(session)['tenant_id']
 
-    clusters_df = load_kubernetes_clusters()
-    deployments_df = load_kubernetes_deployments()
-    pods_df = load_kubernetes_pods()
+    clusters_df = load_kubernetes_clusters(tenant_id)
+    deployments_df = load_kubernetes_deployments(tenant_id)
+    pods_df = load_kubernetes_pods(tenant_id)
 
     # Cluster status chart
     if not clusters_df.empty:
@@ -911,8 +1246,8 @@ def update_cloud_charts(tab, n):
     # Pod metrics chart
     if not pods_df.empty:
         pod_metrics_fig = go.Figure()
-        pod_metrics_fig.add_trace(go.Bar(name='CPU Usage (cores)', x=pods_df['pod_id'], y=pods_df['metrics'].apply(lambda x: x['cpu_usage_cores']), marker_color='blue'))
-        pod_metrics_fig.add_trace(go.Bar(name='Memory Usage (MB)', x=pods_df['pod_id'], y=pods_df['metrics'].apply(lambda x: x['memory_usage_mb']), marker_color='green'))
+        pod_metrics_fig.add_trace(go.Bar(name='CPU Usage (cores)', x=pods_df['pod_id'], y=pods_df['metrics.cpu_usage_cores'], marker_color='blue'))
+        pod_metrics_fig.add_trace(go.Bar(name='Memory Usage (MB)', x=pods_df['pod_id'], y=pods_df['metrics.memory_usage_mb'], marker_color='green'))
         pod_metrics_fig.update_layout(title='Pod Resource Usage', barmode='group')
     else:
         pod_metrics_fig = go.Figure()
@@ -935,16 +1270,20 @@ def update_cloud_charts(tab, n):
 
 @app.callback(
     Output('export-status', 'children'),
-    Input('export-prometheus-btn', 'n_clicks')
+    Input('export-prometheus-btn', 'n_clicks'),
+    State('session-user', 'data')
 )
-def export_to_prometheus(n_clicks):
+def export_to_prometheus(n_clicks, session):
     if n_clicks and n_clicks > 0:
         try:
             from prometheus_exporter import export_metrics_to_prometheus
-            # Export some sample metrics
-            timeseries_data = load_jsonl_data('data/instana/metrics_timeseries.jsonl')
+            tenant_id = session_user(session)['tenant_id']
+            # Export some sample metrics of the session's tenant, into its own export directory
+            timeseries_data = columnar.read_records(tenants.dataset_path('metrics_timeseries.jsonl', tenant_id))
             if timeseries_data:
-                export_metrics_to_prometheus(timeseries_data[:10], "data/exports/metrics.prom")
+                export_dir = tenants.tenant_dir('data/exports', tenant_id)
+                os.makedirs(export_dir, exist_ok=True)
+                export_metrics_to_prometheus(timeseries_data[:10], os.path.join(export_dir, 'metrics.prom'))
                 return "Successfully exported metrics to Prometheus format!"
             else:
                 return "No metrics data available for export."
@@ -952,27 +1291,85 @@ def export_to_prometheus(n_clicks):
             return f"Export failed: {str(e)}"
     return ""
 
+# Data refresh
+# One background thread per process watches the data version and renders the
+# shared tab payloads for every tenant when it moves; browsers only poll the
+# published version (a few bytes) and re-run their chart callbacks, which then
+# hit the figure cache, when it changed. Server work per data change does not
+# grow with the number of open dashboards.
+def data_version():
+    """
+    Version of the dashboard data: the pinned snapshot version, or before the
+    first snapshot a digest of the stat() signatures of every dataset file.
+    """
+    version = snapshots.pinned_version()
+    if version is not None:
+        return f"v{version}"
+    directory = snapshots.data_dir()
+    paths = []
+    for tenant_id in tenants.list_tenants(directory):
+        partition = tenants.tenant_dir(directory, tenant_id)
+        for pattern in ('*.jsonl*', '*.manifest.json'):
+            paths += sorted(glob.glob(os.path.join(partition, pattern)))
+        db = eventstore.db_path(partition)
+        paths += [db, db + '-wal']
+    return hashlib.sha1(repr([file_signature(p) for p in paths]).encode()).hexdigest()[:16]
+
+# Tab callbacks rendered ahead of time, with their initial filter values
+WARM_CALLBACKS = [
+    (update_overview_kpis, 'overview', ()),
+    (update_overview_charts, 'overview', ()),
+    (update_website_charts, 'website', (DEFAULT_VIEWPORT_PX, None)),
+    (update_mobile_charts, 'mobile', (DEFAULT_VIEWPORT_PX, None, None)),
+    (update_synthetic_charts, 'synthetic', (DEFAULT_VIEWPORT_PX, None)),
+    (update_log_charts, 'logs', ('all',)),
+    (update_cloud_charts, 'cloud', ()),
+    (update_anomaly_charts, 'anomalies', (None,)),
+    (update_forecast_charts, 'predictions', (None,)),
+]
+
+def warm_caches(version):
+    """Render the WARM_CALLBACKS payloads of every tenant into the figure cache."""
+    with snapshots.pin():
+        for tenant_id in tenants.list_tenants(snapshots.data_dir()):
+            session = {'user': DEFAULT_USER, 'tenant_id': tenant_id}
+            for callback, tab, filters in WARM_CALLBACKS:
+                try:
+                    callback(tab, *filters, version, session)
+                except Exception as e:
+                    logging.warning(f"Warming {callback.__name__} for {tenant_id} failed: {e}")
+
+refresher = Refresher(data_version, warm_caches, interval=REFRESH_SECONDS)
+
+@app.callback(Output('data-version', 'data'),
+              Input('interval-component', 'n_intervals'),
+              State('data-version', 'data'))
+def check_data_version(n, known):
+    """Hand the browser the published data version, only when it moved."""
+    version = refresher.version or data_version()
+    return dash.no_update if version == known else version
+
 # Callback for user and tenant switching
 @app.callback(
     [Output('tabs', 'children'),
-     Output('current-role-display', 'children')],
+     Output('current-role-display', 'children'),
+     Output('session-user', 'data')],
     [Input('user-selector', 'value'),
      Input('tenant-selector', 'value')]
 )
 def switch_user_and_tenant(selected_user, selected_tenant):
-    global current_user
-    if selected_user in SAMPLE_USERS:
-        current_user = SAMPLE_USERS[selected_user].copy()
-        current_user['tenant_id'] = selected_tenant
+    session = {'user': selected_user if selected_user in SAMPLE_USERS else DEFAULT_USER,
+               'tenant_id': selected_tenant}
+    user = session_user(session)
 
     # Log the user switch
     audit_logger.log_action(
-        user_id=current_user['user_id'],
+        user_id=user['user_id'],
         action='user_switch',
         resource_type='dashboard',
         resource_id='user_tenant_switch',
-        details={'new_user': current_user['user_id'], 'new_tenant': current_user['tenant_id']},
-        tenant_id=current_user['tenant_id']
+        details={'new_user': user['user_id'], 'new_tenant': user['tenant_id']},
+        tenant_id=user['tenant_id']
     )
 
     # Return updated tabs based on permissions
@@ -984,7 +1381,7 @@ def switch_user_and_tenant(selected_user, selected_tenant):
         dcc.Tab(label='Logging Analysis', value='logs'),
     ]
 
-    if check_permission(current_user, 'admin'):
+    if check_permission(user, 'admin'):
         tabs.append(dcc.Tab(label='Audit Logs', value='audit'))
 
     tabs.extend([
@@ -993,9 +1390,9 @@ def switch_user_and_tenant(selected_user, selected_tenant):
         dcc.Tab(label='Cloud Native', value='cloud'),
     ])
 
-    role_display = current_user.get('role', 'viewer').capitalize()
+    role_display = user.get('role', 'viewer').capitalize()
 
-    return tabs, role_display
+    return tabs, role_display, session
 
 # Callback for audit logs
 @app.callback(
@@ -1050,19 +1447,21 @@ def update_audit_logs_table(tab, user_filter, action_filter, n_clicks):
 
 # Add audit logging to tab switches
 @app.callback(Output('tab-content', 'children'),
-              Input('tabs', 'value'))
-def render_content_with_audit(tab):
+              [Input('tabs', 'value'),
+               Input('session-user', 'data')])
+def render_content_with_audit(tab, session):
+    user = session_user(session)
     # Log tab access
     audit_logger.log_action(
-        user_id=current_user['user_id'],
+        user_id=user['user_id'],
         action='view_tab',
         resource_type='dashboard',
         resource_id=tab,
-        tenant_id=current_user['tenant_id']
+        tenant_id=user['tenant_id']
     )
 
     # Call the original render_content function
-    return render_content(tab)
+    return render_content(tab, user)
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=8050)
@@ -0,0 +1,142 @@
+import logging
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from instana_synthetic import compression
+
+log = logging.getLogger("dataset_cache")
+
+# Process-wide cache of parsed datasets.
+#
+# Entries are keyed by a name plus the (path, mtime, size) signature of every
+# file they were built from, so a value is parsed once per change of its
+# files and a rewrite or append invalidates it on the next lookup. The
+# least recently used entries are evicted once the estimated size exceeds
+# max_bytes. Values read from a published snapshot (instana_synthetic/
+# snapshots.py) are keyed by its version instead: snapshots never change, so
+# lookups need no stat() calls. DataFrames are handed out as shallow copies: with pandas
+# copy-on-write (the default from pandas 3), callers can add or overwrite
+# columns without touching the cached frame. Older pandas gets deep copies.
+
+_COPY_ON_WRITE = int(pd.__version__.split(".")[0]) >= 3 or pd.get_option("mode.copy_on_write") is True
+
+DEFAULT_MAX_BYTES = int(os.environ.get("INSTANA_CACHE_MB", "512")) * 1024 * 1024
+FIGURE_MAX_BYTES = int(os.environ.get("INSTANA_FIGURE_CACHE_MB", "64")) * 1024 * 1024
+
+def file_signature(path):
+    """(resolved path, mtime_ns, size) of a dataset file with its segments, or None if it does not exist."""
+    path = compression.resolve(path)
+    try:
+        size, mtime_ns = compression.dataset_stat(path)
+    except FileNotFoundError:
+        return None
+    return path, mtime_ns, size
+
+def estimate_bytes(value):
+    """Rough in-memory size of a cached value; lists are extrapolated from a sample."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, list) and value:
+        sample = value[:100]
+        per_item = sum(sys.getsizeof(v) + sum(map(sys.getsizeof, v.values())) if isinstance(v, dict)
+                       else sys.getsizeof(v) for v in sample) / len(sample)
+        return sys.getsizeof(value) + int(per_item * len(value))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_bytes(v) for v in value.values())
+    return sys.getsizeof(value)
+
+def read_only(value):
+    """Copy of a cached value whose changes do not reach the cached one."""
+    if isinstance(value, pd.DataFrame):
+        return value.copy(deep=not _COPY_ON_WRITE)
+    if isinstance(value, list):
+        return list(value)
+    if isinstance(value, dict):
+        return {k: read_only(v) for k, v in value.items()}
+    return value
+
+class DatasetCache:
+    """LRU cache of values built from dataset files, with hit/miss counters."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # name -> (signature, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, name, paths, build, version=None):
+        """
+        Return the cached value for `name`, rebuilding it when one of its
+        files changed.
+
+        Args:
+            name: Cache key, e.g. "logs" or ("website_metrics", tenant_id)
+            paths: Dataset files the value is built from
+            build: Zero-argument callable producing the value
+            version: Snapshot version the files belong to; when given, it
+                     replaces the file signatures as the change check
+
+        Returns:
+            The value; DataFrames and lists are shallow copies, so the
+            cached value stays unchanged (list items are shared and must
+            not be modified)
+        """
+        if version is not None:
+            signature = ("version", version)
+        else:
+            signature = tuple(file_signature(p) for p in paths)
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(name)
+                self.hits += 1
+                return read_only(entry[1])
+            self.misses += 1
+
+        value = build()
+        size = estimate_bytes(value)
+        with self._lock:
+            old = self._entries.pop(name, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size <= self.max_bytes:
+                self._entries[name] = (signature, value, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+                    self.evictions += 1
+            else:
+                log.warning(f"Not caching {name}: {size} bytes exceeds the cache size")
+        return read_only(value)
+
+    def invalidate(self, name=None):
+        """Drop one entry, or every entry when name is None."""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                self._bytes = 0
+            elif name in self._entries:
+                self._bytes -= self._entries.pop(name)[2]
+
+    def stats(self):
+        """Hit/miss/eviction counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "hit_rate": self.hits / lookups if lookups else 0.0,
+                    "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+# Shared by every caller in the process
+dataset_cache = DatasetCache()
+
+# Rendered dashboard callback outputs (serialized figures and KPI strings),
+# kept apart so they never evict the parsed datasets they are built from
+figure_cache = DatasetCache(max_bytes=FIGURE_MAX_BYTES)
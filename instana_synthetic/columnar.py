@@ -0,0 +1,150 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from instana_synthetic import compression
+
+# Columnar layout for metric datasets, written next to (or instead of) the
+# JSONL file. For data/instana/metrics_timeseries.jsonl:
+#
+#   metrics_timeseries.npz            timestamps + one array per point field,
+#                                     all series concatenated
+#   metrics_timeseries.manifest.json  one entry per series: id, metric_name,
+#                                     aggregation, timeframe and the
+#                                     offset/length of its slice in the arrays
+#
+# Readers pass the JSONL path; the columnar files are used when they are at
+# least as new as the JSONL file (append mode only extends the JSONL file, and
+# refuses a dataset that only exists in this layout).
+
+FORMAT = "instana-columnar/1"
+
+def _stem(path):
+    path = compression.strip_extension(path)
+    return path[:-len(".jsonl")] if path.endswith(".jsonl") else path
+
+def manifest_path(path):
+    return _stem(path) + ".manifest.json"
+
+def data_path(path):
+    return _stem(path) + ".npz"
+
+def write_columnar(path, id_key, chunks, tenant_id=None):
+    """
+    Write metric chunks in the columnar layout.
+
+    Args:
+        path: Dataset path (the JSONL name, e.g. data/instana/metrics_timeseries.jsonl)
+        id_key: Series ID field, e.g. "entity_id"
+        chunks: (chunk_ids, header, timestamps, columns) tuples, as yielded
+                by the gen_*_batch(..., columnar=True) generators
+        tenant_id: Tenant the series are tagged with, unless a chunk header
+                   carries its own tenant_id
+
+    Returns:
+        Number of series written
+    """
+    series = []
+    timestamp_parts = []
+    field_parts = {}
+    offset = 0
+    for chunk_ids, header, timestamps, columns in chunks:
+        length = len(timestamps)
+        tenant = header.get("tenant_id") or tenant_id
+        for series_id in chunk_ids:
+            entry = {"id": series_id, **header, "offset": offset, "length": length}
+            if tenant:
+                entry["tenant_id"] = tenant
+            series.append(entry)
+            offset += length
+        timestamp_parts.append(np.tile(timestamps, len(chunk_ids)))
+        for field, values in columns.items():
+            field_parts.setdefault(field, []).append(np.asarray(values).reshape(-1))
+
+    arrays = {"timestamps": np.concatenate(timestamp_parts) if timestamp_parts else np.empty(0, np.int64)}
+    for field, parts in field_parts.items():
+        arrays[field] = np.concatenate(parts)
+    manifest = {"format": FORMAT, "id_key": id_key, "fields": list(field_parts),
+                "points": offset, "series": series}
+
+    # Data first, manifest last: a reader never sees a manifest without its arrays
+    tmp = data_path(path) + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, data_path(path))
+    tmp = manifest_path(path) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, manifest_path(path))
+    return len(series)
+
+def is_fresh(path):
+    """True if a columnar copy of the dataset exists and is not older than its JSONL file."""
+    manifest = manifest_path(path)
+    if not os.path.exists(manifest) or not os.path.exists(data_path(path)):
+        return False
+    path = compression.resolve(path)
+    return not os.path.exists(path) or os.stat(manifest).st_mtime_ns >= compression.dataset_stat(path)[1]
+
+def load(path):
+    """Return (manifest, {array name: ndarray}) for a columnar dataset."""
+    with open(manifest_path(path)) as f:
+        manifest = json.load(f)
+    with np.load(data_path(path)) as npz:
+        arrays = {name: npz[name] for name in npz.files}
+    return manifest, arrays
+
+def iter_series(path):
+    """Yield (series entry, timestamps, {field: values}) with array slices per series."""
+    manifest, arrays = load(path)
+    for entry in manifest["series"]:
+        window = slice(entry["offset"], entry["offset"] + entry["length"])
+        yield entry, arrays["timestamps"][window], {f: arrays[f][window] for f in manifest["fields"]}
+
+def iter_records(path):
+    """Yield records in the same shape as the JSONL file, built from the arrays."""
+    manifest, arrays = load(path)
+    id_key, fields = manifest["id_key"], manifest["fields"]
+    columns = {f: arrays[f] for f in fields}
+    timestamps = arrays["timestamps"]
+    for entry in manifest["series"]:
+        window = slice(entry["offset"], entry["offset"] + entry["length"])
+        rows = zip(timestamps[window].tolist(), *(columns[f][window].tolist() for f in fields))
+        yield {
+            id_key: entry["id"],
+            "metric_name": entry["metric_name"],
+            "aggregation": entry["aggregation"],
+            "timeframe": entry["timeframe"],
+            "points": [{"timestamp": t, **dict(zip(fields, values))} for t, *values in rows],
+        }
+
+def read_records(path):
+    """Read a metric dataset as a list of records, preferring a fresh columnar copy."""
+    if is_fresh(path):
+        return list(iter_records(path))
+    with compression.open_dataset(path) as f:
+        return [json.loads(line.strip()) for line in f]
+
+def to_frame(path, tenant_id=None):
+    """
+    Long-format DataFrame of a columnar dataset: one row per point with the
+    series ID, metric_name, timestamp (epoch ms) and the point fields.
+    With tenant_id, only series tagged with that tenant are kept.
+    """
+    manifest, arrays = load(path)
+    series = manifest["series"]
+    if tenant_id:
+        series = [s for s in series if s.get("tenant_id") == tenant_id]
+    lengths = np.array([s["length"] for s in series], dtype=np.int64)
+    index = np.concatenate([np.arange(s["offset"], s["offset"] + s["length"]) for s in series]) \
+        if series else np.empty(0, dtype=np.int64)
+    frame = {
+        manifest["id_key"]: np.repeat([s["id"] for s in series], lengths),
+        "metric_name": np.repeat([s["metric_name"] for s in series], lengths),
+        "timestamp": arrays["timestamps"][index],
+    }
+    for field in manifest["fields"]:
+        frame[field] = arrays[field][index]
+    return pd.DataFrame(frame)
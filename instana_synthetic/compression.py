@@ -0,0 +1,242 @@
+import gzip
+import io
+import os
+import re
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # optional, only needed for .zst datasets
+    zstandard = None
+
+# Transparent compression for dataset files, chosen by extension:
+#   x.jsonl       plain text
+#   x.jsonl.gz    gzip
+#   x.jsonl.zst   zstd (requires the optional `zstandard` package)
+#
+# Writers compress every batch of lines as an independent gzip member / zstd
+# frame. Concatenated members are still a single valid file, so appends and
+# shard merges stay cheap, and a reader can start decoding at any frame
+# boundary. Readers keep passing the plain .jsonl path; open_dataset()
+# picks whichever variant exists.
+#
+# A dataset file may be followed by segments, written by appends that must
+# not change the file itself because it is shared with a published snapshot
+# (see links.py):
+#
+#   logs.jsonl  logs.jsonl.seg00001  logs.jsonl.seg00002    (logs.jsonl.seg00001.gz, ...)
+#
+# The file and its segments in order are one stream of lines (or frames):
+# open_text() and open_raw() read across them, and sizes and byte offsets
+# (dataset_stat(), seek()/tell() of open_raw()) are positions in that stream.
+
+EXTENSIONS = {"gzip": ".gz", "zstd": ".zst"}
+COMPRESSIONS = ("none",) + tuple(EXTENSIONS)
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+def compression_of(path):
+    """Return "gzip", "zstd" or None based on the file extension."""
+    for name, ext in EXTENSIONS.items():
+        if path.endswith(ext):
+            return name
+    return None
+
+def strip_extension(path):
+    """Drop a compression extension, e.g. logs.jsonl.gz -> logs.jsonl."""
+    name = compression_of(path)
+    return path[:-len(EXTENSIONS[name])] if name else path
+
+def with_compression(path, compression):
+    """Path of the dataset file for a compression ("none"/None, "gzip", "zstd")."""
+    path = strip_extension(path)
+    if compression in (None, "none"):
+        return path
+    if compression not in EXTENSIONS:
+        raise ValueError(f"Unknown compression '{compression}', expected one of {COMPRESSIONS}")
+    return path + EXTENSIONS[compression]
+
+def resolve(path):
+    """
+    Find the file that holds a dataset: the path itself or a compressed
+    variant of it. When several exist the most recently written one wins.
+    Returns the path unchanged if none exists.
+    """
+    base = strip_extension(path)
+    candidates = [p for p in [base] + [base + ext for ext in EXTENSIONS.values()] if os.path.exists(p)]
+    if not candidates:
+        return path
+    return max(candidates, key=os.path.getmtime)
+
+def segment_path(path, number):
+    """Path of segment `number` of a dataset file; a compression extension stays last."""
+    base = strip_extension(path)
+    return f"{base}.seg{number:05d}{path[len(base):]}"
+
+def segments(path):
+    """(number, path) of the existing segments of a dataset file, in order."""
+    base = strip_extension(path)
+    directory, name = os.path.split(base)
+    pattern = re.compile(re.escape(name) + r"\.seg(\d{5})" + re.escape(path[len(base):]) + "$")
+    try:
+        names = os.listdir(directory or ".")
+    except FileNotFoundError:
+        return []
+    matches = [m for m in map(pattern.match, names) if m]
+    return sorted((int(m.group(1)), os.path.join(directory, m.group(0))) for m in matches)
+
+def parts(path):
+    """The file and the segments that make up a dataset, in order."""
+    return [path] + [p for _, p in segments(path)]
+
+def dataset_stat(path):
+    """(size, mtime_ns) of a dataset file with its segments: total size, newest mtime."""
+    stats = [os.stat(p) for p in parts(path)]
+    return sum(st.st_size for st in stats), max(st.st_mtime_ns for st in stats)
+
+class _Parts(io.RawIOBase):
+    """Binary reader over the parts of a dataset, seekable in their concatenation."""
+
+    def __init__(self, paths):
+        self._paths = paths
+        sizes = [os.path.getsize(p) for p in paths]
+        self._starts = [sum(sizes[:i]) for i in range(len(paths))]
+        self._file = None
+        self._index = 0
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._pos
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence == io.SEEK_END:
+            offset += self._starts[-1] + os.path.getsize(self._paths[-1])
+        index = max(i for i, start in enumerate(self._starts) if start <= offset or i == 0)
+        if self._file is not None and index != self._index:
+            self._file.close()
+            self._file = None
+        self._index, self._pos = index, offset
+        if self._file is not None:
+            self._file.seek(offset - self._starts[index])
+        return offset
+
+    def readinto(self, buffer):
+        while self._index < len(self._paths):
+            if self._file is None:
+                self._file = open(self._paths[self._index], "rb")
+                self._file.seek(self._pos - self._starts[self._index])
+            count = self._file.readinto(buffer)
+            if count:
+                self._pos += count
+                return count
+            if self._index == len(self._paths) - 1:
+                return 0  # the last part may still grow; stay on it
+            self._file.close()
+            self._file = None
+            self._index += 1
+        return 0
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        super().close()
+
+def open_raw(path):
+    """Open a dataset file with its segments for binary reading (the bytes as stored)."""
+    paths = parts(path)
+    if len(paths) == 1:
+        return open(path, "rb")
+    return io.BufferedReader(_Parts(paths), buffer_size=1 << 20)
+
+class _GzipParts(gzip.GzipFile):
+    """GzipFile over a stream it owns, closing it with itself."""
+
+    def close(self):
+        stream = self.fileobj
+        try:
+            super().close()
+        finally:
+            if stream is not None:
+                stream.close()
+
+def _require_zstd():
+    if zstandard is None:
+        raise ImportError("Reading or writing .zst datasets requires the 'zstandard' package")
+
+def compress_frame(data, compression):
+    """Compress one batch of bytes as a self-contained gzip member / zstd frame."""
+    if compression == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+    if compression == "zstd":
+        _require_zstd()
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return data
+
+def _decompressor(compression):
+    if compression == "gzip":
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    _require_zstd()
+    return zstandard.ZstdDecompressor().decompressobj()
+
+def iter_frames(f, compression, start=0, read_size=1 << 20):
+    """
+    Yield (offset, decompressed bytes) for every gzip member / zstd frame of
+    an open binary file, starting at byte `start` (a frame boundary).
+    """
+    f.seek(start)
+    frame_start = pos = start
+    decompressor = _decompressor(compression)
+    parts = []
+    while True:
+        data = f.read(read_size)
+        if not data:
+            break
+        while data:
+            parts.append(decompressor.decompress(data))
+            if not decompressor.eof:
+                pos += len(data)
+                break
+            frame_end = pos + len(data) - len(decompressor.unused_data)
+            data = decompressor.unused_data
+            yield frame_start, b"".join(parts)
+            frame_start = pos = frame_end
+            decompressor = _decompressor(compression)
+            parts = []
+
+def read_frame(f, compression, offset):
+    """Decompress the single gzip member / zstd frame starting at `offset`."""
+    for _, data in iter_frames(f, compression, offset, read_size=1 << 16):
+        return data
+    return b""
+
+def open_text(path):
+    """Open a dataset file (with its segments) for text reading, decompressing based on its extension."""
+    compression = compression_of(path)
+    if compression == "gzip":
+        if len(parts(path)) == 1:
+            return gzip.open(path, "rt", encoding="utf-8")
+        return io.TextIOWrapper(_GzipParts(fileobj=open_raw(path), mode="rb"), encoding="utf-8")
+    if compression == "zstd":
+        _require_zstd()
+        reader = zstandard.ZstdDecompressor().stream_reader(open_raw(path), read_across_frames=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    if len(parts(path)) == 1:
+        return open(path, "r", encoding="utf-8")
+    return io.TextIOWrapper(open_raw(path), encoding="utf-8")
+
+def open_dataset(path):
+    """Open whichever variant of a dataset exists (see resolve()) for reading."""
+    return open_text(resolve(path))
+
+def dataset_exists(path):
+    return os.path.exists(resolve(path))
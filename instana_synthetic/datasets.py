@@ -0,0 +1,348 @@
+import argparse
+import itertools
+import json
+import os
+import random
+
+from instana_synthetic import columnar, compression, entities, eventstore, streams
+from instana_synthetic.traces import write_spans
+from instana_synthetic.generators import (
+    rand_timeframe, set_clock, write_jsonl, metric_records,
+    gen_timeseries_batch, gen_application, gen_endpoint, gen_issue_record,
+    gen_topology, gen_alert_config, gen_metrics_catalog, gen_entity_types,
+    gen_website_config, gen_website_catalog, gen_website_metrics_batch, gen_website_analyze,
+    gen_log_entry, gen_synthetic_check, gen_synthetic_run,
+    gen_mobile_config, gen_mobile_catalog, gen_mobile_metrics_batch, gen_mobile_analyze,
+    gen_infrastructure_entity, gen_infrastructure_metrics_batch, gen_infra_topology,
+    gen_application_metrics_batch, gen_application_traces, gen_app_topology, gen_app_settings,
+    gen_global_alert_config, gen_infra_alert_config,
+    gen_event_settings, gen_host_agent_status, iter_events,
+    gen_user_roles, gen_api_tokens, gen_access_catalogs,
+    gen_kubernetes_cluster, gen_kubernetes_deployment, gen_kubernetes_pod,
+)
+
+# Dataset builders shared by the standalone scripts/generate_*.py CLIs and the
+# in-process orchestrator. Each builder writes its file(s) under out_dir and
+# returns the number of records written.
+#
+# Builders listed in SHARDABLE also take shard/shards arguments: they draw
+# their records from block-seeded streams (see streams.py) and write shard
+# `shard` of `shards` to a part file next to the final output.
+
+DATA_DIR = "data/instana"
+
+APPLICATION_METRICS = ["latency_p95_ms", "throughput_rpm", "apdex_score", "error_rate_percent"]
+INFRASTRUCTURE_METRICS = ["cpu_usage_percent", "memory_usage_percent", "network_rx_mbps", "network_tx_mbps"]
+
+_COUNT_SUFFIXES = {"k": 10**3, "m": 10**6, "g": 10**9}
+
+def parse_count(value):
+    """argparse type for record counts: plain integers or k/M/G suffixes, e.g. 250M."""
+    text = str(value).strip().replace("_", "")
+    multiplier = _COUNT_SUFFIXES.get(text[-1:].lower())
+    if multiplier:
+        text = text[:-1]
+    try:
+        count = int(float(text) * (multiplier or 1)) if multiplier else int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid count: {value!r}")
+    if count < 0:
+        raise argparse.ArgumentTypeError(f"count must be >= 0: {value!r}")
+    return count
+
+def add_compression_argument(parser):
+    """Add --compress to a dataset CLI."""
+    parser.add_argument("--compress", choices=compression.COMPRESSIONS, default=None,
+                        help="Write .jsonl.gz / .jsonl.zst instead of plain JSONL")
+
+def apply_compression_argument(args):
+    if args.compress is not None:
+        set_compression(args.compress)
+
+def add_shard_arguments(parser):
+    """Add --seed/--shard/--shards/--now-ms/--compress/--event-store to a SHARDABLE dataset's CLI."""
+    parser.add_argument("--seed", type=int, default=None, help="Master seed (unseeded if omitted)")
+    parser.add_argument("--shard", type=int, default=0, help="Index of the shard to generate")
+    parser.add_argument("--shards", type=int, default=1, help="Total number of shards")
+    parser.add_argument("--now-ms", type=int, default=None, help="Fixed generation time in epoch ms")
+    add_compression_argument(parser)
+    parser.add_argument("--event-store", action="store_true",
+                        help="Also write the records into the SQLite event store (events.sqlite)")
+
+def apply_shard_arguments(args, dataset):
+    """Seed the streams and clock from add_shard_arguments() options."""
+    streams.set_seed(args.seed)
+    streams.seed_stream(dataset)
+    set_clock(args.now_ms)
+    apply_compression_argument(args)
+    if args.event_store:
+        eventstore.set_enabled(True)
+    return {"shard": args.shard, "shards": args.shards}
+
+# Compression of the written .jsonl files ("none", "gzip" or "zstd"); readers
+# detect it from the file extension (see compression.py)
+_compression = os.environ.get("INSTANA_DATA_COMPRESSION", "none")
+
+def set_compression(name):
+    """Set the compression used for dataset files written by this process."""
+    global _compression
+    compression.with_compression("", name)  # validate
+    _compression = name
+
+def output_path(out_dir, filename):
+    """Path a dataset file is written to, including the compression extension."""
+    return compression.with_compression(os.path.join(out_dir, filename), _compression)
+
+def _shard_path(out_dir, filename, shard, shards):
+    return streams.shard_path(output_path(out_dir, filename), shard, shards)
+
+def _write_records(out_dir, filename, records, shard, shards):
+    """Write one shard of a record stream; unsharded output is stored right away."""
+    path = _shard_path(out_dir, filename, shard, shards)
+    if shards == 1 and eventstore.is_stored(path):
+        return eventstore.write_through(path, records, write_jsonl)
+    return write_jsonl(path, records)
+
+def read_entity_ids(entities_file):
+    """Read entity IDs from an infrastructure_entities.jsonl file, streaming one entity at a time."""
+    return list(entities.iter_entity_ids(entities_file))
+
+def load_entity_ids(out_dir=DATA_DIR):
+    """Load entity IDs from the dataset's infrastructure_entities.jsonl."""
+    return read_entity_ids(output_path(out_dir, "infrastructure_entities.jsonl"))
+
+def _interleave(batches):
+    """Yield one record from each per-metric batch in turn (entity-major order)."""
+    for records in zip(*list(batches)):
+        yield from records
+
+# Output formats of the metric datasets: JSONL, the columnar NPZ layout
+# (see columnar.py), or both from the same generated arrays
+METRIC_FORMATS = ("jsonl", "columnar", "both")
+
+def _write_metrics(out_dir, filename, id_key, batches, fmt="jsonl"):
+    """
+    Write metric series from per-metric chunk generators (gen_*_batch(..., columnar=True)).
+    JSONL records are interleaved entity-major across the batches.
+    """
+    if fmt not in METRIC_FORMATS:
+        raise ValueError(f"Unknown metric format '{fmt}', expected one of {METRIC_FORMATS}")
+    path = output_path(out_dir, filename)
+    if fmt == "columnar":
+        return columnar.write_columnar(path, id_key, itertools.chain.from_iterable(batches))
+
+    collected = []
+
+    def tee(chunks):
+        for chunk in chunks:
+            if fmt == "both":
+                collected.append(chunk)
+            yield chunk
+
+    count = write_jsonl(path, _interleave(metric_records(id_key, tee(chunks)) for chunks in batches))
+    if fmt == "both":
+        columnar.write_columnar(path, id_key, collected)
+    return count
+
+def load_ids(out_dir, filename, key):
+    """Load the `key` field of every record in a JSONL dataset."""
+    with compression.open_dataset(output_path(out_dir, filename)) as f:
+        return [json.loads(line)[key] for line in f]
+
+# Core APM datasets
+def generate_infrastructure_entities(out_dir=DATA_DIR, count=120):
+    # Generate mix of hosts, containers, and processes, one entity per line
+    # (the response envelope goes to the header, see entities.py)
+    inventory = (gen_infrastructure_entity(random.choice(["host", "container", "process"])) for _ in range(count))
+    return entities.write_entities(output_path(out_dir, "infrastructure_entities.jsonl"), inventory,
+                                   rand_timeframe(minutes=15))
+
+def generate_applications(out_dir=DATA_DIR, count=20):
+    return write_jsonl(output_path(out_dir, "applications.jsonl"), (gen_application(i) for i in range(count)))
+
+def generate_endpoints(out_dir=DATA_DIR, count=50):
+    return write_jsonl(output_path(out_dir, "endpoints.jsonl"), (gen_endpoint(i) for i in range(count)))
+
+def generate_issues(out_dir=DATA_DIR, count=30, shard=0, shards=1):
+    entity_ids = load_entity_ids(out_dir)
+    issues = (gen_issue_record(i, entity_ids) for i in streams.records("issues", count, shard, shards))
+    return _write_records(out_dir, "issues.jsonl", issues, shard, shards)
+
+def generate_timeseries(out_dir=DATA_DIR, minutes=60, metric="latency_p95_ms",
+                        entities_file=None, out=None, fmt="jsonl"):
+    entity_ids = read_entity_ids(entities_file) if entities_file else load_entity_ids(out_dir)
+    out_dir, filename = os.path.split(out) if out else (out_dir, "metrics_timeseries.jsonl")
+    return _write_metrics(out_dir, filename, "entity_id",
+                          [gen_timeseries_batch(entity_ids, metric, minutes, columnar=True)], fmt)
+
+def generate_topology(out_dir=DATA_DIR):
+    entity_ids = load_entity_ids(out_dir)
+    # Application topology uses the same entities for simplicity
+    write_jsonl(output_path(out_dir, "infra_topology.jsonl"), [gen_topology(entity_ids, is_infra=True)])
+    write_jsonl(output_path(out_dir, "app_topology.jsonl"), [gen_topology(entity_ids, is_infra=False)])
+    return 2
+
+def generate_alert_configs(out_dir=DATA_DIR):
+    entity_ids = load_entity_ids(out_dir)
+    # 10 app, 10 infra, 5 synthetic
+    config_types = ["app"] * 10 + ["infra"] * 10 + ["synthetic"] * 5
+    alerts = (gen_alert_config(entity_ids, config_type) for config_type in config_types)
+    return write_jsonl(output_path(out_dir, "alert_configs.jsonl"), alerts)
+
+def generate_catalogs(out_dir=DATA_DIR):
+    write_jsonl(output_path(out_dir, "metrics_catalog.jsonl"), [gen_metrics_catalog()])
+    write_jsonl(output_path(out_dir, "entity_types.jsonl"), [gen_entity_types()])
+    return 2
+
+# Website monitoring
+def generate_website_config(out_dir=DATA_DIR, count=10):
+    return write_jsonl(output_path(out_dir, "website_config.jsonl"), (gen_website_config(i) for i in range(count)))
+
+def generate_website_catalog(out_dir=DATA_DIR):
+    return write_jsonl(output_path(out_dir, "website_catalog.jsonl"), [gen_website_catalog()])
+
+def generate_website_metrics(out_dir=DATA_DIR, count=10, minutes=60, fmt="jsonl"):
+    website_ids = [f"web-{i+100000}" for i in range(count)]
+    return _write_metrics(out_dir, "website_metrics.jsonl", "website_id",
+                          [gen_website_metrics_batch(website_ids, minutes, columnar=True)], fmt)
+
+def generate_website_analyze(out_dir=DATA_DIR, count=10):
+    website_ids = [f"web-{i+100000}" for i in range(count)]
+    return write_jsonl(output_path(out_dir, "website_analyze.jsonl"), (gen_website_analyze(wid) for wid in website_ids))
+
+# Logging
+def generate_logs(out_dir=DATA_DIR, count=100, shard=0, shards=1):
+    entity_ids = [f"srv-{15284626 + i}" for i in range(10)]  # sample entity_ids
+    logs = (gen_log_entry(entity_ids) for _ in streams.records("logs", count, shard, shards))
+    return _write_records(out_dir, "logs.jsonl", logs, shard, shards)
+
+# Synthetic checks
+def generate_synthetic_checks(out_dir=DATA_DIR, count=20):
+    endpoint_ids = [f"ep-{i+100000}" for i in range(10)]  # sample endpoint_ids
+    return write_jsonl(output_path(out_dir, "synthetic_checks.jsonl"), (gen_synthetic_check(endpoint_ids) for _ in range(count)))
+
+def generate_synthetic_runs(out_dir=DATA_DIR, count=100, shard=0, shards=1):
+    try:
+        check_ids = load_ids(out_dir, "synthetic_checks.jsonl", "check_id")
+    except FileNotFoundError:
+        streams.seed_stream("synthetic_runs")
+        check_ids = [f"chk-{random.randint(100000,999999)}" for _ in range(20)]  # fallback
+    runs = (gen_synthetic_run(random.choice(check_ids), seq=n)
+            for n in streams.records("synthetic_runs", count, shard, shards))
+    return _write_records(out_dir, "synthetic_runs.jsonl", runs, shard, shards)
+
+# Mobile monitoring
+def generate_mobile_config(out_dir=DATA_DIR, count=10):
+    return write_jsonl(output_path(out_dir, "mobile_config.jsonl"), (gen_mobile_config(i) for i in range(count)))
+
+def generate_mobile_catalog(out_dir=DATA_DIR):
+    return write_jsonl(output_path(out_dir, "mobile_catalog.jsonl"), [gen_mobile_catalog()])
+
+def generate_mobile_metrics(out_dir=DATA_DIR, count=10, minutes=60, fmt="jsonl"):
+    mobile_app_ids = [f"mobile-{i+100000}" for i in range(count)]
+    return _write_metrics(out_dir, "mobile_metrics.jsonl", "mobile_app_id",
+                          [gen_mobile_metrics_batch(mobile_app_ids, minutes, columnar=True)], fmt)
+
+def generate_mobile_analyze(out_dir=DATA_DIR, count=10):
+    mobile_app_ids = [f"mobile-{i+100000}" for i in range(count)]
+    return write_jsonl(output_path(out_dir, "mobile_analyze.jsonl"), (gen_mobile_analyze(mid) for mid in mobile_app_ids))
+
+# Infrastructure monitoring (v1.4.0)
+def generate_infrastructure_metrics(out_dir=DATA_DIR, count=20, minutes=60, fmt="jsonl"):
+    # Processes only report cpu_percent/memory_mb, which are not generated yet
+    entity_ids = [eid for eid in load_entity_ids(out_dir)[:count]
+                  if eid.split('-')[0] in ("host", "container")]
+    return _write_metrics(out_dir, "infrastructure_metrics.jsonl", "entity_id",
+                          [gen_infrastructure_metrics_batch(entity_ids, metric, minutes, columnar=True)
+                           for metric in INFRASTRUCTURE_METRICS], fmt)
+
+def generate_infra_topology(out_dir=DATA_DIR, count=5):
+    entity_ids = load_entity_ids(out_dir)
+    return write_jsonl(output_path(out_dir, "infra_topology.jsonl"), (gen_infra_topology(entity_ids) for _ in range(count)))
+
+# Application monitoring (v1.4.0)
+def generate_application_metrics(out_dir=DATA_DIR, count=20, minutes=60, fmt="jsonl"):
+    app_ids = load_ids(out_dir, "applications.jsonl", "application_id")[:count]
+    return _write_metrics(out_dir, "application_metrics.jsonl", "application_id",
+                          [gen_application_metrics_batch(app_ids, metric, minutes, columnar=True)
+                           for metric in APPLICATION_METRICS], fmt)
+
+def generate_application_traces(out_dir=DATA_DIR, count=10):
+    app_ids = load_ids(out_dir, "applications.jsonl", "application_id")
+    traces = [gen_application_traces(app_id, span_count=5) for app_id in app_ids[:count]]
+    return write_jsonl(output_path(out_dir, "application_traces.jsonl"), traces)
+
+def generate_trace_spans(out_dir=DATA_DIR, traces=1000, fmt="jsonl"):
+    """Span trees over the first application topology; fmt "columnar" writes the span table."""
+    try:
+        with compression.open_dataset(output_path(out_dir, "app_topology.jsonl")) as f:
+            topology = json.loads(f.readline())
+    except FileNotFoundError:
+        topology = gen_app_topology()
+    app_ids = load_ids(out_dir, "applications.jsonl", "application_id")
+    return write_spans(output_path(out_dir, "trace_spans.jsonl"), topology, app_ids, traces, fmt)
+
+def generate_app_topology(out_dir=DATA_DIR, count=5):
+    return write_jsonl(output_path(out_dir, "app_topology.jsonl"), (gen_app_topology() for _ in range(count)))
+
+def generate_app_settings(out_dir=DATA_DIR, count=10):
+    app_ids = load_ids(out_dir, "applications.jsonl", "application_id")
+    return write_jsonl(output_path(out_dir, "app_settings.jsonl"), [gen_app_settings(app_id) for app_id in app_ids[:count]])
+
+# Alert configurations (v1.4.0)
+def generate_global_alert_configs(out_dir=DATA_DIR, count=10):
+    return write_jsonl(output_path(out_dir, "global_alert_configs.jsonl"), (gen_global_alert_config() for _ in range(count)))
+
+def generate_infra_alert_configs(out_dir=DATA_DIR, count=10):
+    return write_jsonl(output_path(out_dir, "infra_alert_configs.jsonl"), (gen_infra_alert_config() for _ in range(count)))
+
+# Event settings & host agent (v1.4.0)
+def generate_event_settings(out_dir=DATA_DIR, count=5):
+    return write_jsonl(output_path(out_dir, "event_settings.jsonl"), (gen_event_settings() for _ in range(count)))
+
+def generate_host_agent_status(out_dir=DATA_DIR, count=20):
+    return write_jsonl(output_path(out_dir, "host_agent_status.jsonl"), (gen_host_agent_status() for _ in range(count)))
+
+def generate_events(out_dir=DATA_DIR, count=50, shard=0, shards=1):
+    # Generate entity IDs for correlation; every shard draws the same set
+    streams.seed_stream("events")
+    entity_ids = [f"entity-{random.randint(100000,999999)}" for _ in range(20)]
+    events = (event for n in streams.records("events", count, shard, shards)
+              for event in iter_events(entity_ids, 1, first=n))
+    return _write_records(out_dir, "events.jsonl", events, shard, shards)
+
+# User management (v1.4.0)
+def generate_user_roles(out_dir=DATA_DIR):
+    return write_jsonl(output_path(out_dir, "user_roles.jsonl"), [gen_user_roles()])
+
+def generate_api_tokens(out_dir=DATA_DIR, count=5):
+    return write_jsonl(output_path(out_dir, "api_tokens.jsonl"), (gen_api_tokens() for _ in range(count)))
+
+def generate_access_catalogs(out_dir=DATA_DIR):
+    return write_jsonl(output_path(out_dir, "access_catalogs.jsonl"), gen_access_catalogs()["access_catalogs"])
+
+# Kubernetes monitoring (v1.6.0)
+def generate_kubernetes_clusters(out_dir=DATA_DIR, count=10):
+    return write_jsonl(output_path(out_dir, "kubernetes_clusters.jsonl"), (gen_kubernetes_cluster(i) for i in range(count)))
+
+def generate_kubernetes_deployments(out_dir=DATA_DIR, per_cluster=5):
+    cluster_ids = load_ids(out_dir, "kubernetes_clusters.jsonl", "cluster_id")
+    deployments = (gen_kubernetes_deployment(i, cid) for cid in cluster_ids for i in range(per_cluster))
+    return write_jsonl(output_path(out_dir, "kubernetes_deployments.jsonl"), deployments)
+
+def generate_kubernetes_pods(out_dir=DATA_DIR, per_deployment=3, shard=0, shards=1):
+    with compression.open_dataset(output_path(out_dir, "kubernetes_deployments.jsonl")) as f:
+        parents = [(d["cluster_id"], d["deployment_id"]) for d in map(json.loads, f)]
+    count = len(parents) * per_deployment
+    pods = (gen_kubernetes_pod(n % per_deployment, *parents[n // per_deployment], seq=n)
+            for n in streams.records("kubernetes_pods", count, shard, shards))
+    return write_jsonl(_shard_path(out_dir, "kubernetes_pods.jsonl", shard, shards), pods)
+
+# Record-stream datasets that can be split into shards, and their output files
+SHARDABLE = {
+    "issues": "issues.jsonl",
+    "logs": "logs.jsonl",
+    "synthetic_runs": "synthetic_runs.jsonl",
+    "events": "events.jsonl",
+    "kubernetes_pods": "kubernetes_pods.jsonl",
+}
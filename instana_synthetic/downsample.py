@@ -0,0 +1,80 @@
+import numpy as np
+
+# Downsampling of line-chart series with Largest-Triangle-Three-Buckets.
+#
+# LTTB keeps the first and last point and splits the rest into equal buckets;
+# from each bucket it keeps the point forming the largest triangle with the
+# point kept from the previous bucket and the average of the next bucket. The
+# result keeps peaks and troughs that plain striding or averaging would flatten,
+# so a series of 10,000 points drawn with ~1,000 looks the same at chart size.
+#
+# Budgets are in points per series and follow the chart's pixel width: a line
+# cannot show more than a couple of distinct points per horizontal pixel.
+
+POINTS_PER_PIXEL = 2
+MIN_SERIES_POINTS = 100  # budget floor per series, however many series share a chart
+
+def series_budget(width_px, series):
+    """Points to keep per series for `series` lines sharing a chart `width_px` pixels wide."""
+    return max(MIN_SERIES_POINTS, int(width_px * POINTS_PER_PIXEL) // max(series, 1))
+
+def lttb(x, y, threshold):
+    """
+    Indices of the points LTTB keeps from one series.
+
+    Args:
+        x: Ascending x values (numbers or datetime64)
+        y: Values, same length
+        threshold: Points to keep
+
+    Returns:
+        Ascending int array of at most `threshold` indices; all indices when
+        the series already fits
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x).astype(np.float64)
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+
+    # threshold - 2 buckets over the points between the first and the last;
+    # the last point is the "next bucket" of the last one
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    starts = np.append(edges[:-1], n - 1)
+    ends = np.append(edges[1:], n)
+    counts = ends - starts
+    mean_x = np.add.reduceat(x, starts) / counts
+    mean_y = np.add.reduceat(y, starts) / counts
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = starts[i], ends[i]
+        area = np.abs((x[a] - mean_x[i + 1]) * (y[lo:hi] - y[a])
+                      - (x[a] - x[lo:hi]) * (mean_y[i + 1] - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def downsample_frame(df, x, y, by, threshold):
+    """
+    Rows of a long-format frame kept by LTTB, per series.
+
+    Args:
+        df: Frame with one row per point
+        x, y: Columns of the point coordinates
+        by: Column identifying the series
+        threshold: Points to keep per series
+
+    Returns:
+        The kept rows, in their original order
+    """
+    if len(df) <= threshold:
+        return df
+    xs, ys = df[x].to_numpy(), df[y].to_numpy()
+    keep = []
+    for rows in df.groupby(by, sort=False).indices.values():
+        rows = rows[np.argsort(xs[rows], kind="stable")]
+        keep.append(rows[lttb(xs[rows], ys[rows], threshold)])
+    return df.iloc[np.sort(np.concatenate(keep))] if keep else df
@@ -0,0 +1,191 @@
+import random
+
+import numpy as np
+
+# Vectorized random-walk engine behind the gen_*_metrics generators.
+#
+# A walk is described by a spec dict:
+#   start:      ("int" | "uniform", low, high)  initial value per series
+#   step:       ("int" | "uniform", low, high)  per-step increment
+#   spike_prob: probability of a spike at each step (spikes persist in the walk)
+#   spike:      (low, high) integer spike size
+#   low/high:   bounds; None means unbounded
+#   clamp:      "walk" clamps after every step, "output" only clamps the
+#               emitted values and lets the walk itself run free
+#   decimals:   round emitted values, None keeps them as generated
+#
+# "int" bounds are inclusive to match random.randint.
+
+# Upper bound on the number of cells materialised per chunk (N series x M steps)
+CHUNK_CELLS = 16_000_000
+
+def make_rng(rng=None):
+    """Return a NumPy Generator, deriving one from the `random` module state if needed."""
+    if rng is None:
+        return np.random.default_rng(random.getrandbits(64))
+    return rng
+
+def _draw(rng, kind, low, high, size):
+    if kind == "int":
+        return rng.integers(low, high + 1, size=size, dtype=np.int64)
+    return rng.uniform(low, high, size=size)
+
+def _is_integer(spec):
+    return spec["start"][0] == "int" and spec["step"][0] == "int"
+
+def _spike_positions(rng, total, prob):
+    """Positions of Bernoulli(prob) spikes among `total` cells, via geometric gaps."""
+    gaps = []
+    covered = 0
+    while covered < total:
+        chunk = rng.geometric(prob, size=int(total * prob * 1.05) + 16)
+        gaps.append(chunk)
+        covered += int(chunk.sum())
+    positions = np.cumsum(np.concatenate(gaps)) - 1
+    return positions[positions < total]
+
+def _walk_chunk(rng, spec, n_series, n_steps, start=None):
+    # Everything is built time-major (n_steps, n_series) so each step is one
+    # contiguous row, and transposed back to (n_series, n_steps) on return.
+    if start is None:
+        start = _draw(rng, *spec["start"], size=n_series)
+    inc = _draw(rng, *spec["step"], size=(n_steps, n_series))
+    if spec.get("spike_prob"):
+        positions = _spike_positions(rng, inc.size, spec["spike_prob"])
+        lo, hi = spec["spike"]
+        inc = inc.astype(np.result_type(inc, np.int64), copy=False)
+        inc.reshape(-1)[positions] += rng.integers(lo, hi + 1, size=len(positions), dtype=np.int64)
+
+    low, high = spec.get("low"), spec.get("high")
+    if spec.get("clamp") == "walk" and high is not None and n_steps:
+        # Two-sided clamping is path dependent: step through time, vectorized across series
+        values = inc.astype(np.result_type(start, inc), copy=False)
+        values[0] += start
+        np.maximum(values[0], low, out=values[0])
+        np.minimum(values[0], high, out=values[0])
+        for t in range(1, n_steps):
+            row = values[t]
+            np.add(values[t - 1], row, out=row)
+            np.maximum(row, low, out=row)
+            np.minimum(row, high, out=row)
+        return values.T
+
+    walk = inc.astype(np.result_type(start, inc), copy=False)
+    np.cumsum(walk, axis=0, out=walk)
+    walk += start
+    if spec.get("clamp") == "walk" and low is not None:
+        # One-sided floor: Lindley recursion, v_t = max(low, v_{t-1} + inc_t),
+        # i.e. the free walk lifted by its running shortfall below `low`
+        walk -= low
+        shortfall = np.minimum.accumulate(walk, axis=0)
+        np.minimum(shortfall, 0, out=shortfall)
+        walk -= shortfall
+        walk += low
+    elif low is not None or high is not None:
+        np.clip(walk, low, high, out=walk)
+    return walk.T
+
+def _finish(values, spec):
+    if spec.get("decimals") is not None:
+        values = np.round(values, spec["decimals"])
+    if _is_integer(spec):
+        values = values.astype(np.int64, copy=False)
+    return values
+
+def iter_walks(spec, n_series, n_steps, rng=None, chunk_cells=CHUNK_CELLS, start=None):
+    """
+    Generate N random walks of M steps, in chunks of whole series.
+
+    Args:
+        spec: Walk spec (see the notes at the top of this module)
+        n_series: Number of series (N)
+        n_steps: Number of steps per series (M)
+        rng: NumPy Generator; derived from the `random` module if omitted
+        chunk_cells: Maximum N x M cells materialised at once
+        start: Optional length-N array of previous values; the walks then
+               continue from them instead of drawing spec["start"]
+
+    Yields:
+        Arrays of shape (chunk_series, n_steps), in series order
+    """
+    rng = make_rng(rng)
+    if start is not None:
+        start = np.asarray(start, dtype=np.int64 if _is_integer(spec) else np.float64)
+    chunk_series = max(1, chunk_cells // max(1, n_steps))
+    for offset in range(0, n_series, chunk_series):
+        rows = min(chunk_series, n_series - offset)
+        chunk_start = None if start is None else start[offset:offset + rows]
+        yield _finish(_walk_chunk(rng, spec, rows, n_steps, chunk_start), spec)
+
+def walk(spec, n_series, n_steps, rng=None):
+    """Generate N random walks of M steps as a single (N, M) array."""
+    if n_series == 0:
+        return np.empty((0, n_steps))
+    return np.concatenate(list(iter_walks(spec, n_series, n_steps, rng)))
+
+def time_axis(minutes, step_ms, to_ms):
+    """Return (from_ms, timestamps) for a window of `minutes` ending at to_ms."""
+    frm = to_ms - minutes * 60_000
+    return frm, np.arange(frm, to_ms, step_ms, dtype=np.int64)
+
+def time_axis_after(last_ms, step_ms, to_ms):
+    """Return (from_ms, timestamps) for the steps following last_ms, up to to_ms."""
+    frm = last_ms + step_ms
+    return frm, np.arange(frm, to_ms, step_ms, dtype=np.int64)
+
+def points(timestamps, columns, row):
+    """
+    Turn one series row into the JSON points list.
+
+    Args:
+        timestamps: Python list of timestamps shared by the batch
+        columns: Dict of point field name -> (N, M) array
+        row: Series index within the arrays
+    """
+    if len(columns) == 1:
+        (name, values), = columns.items()
+        return [{"timestamp": t, name: v} for t, v in zip(timestamps, values[row].tolist())]
+    names = list(columns)
+    rows = zip(*(columns[n][row].tolist() for n in names))
+    return [{"timestamp": t, **dict(zip(names, vals))} for t, vals in zip(timestamps, rows)]
+
+# Walk specs mirroring the original per-point generators
+TIMESERIES_WALK = {"start": ("int", 200, 400), "step": ("int", -20, 25),
+                   "spike_prob": 0.05, "spike": (150, 600), "low": 50, "clamp": "output"}
+
+WEBSITE_RESPONSE_WALK = {"start": ("int", 200, 500), "step": ("int", -50, 100),
+                         "spike_prob": 0.1, "spike": (500, 2000), "low": 100, "clamp": "output"}
+
+MOBILE_CRASH_RATE_WALK = {"start": ("uniform", 0.001, 0.05), "step": ("uniform", -0.005, 0.01),
+                          "low": 0.0001, "high": 0.1, "clamp": "walk", "decimals": 4}
+
+MOBILE_RESPONSE_WALK = {"start": ("int", 500, 3000), "step": ("int", -200, 400),
+                        "low": 100, "clamp": "walk"}
+
+def infrastructure_walk(metric_name):
+    """Walk spec for an infrastructure metric, based on its name."""
+    if "cpu" in metric_name:
+        start = ("uniform", 5, 30)  # CPU usage %
+    elif "memory" in metric_name:
+        start = ("uniform", 40, 80)  # Memory usage %
+    elif "network" in metric_name:
+        start = ("uniform", 1, 100)  # Network Mbps
+    elif "disk" in metric_name:
+        start = ("uniform", 20, 90)  # Disk usage %
+    else:
+        start = ("uniform", 0, 0)
+    return {"start": start, "step": ("uniform", -5, 5), "low": 0, "high": 100,
+            "clamp": "walk", "decimals": 2}
+
+APPLICATION_WALKS = {
+    "latency_p95_ms": {"start": ("int", 100, 300), "step": ("int", -20, 30), "low": 50, "clamp": "walk"},
+    "throughput_rpm": {"start": ("int", 1000, 10000), "step": ("int", -500, 500), "low": 100, "clamp": "walk"},
+    "apdex_score": {"start": ("uniform", 0.7, 0.95), "step": ("uniform", -0.05, 0.05),
+                    "low": 0.5, "high": 1.0, "clamp": "walk", "decimals": 2},
+    "error_rate_percent": {"start": ("uniform", 0.1, 2.0), "step": ("uniform", -0.5, 0.5),
+                           "low": 0.0, "high": 5.0, "clamp": "walk", "decimals": 2},
+}
+
+def application_walk(metric_name):
+    """Walk spec for an application metric; unknown metrics stay flat at 0."""
+    return APPLICATION_WALKS.get(metric_name, {"start": ("int", 0, 0), "step": ("int", 0, 0)})
@@ -0,0 +1,144 @@
+import itertools
+import json
+import os
+
+from instana_synthetic import compression
+from instana_synthetic.generators import write_jsonl
+
+# Line-per-entity layout of infrastructure_entities.jsonl.
+#
+#   infrastructure_entities.jsonl         one entity per line, appendable
+#   infrastructure_entities.header.json   the response envelope:
+#                                         {"adjusted_timeframe", "total_hits"}
+#
+# Readers stream the entities one line at a time, so inventories of
+# hundreds of thousands of entities load in constant memory, and read_page()
+# serves them the way the Instana API does: a page of `items` plus
+# `can_load_more`. Files in the older layout (a single line holding the
+# whole {"adjusted_timeframe", "can_load_more", "items", "total_hits"}
+# object) are still read; they just cannot be streamed.
+
+def header_path(path):
+    """Header file of an entities dataset, e.g. infrastructure_entities.header.json."""
+    stem = compression.strip_extension(path)
+    stem = stem[:-len(".jsonl")] if stem.endswith(".jsonl") else stem
+    return stem + ".header.json"
+
+def _write_header(path, header):
+    target = header_path(path)
+    with open(target + ".tmp", "w") as f:
+        json.dump(header, f)
+    os.replace(target + ".tmp", target)
+
+def write_entities(path, entities, adjusted_timeframe, append=False):
+    """
+    Write entities one per line and (re)write the header.
+
+    Args:
+        path: Dataset path (plain, .gz or .zst)
+        entities: Iterable of entity dicts, consumed lazily
+        adjusted_timeframe: Timeframe of the inventory, kept in the header
+        append: Add to the existing entities instead of replacing them
+
+    Returns:
+        Number of entities written
+
+    Raises:
+        ValueError: when appending to a file in the single-blob layout
+    """
+    if append and compression.dataset_exists(path) and not os.path.exists(header_path(path)):
+        raise ValueError(f"{path} has no header (single-blob layout); rewrite it before appending")
+    total = read_header(path)["total_hits"] if append and os.path.exists(header_path(path)) else 0
+    count = write_jsonl(path, entities, append=append)
+    _write_header(path, {"adjusted_timeframe": adjusted_timeframe, "total_hits": total + count})
+    return count
+
+def _lines(path):
+    """Non-empty lines of the dataset, unparsed; a legacy blob is expanded into its item dicts."""
+    with compression.open_dataset(path) as f:
+        lines = (line for line in f if line.strip())
+        first = next(lines, None)
+        if first is None:
+            return
+        if not os.path.exists(header_path(path)):
+            blob = json.loads(first)
+            if "items" in blob:
+                yield from blob["items"]
+                return
+        yield first
+        yield from lines
+
+def read_header(path):
+    """
+    The envelope of an entities dataset.
+
+    Returns:
+        {"adjusted_timeframe", "total_hits"}
+
+    Raises:
+        FileNotFoundError: if neither a header nor the dataset exists
+    """
+    try:
+        with open(header_path(path)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        pass
+    # Legacy layout: the envelope is the first (and only) line
+    with compression.open_dataset(path) as f:
+        first = next(f, "")
+    if not first.strip():
+        return {"adjusted_timeframe": None, "total_hits": 0}
+    blob = json.loads(first)
+    if "items" not in blob:
+        # Entity lines whose header was lost
+        return {"adjusted_timeframe": None, "total_hits": sum(1 for _ in _lines(path))}
+    return {"adjusted_timeframe": blob.get("adjusted_timeframe"), "total_hits": blob.get("total_hits", len(blob["items"]))}
+
+def iter_entities(path, offset=0):
+    """
+    Yield the entities of a dataset lazily, starting at the offset-th one.
+    Skipped lines are not parsed.
+    """
+    for line in itertools.islice(_lines(path), offset, None):
+        yield json.loads(line) if isinstance(line, str) else line
+
+def iter_entity_ids(path):
+    """Yield the entity_id of every entity."""
+    for entity in iter_entities(path):
+        yield entity["entity_id"]
+
+def read_page(path, offset=0, limit=1000):
+    """
+    One page of entities in the Instana API response shape.
+
+    Args:
+        path: Dataset path
+        offset: Entities to skip
+        limit: Maximum entities in the page
+
+    Returns:
+        {"adjusted_timeframe", "can_load_more", "items", "total_hits"}; the
+        next page starts at offset + len(items)
+    """
+    header = read_header(path)
+    entities = iter_entities(path, offset)
+    items = list(itertools.islice(entities, limit))
+    return {"adjusted_timeframe": header["adjusted_timeframe"],
+            "can_load_more": next(entities, None) is not None,
+            "items": items,
+            "total_hits": header["total_hits"]}
+
+def iter_pages(path, limit=1000):
+    """Yield successive pages, as read_page() returns them, in one pass over the file."""
+    header = read_header(path)
+    entities = iter_entities(path)
+    items = list(itertools.islice(entities, limit))
+    while True:
+        following = list(itertools.islice(entities, limit))
+        yield {"adjusted_timeframe": header["adjusted_timeframe"],
+               "can_load_more": bool(following),
+               "items": items,
+               "total_hits": header["total_hits"]}
+        if not following:
+            return
+        items = following
@@ -0,0 +1,704 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+from instana_synthetic import compression, lineindex, links, locks
+
+# SQLite event store for the record-stream datasets.
+#
+# Every data directory (tenant partition) can hold one events.sqlite with a
+# table per dataset: logs, events, issues and synthetic_runs. A row keeps the
+# whole record as JSON plus the columns dashboards filter and group on, each
+# with its own index:
+#
+#   logs             timestamp, severity, entity_id, correlation_id
+#   events           timestamp, severity, entity_id, type
+#   issues           start_time, severity, entity_id, state
+#   synthetic_runs   timestamp, check_id, status
+#
+# The database runs in WAL mode, so dashboard reads never wait for a
+# generator or runner that is inserting. Rows come from two places:
+#
+#   - the dataset's JSONL file (from_file = 1): generators write through the
+#     store while they write the file, and open_store() ingests whatever the
+#     file gained since (only the new tail after an append, like tsdb.py)
+#   - direct inserts (from_file = 0), e.g. synthetic_runner.py recording
+#     live runs; a rewrite of the JSONL file leaves them alone
+#
+# The store is optional: generators only write through it when it is enabled
+# (--event-store or INSTANA_EVENT_STORE=1) or already exists, and readers
+# build it from the JSONL file on first use. A store in a published snapshot
+# is the exception: snapshots.publish() syncs and checkpoints it beforehand,
+# and readers open it immutable, without syncing; a snapshot published
+# without a store in sync with the file is queried through the file's line
+# index instead (IndexedStore).
+#
+# A database shared with a published snapshot (see links.py) is never
+# written. Writes go to the newest part of a chain
+#
+#   events.sqlite  events.sqlite.seg00001  events.sqlite.seg00002 ...
+#
+# and a new segment database is started when that part is shared, so
+# staging the next snapshot version costs the new rows, not a copy of the
+# store. A segment carries the `sources` table forward, plus `hidden`, which
+# hides rows of the parts before it: the from_file rows of parts numbered
+# below file_segment (the JSONL file was rewritten since) and the direct
+# inserts older than purged_before (purge()). Readers see the chain through
+# temporary UNION ALL views named like the tables (_reader()). The newest
+# segments are merged into the next one like JSONL segments
+# (links.to_merge()); when a merge covers every segment and the base
+# database holds hidden rows, the base is merged as well and replaced.
+
+DB_NAME = "events.sqlite"
+
+# dataset: (time column, indexed columns)
+TABLES = {
+    "logs": ("timestamp", ("severity", "entity_id", "correlation_id")),
+    "events": ("timestamp", ("severity", "entity_id", "type")),
+    "issues": ("start_time", ("severity", "entity_id", "state")),
+    "synthetic_runs": ("timestamp", ("check_id", "status")),
+}
+
+# Rows per INSERT transaction
+BATCH_ROWS = 10_000
+
+# Seconds a writer waits for another writer's transaction to finish
+BUSY_TIMEOUT = 60
+
+_FIELD = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_enabled = os.environ.get("INSTANA_EVENT_STORE") == "1"
+_schema_ready = set()  # database paths whose tables exist
+_lock = threading.Lock()
+
+def set_enabled(enabled):
+    """Make generators in this process write through the event store."""
+    global _enabled
+    _enabled = bool(enabled)
+
+def db_path(out_dir):
+    return os.path.join(out_dir, DB_NAME)
+
+def dataset_of(path):
+    """Table name of a dataset file (e.g. logs for logs.jsonl.gz), or None if it is not stored."""
+    name = os.path.basename(compression.strip_extension(path))
+    name = name[:-len(".jsonl")] if name.endswith(".jsonl") else name
+    return name if name in TABLES else None
+
+def is_stored(path):
+    """Whether writes of a dataset file should go through the event store."""
+    return dataset_of(path) is not None and (_enabled or os.path.exists(db_path(os.path.dirname(path))))
+
+def _uri(path, readonly=False):
+    """URI of a database file; read-only ones are opened immutable inside a published snapshot."""
+    uri = f"file:{quote(os.path.abspath(path))}"
+    if readonly:
+        uri += "?immutable=1" if links.is_published(path) else "?mode=ro"
+    return uri
+
+def _chain(db):
+    """(number, path) of the parts of a store: the base database (0) and its segments."""
+    return [(0, db)] + compression.segments(db)
+
+def _open(path):
+    """Open one database file for writing, in autocommit mode (transactions are explicit), with the tables created."""
+    with _lock:
+        if not os.path.exists(path):
+            _schema_ready.discard(path)
+        ready = path in _schema_ready
+    conn = sqlite3.connect(_uri(path), uri=True, timeout=BUSY_TIMEOUT, isolation_level=None,
+                           check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if not ready:
+        _create_schema(conn)
+        with _lock:
+            _schema_ready.add(path)
+    return conn
+
+def _head(db):
+    """(number, path) of the part of a store that takes writes, starting a new segment if the newest is shared."""
+    chain = _chain(db)
+    if not links.is_shared(chain[-1][1]):
+        return chain[-1]
+    with locks.exclusive(locks.file_lock(db)):
+        chain = _chain(db)
+        if not links.is_shared(chain[-1][1]):
+            return chain[-1]
+        return _new_segment(db, chain)
+
+def connect(db):
+    """Open a connection to the part of a store that takes writes (see _head())."""
+    return _open(_head(db)[1])
+
+def _reader(db):
+    """
+    Open a read-only connection that sees a store as one database: with
+    several parts, the tables are temporary views over all of them.
+    """
+    chain = _chain(db)
+    conn = sqlite3.connect(_uri(chain[-1][1], readonly=True), uri=True, timeout=BUSY_TIMEOUT,
+                           isolation_level=None, check_same_thread=False)
+    if len(chain) == 1:
+        return conn
+    hidden = _hidden(conn)
+    for number, path in chain[:-1]:
+        conn.execute("ATTACH DATABASE ? AS ?", (_uri(path, readonly=True), f"part{number}"))
+    schemas = [f"part{number}" for number, _ in chain[:-1]] + ["main"]
+    for dataset, (time_key, keys) in TABLES.items():
+        columns = ", ".join((time_key, *keys, "from_file", "record"))
+        selects = [f"SELECT ({number} << 40) + id AS id, {columns} FROM {schema}.{dataset} "
+                   f"WHERE {_visible(dataset, number, hidden)}"
+                   for (number, _), schema in zip(chain, schemas)]
+        conn.execute(f"CREATE TEMP VIEW {dataset} AS {' UNION ALL '.join(selects)}")
+    return conn
+
+def _hidden(conn, schema="main"):
+    """{dataset: (file_segment, purged_before)} of a part."""
+    return {row[0]: row[1:] for row in
+            conn.execute(f"SELECT dataset, file_segment, purged_before FROM {schema}.hidden")}
+
+def _visible(dataset, number, hidden):
+    """SQL condition selecting the rows of part `number` of a dataset's table that are not hidden."""
+    file_segment, purged_before = hidden.get(dataset, (0, None))
+    files = "from_file = 1" if number >= file_segment else "0"
+    direct = "from_file = 0"
+    if purged_before is not None:
+        direct += f" AND {TABLES[dataset][0]} >= {int(purged_before)}"
+    return f"({files}) OR ({direct})"
+
+def _new_segment(db, chain):
+    """
+    Start the next segment of a store, carrying `sources` and `hidden`
+    forward and merging the visible rows of the parts links.to_merge()
+    picks (all of them, base included, when that is every segment and the
+    base has hidden rows; the result then replaces the base).
+
+    Returns:
+        (number, path) of the new head
+    """
+    number = chain[-1][0] + 1
+    target = compression.segment_path(db, number)
+    tmp = target + ".tmp"
+    for leftover in (tmp, tmp + "-journal"):
+        if os.path.exists(leftover):
+            os.remove(leftover)
+    conn = sqlite3.connect(_uri(tmp), uri=True, isolation_level=None)
+    try:
+        _create_schema(conn)
+        conn.execute("ATTACH DATABASE ? AS head", (_uri(chain[-1][1], readonly=True),))
+        has_hidden = conn.execute("SELECT COUNT(*) FROM head.sqlite_master WHERE name = 'hidden'").fetchone()[0]
+        hidden = _hidden(conn, "head") if has_hidden else {}
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("INSERT INTO sources (dataset, path, size, mtime_ns) SELECT dataset, path, size, mtime_ns "
+                     "FROM head.sources")
+        conn.executemany("INSERT INTO hidden (dataset, file_segment, purged_before) VALUES (?, ?, ?)",
+                         [(dataset, *values) for dataset, values in hidden.items()])
+        conn.execute("COMMIT")
+        conn.execute("DETACH DATABASE head")
+        merged = links.to_merge(chain[1:])
+        base = merged == chain[1:] and any(fs or pb is not None for fs, pb in hidden.values())
+        if base:
+            merged = chain
+        for part_number, path in merged:
+            conn.execute("ATTACH DATABASE ? AS part", (_uri(path, readonly=True),))
+            conn.execute("BEGIN IMMEDIATE")
+            for dataset, (time_key, keys) in TABLES.items():
+                columns = ", ".join((time_key, *keys, "from_file", "record"))
+                conn.execute(f"INSERT INTO {dataset} ({columns}) SELECT {columns} FROM part.{dataset} "
+                             f"WHERE {_visible(dataset, part_number, hidden)} ORDER BY id")
+            conn.execute("COMMIT")
+            conn.execute("DETACH DATABASE part")
+        if base:
+            conn.execute("DELETE FROM hidden")
+        elif merged:
+            # File rows were hidden in every part left: hide them up to the merged ones
+            kept = max(part[0] for part in chain if part not in merged)
+            conn.execute("UPDATE hidden SET file_segment = ? WHERE file_segment > ?", (number, kept))
+    finally:
+        conn.close()
+    if base:
+        _remove(chain[1:])
+        os.replace(tmp, db)
+        with _lock:
+            _schema_ready.discard(db)
+        return 0, db
+    os.replace(tmp, target)
+    _remove(merged)
+    return number, target
+
+def _remove(parts):
+    """Remove merged parts of a store along with the -wal/-shm files readers left next to them."""
+    for _, path in parts:
+        for name in (path, path + "-wal", path + "-shm"):
+            if os.path.exists(name):
+                os.remove(name)
+
+def _create_schema(conn):
+    conn.execute("BEGIN IMMEDIATE")
+    for dataset, (time_key, keys) in TABLES.items():
+        columns = ", ".join(f"{k} TEXT" for k in keys)
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {dataset} (id INTEGER PRIMARY KEY, {time_key} INTEGER, "
+                     f"{columns}, from_file INTEGER NOT NULL, record TEXT NOT NULL)")
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {dataset}_{time_key} ON {dataset} ({time_key})")
+        for key in keys:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {dataset}_{key} ON {dataset} ({key}, {time_key})")
+    # The state of each dataset's JSONL file the from_file rows reflect;
+    # size is NULL while a generator is writing through the store
+    conn.execute("CREATE TABLE IF NOT EXISTS sources (dataset TEXT PRIMARY KEY, path TEXT, "
+                 "size INTEGER, mtime_ns INTEGER)")
+    # Rows of the earlier parts of a chain that are no longer visible
+    conn.execute("CREATE TABLE IF NOT EXISTS hidden (dataset TEXT PRIMARY KEY, "
+                 "file_segment INTEGER NOT NULL DEFAULT 0, purged_before INTEGER)")
+    conn.execute("COMMIT")
+
+def _row(dataset, record, from_file):
+    time_key, keys = TABLES[dataset]
+    return (record.get(time_key), *(_text(record.get(k)) for k in keys), from_file, json.dumps(record))
+
+def _text(value):
+    return None if value is None else str(value)
+
+def _insert_batch(conn, dataset, rows):
+    """Insert rows inside the caller's transaction."""
+    if rows:
+        time_key, keys = TABLES[dataset]
+        columns = ", ".join((time_key, *keys, "from_file", "record"))
+        marks = ", ".join("?" * (len(keys) + 3))
+        conn.executemany(f"INSERT INTO {dataset} ({columns}) VALUES ({marks})", rows)
+
+def _insert(conn, dataset, rows):
+    """Insert rows in a transaction of their own."""
+    conn.execute("BEGIN IMMEDIATE")
+    _insert_batch(conn, dataset, rows)
+    conn.execute("COMMIT")
+
+def insert_records(db, dataset, records, from_file=False, batch_rows=BATCH_ROWS):
+    """
+    Insert records into a dataset's table in batched transactions.
+
+    Args:
+        db: Database path, e.g. data/instana/events.sqlite
+        dataset: Table name (a key of TABLES)
+        records: Iterable of record dicts
+        from_file: Whether the records mirror the dataset's JSONL file
+
+    Returns:
+        Number of records inserted
+    """
+    conn = connect(db)
+    try:
+        count, batch = 0, []
+        for record in records:
+            batch.append(_row(dataset, record, int(from_file)))
+            if len(batch) >= batch_rows:
+                _insert(conn, dataset, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            _insert(conn, dataset, batch)
+            count += len(batch)
+        return count
+    finally:
+        conn.close()
+
+def _signature(path):
+    # By file name, so a store staged next to its files stays in sync once published
+    return (os.path.basename(path), *compression.dataset_stat(path))
+
+def _clear_file_rows(conn, dataset, number):
+    """Drop a table's from_file rows in the head (part `number`) and hide those of the earlier parts."""
+    conn.execute(f"DELETE FROM {dataset} WHERE from_file = 1")
+    if number:
+        conn.execute("INSERT INTO hidden (dataset, file_segment) VALUES (?, ?) "
+                     "ON CONFLICT (dataset) DO UPDATE SET file_segment = excluded.file_segment", (dataset, number))
+
+def _set_source(conn, dataset, path, size, mtime_ns):
+    conn.execute("INSERT OR REPLACE INTO sources (dataset, path, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                 (dataset, path, size, mtime_ns))
+
+def write_through(path, records, write, append=False):
+    """
+    Write records to a dataset file with write(path, records) while inserting
+    them into the event store of the file's directory.
+
+    A rewrite replaces the table's from_file rows; an append first brings the
+    table up to date with the file, so the new records land after it.
+
+    Returns:
+        Whatever write() returns
+    """
+    dataset = dataset_of(path)
+    db = db_path(os.path.dirname(path))
+    if append:
+        sync_dataset(path)
+    number, head = _head(db)
+    conn = _open(head)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        if not append:
+            _clear_file_rows(conn, dataset, number)
+        _set_source(conn, dataset, path, None, None)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+    def tee(records):
+        batch = []
+        for record in records:
+            yield record
+            batch.append(record)
+            if len(batch) >= BATCH_ROWS:
+                insert_records(db, dataset, batch, from_file=True)
+                batch = []
+        insert_records(db, dataset, batch, from_file=True)
+
+    result = write(path, tee(records))
+    conn = connect(db)
+    try:
+        _set_source(conn, dataset, *_signature(compression.resolve(path)))
+    finally:
+        conn.close()
+    return result
+
+def sync_dataset(path, rebuild=False):
+    """
+    Bring a dataset's table up to date with its JSONL file.
+
+    Only the lines appended since the last sync are ingested when a plain
+    file grew; any other change re-ingests the file. The check and the
+    ingest run in one write transaction, so concurrent readers cannot
+    ingest the same lines twice.
+
+    Returns:
+        Number of rows ingested
+    """
+    dataset = dataset_of(path)
+    source = compression.resolve(path)
+    if not os.path.exists(source):
+        return 0
+    number, head = _head(db_path(os.path.dirname(path)))
+    conn = _open(head)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        old = conn.execute("SELECT path, size, mtime_ns FROM sources WHERE dataset = ?", (dataset,)).fetchone()
+        current = _signature(source)
+        if old is not None and old[1] is None and not rebuild:
+            conn.execute("COMMIT")  # a generator is writing through the store
+            return 0
+        if old == current and not rebuild:
+            conn.execute("COMMIT")
+            return 0
+        start = 0
+        if (not rebuild and old is not None and old[0] == current[0] and compression.compression_of(source) is None
+                and current[1] > old[1] and _ends_line(source, old[1])):
+            start = old[1]
+        else:
+            _clear_file_rows(conn, dataset, number)
+        count, batch = 0, []
+        for record in _read_from(source, start):
+            batch.append(_row(dataset, record, 1))
+            if len(batch) >= BATCH_ROWS:
+                count += len(batch)
+                _insert_batch(conn, dataset, batch)
+                batch = []
+        count += len(batch)
+        _insert_batch(conn, dataset, batch)
+        _set_source(conn, dataset, *current)
+        conn.execute("COMMIT")
+        return count
+    except BaseException:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.close()
+
+def _ends_line(path, size):
+    """Whether the first `size` bytes of a file end on a line boundary (the rest was appended)."""
+    with compression.open_raw(path) as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
+
+def _read_from(source, start):
+    if start:
+        with compression.open_raw(source) as f:
+            f.seek(start)
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with compression.open_text(source) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def purge(db, cutoffs):
+    """
+    Delete the directly inserted rows older than their table's cutoff (in
+    the head; they are hidden in the earlier parts of a chain) and
+    checkpoint the WAL; rows mirrored from a JSONL file follow that file
+    instead.
+
+    Args:
+        db: Database path
+        cutoffs: {table: oldest epoch ms to keep}; a table that is missing or
+                 maps to None keeps every row
+
+    Returns:
+        Number of rows deleted or hidden
+    """
+    number, head = _head(db)
+    earlier = [part for part in _chain(db) if part[0] < number]
+    conn = _open(head)
+    try:
+        for part_number, path in earlier:
+            conn.execute("ATTACH DATABASE ? AS ?", (_uri(path, readonly=True), f"part{part_number}"))
+        hidden = _hidden(conn)
+        conn.execute("BEGIN IMMEDIATE")
+        deleted = 0
+        for dataset, (time_key, _) in TABLES.items():
+            cutoff = cutoffs.get(dataset)
+            if cutoff is None:
+                continue
+            deleted += conn.execute(f"DELETE FROM {dataset} WHERE from_file = 0 AND {time_key} < ?",
+                                    (cutoff,)).rowcount
+            purged_before = hidden.get(dataset, (0, None))[1]
+            if purged_before is not None and cutoff <= purged_before:
+                continue
+            newly = sum(conn.execute(f"SELECT COUNT(*) FROM part{part_number}.{dataset} WHERE from_file = 0 "
+                                     f"AND {time_key} < ? AND {time_key} >= ?",
+                                     (cutoff, purged_before or 0)).fetchone()[0]
+                        for part_number, _ in earlier)
+            if newly:
+                conn.execute("INSERT INTO hidden (dataset, purged_before) VALUES (?, ?) "
+                             "ON CONFLICT (dataset) DO UPDATE SET purged_before = excluded.purged_before",
+                             (dataset, cutoff))
+                deleted += newly
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return deleted
+    finally:
+        conn.close()
+
+def checkpoint(db):
+    """Move the WAL of every part of a store into its database file, leaving the files complete on their own."""
+    for _, path in _chain(db):
+        if os.path.exists(path + "-wal") and not links.is_published(path):
+            conn = _open(path)
+            try:
+                conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            finally:
+                conn.close()
+
+def _in_sync(db, dataset, path):
+    """Whether a table mirrors the current state of its JSONL file (trivially so without a file)."""
+    source = compression.resolve(path)
+    if not os.path.exists(source):
+        return True
+    if not os.path.exists(db):
+        return False
+    conn = _reader(db)
+    try:
+        old = conn.execute("SELECT path, size, mtime_ns FROM sources WHERE dataset = ?", (dataset,)).fetchone()
+    finally:
+        conn.close()
+    return old == _signature(source)
+
+class EventStore:
+    """
+    Query side of one dataset's table.
+
+    Filters are keyword arguments: column=value, or column=[values] for any
+    of several values. Columns are the indexed ones, any other record field
+    (read from the JSON), or the derived "day" (YYYY-MM-DD) and "hour"
+    (0-23) of the record time, all in UTC.
+    """
+
+    def __init__(self, db, dataset):
+        self.db = db
+        self.dataset = dataset
+        self.time_key, self.keys = TABLES[dataset]
+
+    def _column(self, name):
+        if name == "day":
+            return f"date({self.time_key} / 1000, 'unixepoch')"
+        if name == "hour":
+            return f"CAST(strftime('%H', {self.time_key} / 1000, 'unixepoch') AS INTEGER)"
+        if name == self.time_key or name in self.keys:
+            return name
+        if not _FIELD.match(name):
+            raise ValueError(f"Invalid field name {name!r}")
+        return f"json_extract(record, '$.{name}')"
+
+    def _where(self, start, end, filters):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append(f"{self.time_key} >= ?")
+            params.append(start)
+        if end is not None:
+            clauses.append(f"{self.time_key} < ?")
+            params.append(end)
+        for name, value in filters.items():
+            column = self._column(name)
+            if name in self.keys:  # stored as text
+                value = [_text(v) for v in value] if isinstance(value, (list, tuple, set)) else _text(value)
+            if isinstance(value, (list, tuple, set)):
+                value = list(value)
+                clauses.append(f"{column} IN ({', '.join('?' * len(value))})")
+                params.extend(value)
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _execute(self, sql, params):
+        conn = _reader(self.db)
+        try:
+            return conn.execute(sql, params).fetchall()
+        finally:
+            conn.close()
+
+    def count(self, start=None, end=None, **filters):
+        """Number of matching records."""
+        where, params = self._where(start, end, filters)
+        return self._execute(f"SELECT COUNT(*) FROM {self.dataset}{where}", params)[0][0]
+
+    def records(self, start=None, end=None, limit=None, newest_first=False, **filters):
+        """Matching records (full dicts) in time order."""
+        where, params = self._where(start, end, filters)
+        order = "DESC" if newest_first else "ASC"
+        sql = f"SELECT record FROM {self.dataset}{where} ORDER BY {self.time_key} {order}, id {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [json.loads(r[0]) for r in self._execute(sql, params)]
+
+    def rows(self, columns, start=None, end=None, limit=None, **filters):
+        """Selected columns of the matching records in time order, as a dict of lists."""
+        where, params = self._where(start, end, filters)
+        select = ", ".join(self._column(c) for c in columns)
+        sql = f"SELECT {select} FROM {self.dataset}{where} ORDER BY {self.time_key}, id"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        result = self._execute(sql, params)
+        return {c: [r[i] for r in result] for i, c in enumerate(columns)}
+
+    def count_by(self, columns, start=None, end=None, limit=None, **filters):
+        """
+        Record counts grouped by one or more columns, largest first.
+
+        Returns:
+            Dict of column -> list of group values, plus "count"
+        """
+        where, params = self._where(start, end, filters)
+        groups = ", ".join(self._column(c) for c in columns)
+        sql = (f"SELECT {groups}, COUNT(*) AS n FROM {self.dataset}{where} "
+               f"GROUP BY {groups} ORDER BY n DESC, {groups}")
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        result = self._execute(sql, params)
+        counts = {c: [r[i] for r in result] for i, c in enumerate(columns)}
+        counts["count"] = [r[-1] for r in result]
+        return counts
+
+class IndexedStore(EventStore):
+    """
+    The queries of EventStore answered from a dataset file through its line
+    index (see lineindex.py). The time range and filters on indexed ID
+    fields narrow the lines read; other filters are applied to the records.
+    """
+
+    def __init__(self, path, dataset):
+        super().__init__(db_path(os.path.dirname(path)), dataset)
+        self.path = path
+
+    def _value(self, record, name):
+        time = record.get(self.time_key)
+        if name in ("day", "hour"):
+            if time is None:
+                return None
+            moment = datetime.fromtimestamp(time / 1000, timezone.utc)
+            return moment.strftime("%Y-%m-%d") if name == "day" else moment.hour
+        if name in self.keys:
+            return _text(record.get(name))
+        if name != self.time_key and not _FIELD.match(name):
+            raise ValueError(f"Invalid field name {name!r}")
+        return record.get(name)
+
+    def _matching(self, start, end, filters):
+        """Matching records in time order (file order among equal times)."""
+        wanted = {}
+        for name, value in filters.items():
+            values = list(value) if isinstance(value, (list, tuple, set)) else [value]
+            wanted[name] = {_text(v) for v in values} if name in self.keys else values
+        ids = {name: value for name, value in filters.items()
+               if name in lineindex.INDEXED[f"{self.dataset}.jsonl"][1] and not isinstance(value, (list, tuple, set))}
+        records = [r for r in lineindex.query(self.path, start, end, **ids)
+                   if (end is None or (r.get(self.time_key) or 0) < end)
+                   and all(self._value(r, name) in values for name, values in wanted.items())]
+        return sorted(records, key=lambda r: (r.get(self.time_key) is not None, r.get(self.time_key) or 0))
+
+    def count(self, start=None, end=None, **filters):
+        """Number of matching records."""
+        return len(self._matching(start, end, filters))
+
+    def records(self, start=None, end=None, limit=None, newest_first=False, **filters):
+        """Matching records (full dicts) in time order."""
+        records = self._matching(start, end, filters)
+        if newest_first:
+            records.reverse()
+        return records if limit is None else records[:int(limit)]
+
+    def rows(self, columns, start=None, end=None, limit=None, **filters):
+        """Selected columns of the matching records in time order, as a dict of lists."""
+        records = self._matching(start, end, filters)
+        if limit is not None:
+            records = records[:int(limit)]
+        return {c: [self._value(r, c) for r in records] for c in columns}
+
+    def count_by(self, columns, start=None, end=None, limit=None, **filters):
+        """
+        Record counts grouped by one or more columns, largest first.
+
+        Returns:
+            Dict of column -> list of group values, plus "count"
+        """
+        counts = Counter(tuple(self._value(r, c) for c in columns) for r in self._matching(start, end, filters))
+        groups = sorted(counts.items(), key=lambda item: (-item[1], [(v is not None, v) for v in item[0]]))
+        if limit is not None:
+            groups = groups[:int(limit)]
+        result = {c: [group[i] for group, _ in groups] for i, c in enumerate(columns)}
+        result["count"] = [n for _, n in groups]
+        return result
+
+def open_store(path):
+    """
+    Open the event store table of a dataset file, ingesting whatever the
+    file gained since the last sync first. In a published snapshot whose
+    store is missing or out of sync, the file is queried through its line
+    index (IndexedStore).
+
+    Args:
+        path: Dataset path, e.g. data/instana/tenant-1/logs.jsonl
+
+    Raises:
+        ValueError: if the dataset is not one of TABLES
+        FileNotFoundError: if neither the file nor an event store exists
+    """
+    dataset = dataset_of(path)
+    if dataset is None:
+        raise ValueError(f"{path} is not an event store dataset")
+    db = db_path(os.path.dirname(path))
+    if not os.path.exists(compression.resolve(path)) and not os.path.exists(db):
+        raise FileNotFoundError(f"No event dataset at {path}")
+    if links.is_published(db):
+        if not _in_sync(db, dataset, path):
+            return IndexedStore(path, dataset)
+    else:
+        sync_dataset(path)
+    return EventStore(db, dataset)
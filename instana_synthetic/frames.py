@@ -0,0 +1,111 @@
+import itertools
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from instana_synthetic import compression
+
+# Vectorized DataFrame construction for the dashboard loaders.
+#
+# Records become a frame in one pass of pandas' record converter; nested
+# dicts (e.g. the pod "metrics") are then split into flat
+# "metrics.cpu_usage_cores" columns with one list comprehension per field,
+# and nested point lists become one long frame with the series ID repeated
+# per point. Epoch-ms columns are converted once per column: UTC with a
+# single pd.to_datetime(), local time by adding the UTC offset of every
+# distinct quarter hour (offsets only change on quarter-hour boundaries)
+# instead of calling datetime.fromtimestamp() for every value.
+
+QUARTER_HOUR_MS = 900_000
+
+def _utc_offset_ms(timestamp_ms):
+    """Offset of local time from UTC at an instant, in ms."""
+    offset = datetime.fromtimestamp(timestamp_ms / 1000).astimezone().utcoffset()
+    return int(offset.total_seconds() * 1000)
+
+def to_datetimes(timestamps_ms, local=False):
+    """
+    Convert epoch-ms values to naive datetimes in one vectorized step.
+
+    Args:
+        timestamps_ms: Array-like of epoch milliseconds
+        local: Local wall-clock time, like datetime.fromtimestamp(), instead of UTC
+
+    Returns:
+        DatetimeIndex of the same length
+    """
+    ms = np.asarray(timestamps_ms, dtype=np.int64)
+    if local and len(ms):
+        quarters, inverse = np.unique(ms // QUARTER_HOUR_MS, return_inverse=True)
+        offsets = np.array([_utc_offset_ms(q * QUARTER_HOUR_MS) for q in quarters.tolist()], dtype=np.int64)
+        ms = ms + offsets[inverse]
+    return pd.to_datetime(ms, unit="ms")
+
+def _keys(dicts):
+    """Union of the keys of some dicts, in first-seen order."""
+    return list(dict.fromkeys(itertools.chain.from_iterable(dicts)))
+
+def records_frame(records, nested=(), time_columns=(), local=False):
+    """
+    Build a DataFrame from record dicts, with nested dicts as flat columns.
+
+    Args:
+        records: List of record dicts
+        nested: Keys whose dict values are flattened into "<key>.<field>" columns
+        time_columns: Epoch-ms columns converted to datetimes
+        local: Convert time columns to local instead of UTC time
+
+    Returns:
+        DataFrame with one row per record (empty without records)
+    """
+    if not records:
+        return pd.DataFrame()
+    frame = pd.DataFrame.from_records(records)
+    for key in nested:
+        if key not in frame:
+            continue
+        position = frame.columns.get_loc(key)
+        inner = [v if isinstance(v, dict) else {} for v in frame.pop(key).tolist()]
+        for offset, field in enumerate(_keys(inner)):
+            frame.insert(position + offset, f"{key}.{field}", [v.get(field) for v in inner])
+    for column in time_columns:
+        if column in frame:
+            frame[column] = to_datetimes(frame[column], local)
+    return frame
+
+def points_frame(records, id_key, fields=None, local=False):
+    """
+    Long-format DataFrame of the "points" lists of metric records: one row
+    per point with the record's ID, the timestamp and the point fields.
+
+    Args:
+        records: Metric record dicts with a "points" list each
+        id_key: Record field repeated on every point row, e.g. "entity_id"
+        fields: Point fields to keep (defaults to those of the first point)
+        local: Local instead of UTC timestamps
+    """
+    point_lists = [r.get("points") or [] for r in records]
+    lengths = np.fromiter((len(p) for p in point_lists), dtype=np.int64, count=len(point_lists))
+    points = list(itertools.chain.from_iterable(point_lists))
+    if fields is None:
+        fields = [f for f in (points[0] if points else {}) if f != "timestamp"]
+    ids = np.array([r.get(id_key) for r in records], dtype=object)
+    frame = {id_key: np.repeat(ids, lengths),
+             "timestamp": to_datetimes([p["timestamp"] for p in points], local)}
+    for field in fields:
+        frame[field] = [p.get(field) for p in points]
+    return pd.DataFrame(frame)
+
+def read_frame(path, nested=(), time_columns=(), local=False):
+    """
+    Parse a JSONL dataset (plain, .gz or .zst) into a DataFrame with
+    records_frame().
+
+    Raises:
+        FileNotFoundError: if the dataset does not exist
+    """
+    with compression.open_dataset(path) as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return records_frame(records, nested, time_columns, local)
@@ -1,9 +1,22 @@
 import json
 import random
 import time
+from contextlib import nullcontext
 from datetime import datetime, timedelta
 
+from instana_synthetic import compression, engine, ids, lineindex, links, locks
+
+# Fixed "now" for reproducible runs; None means the wall clock
+_clock_ms = None
+
+def set_clock(ms):
+    """Pin now_ms() to a fixed epoch-millisecond value (None restores the wall clock)."""
+    global _clock_ms
+    _clock_ms = ms
+
 def now_ms():
+    if _clock_ms is not None:
+        return _clock_ms
     return int(time.time() * 1000)
 
 def rand_timeframe(minutes=15):
@@ -11,10 +24,10 @@ def rand_timeframe(minutes=15):
     window = minutes * 60 * 1000
     return {"to": to, "window_size": window}
 
-def gen_issue(entity_id, severity_dist=(0,1,2,3,4)):
+def gen_issue(entity_id, severity_dist=(0,1,2,3,4), allocator="entity_issue"):
     sev = random.choices(severity_dist, weights=[50,25,15,7,3])[0]
     return {
-        "id": f"ISS-{random.randint(100000,999999)}",
+        "id": ids.allocate(allocator),
         "entity_id": entity_id,
         "severity": sev,
         "start": now_ms() - random.randint(1, 30) * 60_000,
@@ -46,27 +59,83 @@ def gen_entity(i):
         "time": now_ms()
     }
 
-def gen_timeseries(entity_id, metric="latency_p95_ms", minutes=60, step=60_000):
+def _metric_chunks(ids, metric_name, aggregation, minutes, step, columns_for, resume=None):
+    """
+    Generate metric series for a batch of IDs on top of the walk engine.
+
+    columns_for(n_series, n_steps, start) returns an iterator of {field: array}
+    chunks of shape (chunk_series, n_steps).
+
+    resume maps each series ID to its last point; the walks then continue
+    from those values over the window after the latest of their timestamps,
+    and `minutes` is ignored. Series are assumed to share one time axis.
+
+    Yields:
+        (chunk_ids, header, timestamps, columns) tuples, where header holds
+        the metric_name/aggregation/timeframe fields shared by the chunk
+    """
     to = now_ms()
-    frm = to - minutes * 60_000
-    points = []
-    val = random.randint(200, 400)
-    for t in range(frm, to, step):
-        # random walk + spikes
-        val += random.randint(-20, 25)
-        if random.random() < 0.05:
-            val += random.randint(150, 600)
-        points.append({"timestamp": t, "value": max(50, val)})
-    return {
-        "entity_id": entity_id,
-        "metric_name": metric,
-        "aggregation": "p95",
-        "timeframe": {"from": frm, "to": to, "step_ms": step},
-        "points": points
-    }
+    ids = list(ids)
+    start = None
+    if resume is None:
+        frm, timestamps = engine.time_axis(minutes, step, to)
+    else:
+        if not ids:
+            return
+        frm, timestamps = engine.time_axis_after(max(resume[i]["timestamp"] for i in ids), step, to)
+        if len(timestamps) == 0:
+            return
+        fields = [k for k in resume[ids[0]] if k != "timestamp"]
+        start = {f: [resume[i][f] for i in ids] for f in fields}
+    header = {"metric_name": metric_name, "aggregation": aggregation,
+              "timeframe": {"from": frm, "to": to, "step_ms": step}}
+    offset = 0
+    for columns in columns_for(len(ids), len(timestamps), start):
+        rows = len(next(iter(columns.values())))
+        yield ids[offset:offset + rows], header, timestamps, columns
+        offset += rows
+
+def metric_records(id_key, chunks):
+    """Turn (chunk_ids, header, timestamps, columns) chunks into JSONL metric records."""
+    for chunk_ids, header, timestamps, columns in chunks:
+        timestamp_list = timestamps.tolist()
+        for row, series_id in enumerate(chunk_ids):
+            yield {
+                id_key: series_id,
+                "metric_name": header["metric_name"],
+                "aggregation": header["aggregation"],
+                "timeframe": dict(header["timeframe"]),
+                "points": engine.points(timestamp_list, columns, row)
+            }
+
+def _metric_batch(id_key, ids, metric_name, aggregation, minutes, step, columns_for,
+                  resume=None, columnar=False):
+    """
+    Build metric records for a batch of series; records are only materialised
+    one series at a time. With columnar=True the raw array chunks from
+    _metric_chunks() are returned instead, e.g. for columnar.write_columnar().
+    """
+    chunks = _metric_chunks(ids, metric_name, aggregation, minutes, step, columns_for, resume)
+    return chunks if columnar else metric_records(id_key, chunks)
+
+def _single_column(name, spec):
+    def columns_for(n_series, n_steps, start=None):
+        values = engine.iter_walks(spec, n_series, n_steps, start=start and start[name])
+        for chunk in values:
+            yield {name: chunk}
+    return columns_for
+
+def gen_timeseries_batch(entity_ids, metric="latency_p95_ms", minutes=60, step=60_000,
+                         resume=None, columnar=False):
+    # random walk + spikes
+    return _metric_batch("entity_id", entity_ids, metric, "p95", minutes, step,
+                         _single_column("value", engine.TIMESERIES_WALK), resume, columnar)
+
+def gen_timeseries(entity_id, metric="latency_p95_ms", minutes=60, step=60_000):
+    return next(gen_timeseries_batch([entity_id], metric, minutes, step))
 
 def gen_application(i):
-    aid = f"app-{random.randint(100000,999999)}"
+    aid = ids.allocate("application", i)
     return {
         "application_id": aid,
         "name": random.choice(["E-commerce App","Search Engine","User Portal","Payment Gateway"]),
@@ -81,7 +150,7 @@ def gen_application(i):
     }
 
 def gen_endpoint(i):
-    eid = f"ep-{random.randint(100000,999999)}"
+    eid = ids.allocate("endpoint", i)
     return {
         "endpoint_id": eid,
         "path": random.choice(["/api/checkout","/api/search","/api/user","/api/payment"]),
@@ -95,7 +164,7 @@ def gen_endpoint(i):
     }
 
 def gen_issue_record(i, entity_ids=None):
-    iid = f"ISS-{random.randint(100000,999999)}"
+    iid = ids.allocate("issue", i)
     entity_id = random.choice(entity_ids) if entity_ids else f"srv-{random.randint(10000000,99999999)}"
     return {
         "issue_id": iid,
@@ -171,10 +240,63 @@ def gen_entity_types():
     ]
     return {"entity_types": types}
 
-def write_jsonl(path, records):
-    with open(path, "w", encoding="utf-8") as f:
+# Running totals of everything written by write_jsonl() in this process
+write_stats = {"records": 0, "bytes": 0}
+
+def write_jsonl(path, records, batch_lines=8192, append=False):
+    """
+    Write records to a JSONL file and return how many were written.
+
+    records may be any iterable, including a lazy generator; lines are
+    serialized in batches and written through a large buffer so memory use
+    does not depend on the number of records. With append=True the records
+    are added to the end of an existing file.
+
+    A .gz or .zst path is compressed, one independent gzip member / zstd
+    frame per batch (see compression.py).
+    """
+    def batches():
+        batch = []
         for r in records:
-            f.write(json.dumps(r) + "\n")
+            batch.append(json.dumps(r))
+            if len(batch) >= batch_lines:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    return write_lines(path, batches(), append)
+
+def write_lines(path, batches, append=False):
+    """
+    Write batches of already serialized JSONL lines, like write_jsonl().
+    Every batch becomes one write (and one compressed frame). Appends hold
+    the file's lock, so compaction never swaps the file out from under them,
+    and go to a new segment when the file is shared with a published
+    snapshot (see links.py). The lines of an indexed dataset are added to
+    its line index (see lineindex.py) before the lock is released.
+    """
+    codec = compression.compression_of(path)
+    count = 0
+    size = 0
+    with locks.exclusive(locks.file_lock(path)) if append else nullcontext():
+        if append:
+            target = links.append_target(path)
+        else:
+            links.detach(path)
+            target = path
+        with open(target, "ab" if append else "wb", buffering=1 << 20) as f:
+            for batch in batches:
+                if not batch:
+                    continue
+                chunk = ("\n".join(batch) + "\n").encode("utf-8")
+                f.write(compression.compress_frame(chunk, codec))
+                size += len(chunk)
+                count += len(batch)
+        if lineindex.is_indexed(path):
+            lineindex.index_tail(path, rebuild=not append)
+    write_stats["records"] += count
+    write_stats["bytes"] += size
+    return count
 
 # Website Monitoring Generators
 def gen_website_config(i):
@@ -212,23 +334,13 @@ def gen_website_catalog():
     ]
     return {"websites": websites}
 
+def gen_website_metrics_batch(website_ids, minutes=60, resume=None, columnar=False):
+    # response time ms with occasional spikes, every minute
+    return _metric_batch("website_id", website_ids, "response_time_ms", "avg", minutes, 60_000,
+                         _single_column("value", engine.WEBSITE_RESPONSE_WALK), resume, columnar)
+
 def gen_website_metrics(website_id, minutes=60):
-    to = now_ms()
-    frm = to - minutes * 60_000
-    points = []
-    val = random.randint(200, 500)  # response time ms
-    for t in range(frm, to, 60_000):  # every minute
-        val += random.randint(-50, 100)
-        if random.random() < 0.1:  # occasional spikes
-            val += random.randint(500, 2000)
-        points.append({"timestamp": t, "value": max(100, val)})
-    return {
-        "website_id": website_id,
-        "metric_name": "response_time_ms",
-        "aggregation": "avg",
-        "timeframe": {"from": frm, "to": to, "step_ms": 60000},
-        "points": points
-    }
+    return next(gen_website_metrics_batch([website_id], minutes))
 
 def gen_website_analyze(website_id):
     return {
@@ -241,16 +353,16 @@ def gen_website_analyze(website_id):
         "page_views": random.randint(1000, 10000),
         "unique_visitors": random.randint(500, 5000),
         "availability": round(random.uniform(0.95, 1.0), 3),
-        "issues": [gen_issue(website_id) for _ in range(random.randint(0, 2))]
+        "issues": [gen_issue(website_id, allocator="website_issue") for _ in range(random.randint(0, 2))]
     }
 
 # Logging Generators
-def gen_log_entry(entity_ids=None):
+def gen_log_entry(entity_ids=None, max_age_ms=86400000):
     entity_id = random.choice(entity_ids) if entity_ids else f"srv-{random.randint(10000000,99999999)}"
     severity_levels = ["DEBUG", "INFO", "WARN", "ERROR", "FATAL"]
     severity = random.choices(severity_levels, weights=[40, 30, 20, 8, 2])[0]
     return {
-        "timestamp": now_ms() - random.randint(0, 86400000),  # up to 1 day ago
+        "timestamp": now_ms() - random.randint(0, max_age_ms),  # up to 1 day ago by default
         "severity": severity,
         "message": random.choice([
             "Request processed successfully",
@@ -269,7 +381,7 @@ def gen_log_entry(entity_ids=None):
 def gen_synthetic_check(endpoint_ids=None):
     endpoint_id = random.choice(endpoint_ids) if endpoint_ids else f"ep-{random.randint(100000,999999)}"
     return {
-        "check_id": f"chk-{random.randint(100000,999999)}",
+        "check_id": ids.allocate("synthetic_check"),
         "name": f"Synthetic Check for {endpoint_id}",
         "type": random.choice(["api", "browser"]),
         "endpoint_id": endpoint_id,
@@ -287,12 +399,12 @@ def gen_synthetic_check(endpoint_ids=None):
         "locations": random.sample(["us-east", "us-west", "eu-central", "ap-southeast"], k=2)
     }
 
-def gen_synthetic_run(check_id):
+def gen_synthetic_run(check_id, max_age_ms=3600000, seq=None):
     success = random.random() < 0.9  # 90% success rate
     return {
-        "run_id": f"run-{random.randint(100000,999999)}",
+        "run_id": ids.allocate("synthetic_run", seq),
         "check_id": check_id,
-        "timestamp": now_ms() - random.randint(0, 3600000),  # up to 1 hour ago
+        "timestamp": now_ms() - random.randint(0, max_age_ms),  # up to 1 hour ago by default
         "duration_ms": random.randint(100, 5000),
         "status": "success" if success else "failure",
         "status_code": 200 if success else random.choice([404, 500, 502]),
@@ -340,25 +452,23 @@ def gen_mobile_catalog():
     ]
     return {"mobile_apps": apps}
 
+def _mobile_columns(n_series, n_steps, start=None):
+    rng = engine.make_rng()
+    start = start or {}
+    crash_rates = engine.iter_walks(engine.MOBILE_CRASH_RATE_WALK, n_series, n_steps, rng,
+                                    start=start.get("crash_rate"))
+    response_times = engine.iter_walks(engine.MOBILE_RESPONSE_WALK, n_series, n_steps, rng,
+                                       start=start.get("response_time_ms"))
+    for crash_rate, response_time in zip(crash_rates, response_times):
+        yield {"crash_rate": crash_rate, "response_time_ms": response_time}
+
+def gen_mobile_metrics_batch(mobile_app_ids, minutes=60, resume=None, columnar=False):
+    # crash rate and response time walks, every minute
+    return _metric_batch("mobile_app_id", mobile_app_ids, "mobile_performance", "avg", minutes, 60_000,
+                         _mobile_columns, resume, columnar)
+
 def gen_mobile_metrics(mobile_app_id, minutes=60):
-    to = now_ms()
-    frm = to - minutes * 60_000
-    points = []
-    crash_rate = random.uniform(0.001, 0.05)  # crash rate
-    response_time = random.randint(500, 3000)  # ms
-    for t in range(frm, to, 60_000):  # every minute
-        crash_rate += random.uniform(-0.005, 0.01)
-        crash_rate = max(0.0001, min(0.1, crash_rate))
-        response_time += random.randint(-200, 400)
-        response_time = max(100, response_time)
-        points.append({"timestamp": t, "crash_rate": round(crash_rate, 4), "response_time_ms": response_time})
-    return {
-        "mobile_app_id": mobile_app_id,
-        "metric_name": "mobile_performance",
-        "aggregation": "avg",
-        "timeframe": {"from": frm, "to": to, "step_ms": 60000},
-        "points": points
-    }
+    return next(gen_mobile_metrics_batch([mobile_app_id], minutes))
 
 def gen_mobile_analyze(mobile_app_id):
     return {
@@ -374,12 +484,12 @@ def gen_mobile_analyze(mobile_app_id):
         "active_users": random.randint(500, 5000),
         "battery_drain_percent": round(random.uniform(1.0, 10.0), 2),
         "memory_usage_mb": random.randint(50, 500),
-        "issues": [gen_issue(mobile_app_id) for _ in range(random.randint(0, 2))]
+        "issues": [gen_issue(mobile_app_id, allocator="mobile_issue") for _ in range(random.randint(0, 2))]
     }
 
 # Infrastructure Monitoring Generators (v1.4.0)
 def gen_infrastructure_entity(entity_type):
-    entity_id = f"{entity_type}-{random.randint(100000,999999)}"
+    entity_id = ids.allocate(entity_type)
     base_entity = {
         "entity_id": entity_id,
         "entity_type": entity_type,
@@ -417,33 +527,13 @@ def gen_infrastructure_entity(entity_type):
 
     return base_entity
 
-def gen_infrastructure_metrics(entity_id, metric_name, minutes=60):
-    to = now_ms()
-    frm = to - minutes * 60_000
-    points = []
-    val = 0
-
-    if "cpu" in metric_name:
-        val = random.uniform(5, 30)  # CPU usage %
-    elif "memory" in metric_name:
-        val = random.uniform(40, 80)  # Memory usage %
-    elif "network" in metric_name:
-        val = random.uniform(1, 100)  # Network Mbps
-    elif "disk" in metric_name:
-        val = random.uniform(20, 90)  # Disk usage %
-
-    for t in range(frm, to, 60_000):  # every minute
-        val += random.uniform(-5, 5)
-        val = max(0, min(100, val))  # clamp to 0-100
-        points.append({"timestamp": t, "value": round(val, 2)})
+def gen_infrastructure_metrics_batch(entity_ids, metric_name, minutes=60, resume=None, columnar=False):
+    # every minute, clamped to 0-100
+    return _metric_batch("entity_id", entity_ids, metric_name, "avg", minutes, 60_000,
+                         _single_column("value", engine.infrastructure_walk(metric_name)), resume, columnar)
 
-    return {
-        "entity_id": entity_id,
-        "metric_name": metric_name,
-        "aggregation": "avg",
-        "timeframe": {"from": frm, "to": to, "step_ms": 60000},
-        "points": points
-    }
+def gen_infrastructure_metrics(entity_id, metric_name, minutes=60):
+    return next(gen_infrastructure_metrics_batch([entity_id], metric_name, minutes))
 
 def gen_infra_topology(entity_ids=None):
     if not entity_ids:
@@ -504,53 +594,23 @@ def gen_infra_topology(entity_ids=None):
     }
 
 # Application Monitoring Generators (v1.4.0)
-def gen_application_metrics(app_id, metric_name, minutes=60):
-    to = now_ms()
-    frm = to - minutes * 60_000
-    points = []
-    val = 0
-
-    if metric_name == "latency_p95_ms":
-        val = random.randint(100, 300)
-    elif metric_name == "throughput_rpm":
-        val = random.randint(1000, 10000)
-    elif metric_name == "apdex_score":
-        val = random.uniform(0.7, 0.95)
-    elif metric_name == "error_rate_percent":
-        val = random.uniform(0.1, 2.0)
-
-    for t in range(frm, to, 60_000):  # every minute
-        if metric_name == "latency_p95_ms":
-            val += random.randint(-20, 30)
-            val = max(50, val)
-        elif metric_name == "throughput_rpm":
-            val += random.randint(-500, 500)
-            val = max(100, val)
-        elif metric_name == "apdex_score":
-            val += random.uniform(-0.05, 0.05)
-            val = max(0.5, min(1.0, val))
-        elif metric_name == "error_rate_percent":
-            val += random.uniform(-0.5, 0.5)
-            val = max(0.0, min(5.0, val))
-
-        points.append({"timestamp": t, "value": round(val, 2) if isinstance(val, float) else val})
+def gen_application_metrics_batch(app_ids, metric_name, minutes=60, resume=None, columnar=False):
+    # every minute
+    aggregation = "p95" if "latency" in metric_name else "avg"
+    return _metric_batch("application_id", app_ids, metric_name, aggregation, minutes, 60_000,
+                         _single_column("value", engine.application_walk(metric_name)), resume, columnar)
 
-    return {
-        "application_id": app_id,
-        "metric_name": metric_name,
-        "aggregation": "p95" if "latency" in metric_name else "avg",
-        "timeframe": {"from": frm, "to": to, "step_ms": 60000},
-        "points": points
-    }
+def gen_application_metrics(app_id, metric_name, minutes=60):
+    return next(gen_application_metrics_batch([app_id], metric_name, minutes))
 
-def gen_application_traces(app_id, span_count=5):
-    trace_id = f"trace-{random.randint(10**15, 10**16-1)}"
+def gen_application_traces(app_id, span_count=5, max_age_ms=3600000):
+    trace_id = ids.allocate("trace")
     spans = []
 
-    start_time = now_ms() - random.randint(0, 3600000)  # up to 1 hour ago
+    start_time = now_ms() - random.randint(0, max_age_ms)  # up to 1 hour ago by default
 
     for i in range(span_count):
-        span_id = f"span-{random.randint(10**15, 10**16-1)}"
+        span_id = ids.allocate("span")
         parent_span_id = spans[-1]["span_id"] if spans else None
         duration = random.randint(10, 500)  # ms
 
@@ -712,14 +772,13 @@ def gen_host_agent_status():
         "plugins": random.sample(["java", "nodejs", "python", "kubernetes", "docker"], k=3)
     }
 
-def gen_events(entity_ids=None, count=10):
-    events = []
-    for _ in range(count):
+def iter_events(entity_ids=None, count=10, max_age_ms=86400000, first=None):
+    for n in range(count):
         entity_id = random.choice(entity_ids) if entity_ids else f"entity-{random.randint(100000,999999)}"
-        events.append({
-            "event_id": f"event-{random.randint(100000,999999)}",
+        yield {
+            "event_id": ids.allocate("event", None if first is None else first + n),
             "entity_id": entity_id,
-            "timestamp": now_ms() - random.randint(0, 86400000),  # up to 1 day ago
+            "timestamp": now_ms() - random.randint(0, max_age_ms),  # up to 1 day ago by default
             "type": random.choice(["metric_anomaly", "error_spike", "performance_degradation", "system_alert"]),
             "severity": random.choice([1, 2, 3, 4, 5]),
             "message": random.choice([
@@ -735,8 +794,10 @@ def gen_events(entity_ids=None, count=10):
                 "current_value": random.randint(80, 100),
                 "duration_minutes": random.randint(5, 30)
             }
-        })
-    return events
+        }
+
+def gen_events(entity_ids=None, count=10):
+    return list(iter_events(entity_ids, count))
 
 # User Management (v1.4.0)
 def gen_user_roles():
@@ -805,12 +866,12 @@ def gen_access_catalogs():
     return {"access_catalogs": catalogs}
 
 # Kubernetes Monitoring Generators (v1.6.0)
-def gen_kubernetes_pod(i, cluster_id, deployment_id):
-    """Generate a synthetic Kubernetes Pod record."""
+def gen_kubernetes_pod(i, cluster_id, deployment_id, seq=None):
+    """Generate a synthetic Kubernetes Pod record; seq numbers its pod_id."""
     status_choices = ["Running", "Pending", "Succeeded", "Failed", "CrashLoopBackOff"]
     status = random.choices(status_choices, weights=[80, 5, 5, 5, 5])[0]
     return {
-        "pod_id": f"pod-{random.randint(100000, 999999)}",
+        "pod_id": ids.allocate("pod", seq),
         "name": f"app-pod-{i}-{random.randint(1000, 9999)}",
         "cluster_id": cluster_id,
         "deployment_id": deployment_id,
@@ -850,7 +911,7 @@ def gen_kubernetes_deployment(i, cluster_id):
     replicas = random.randint(2, 10)
     available_replicas = replicas if random.random() > 0.1 else replicas - 1
     return {
-        "deployment_id": f"deploy-{random.randint(100000, 999999)}",
+        "deployment_id": ids.allocate("deployment"),
         "name": f"app-deployment-{i}",
         "cluster_id": cluster_id,
         "namespace": random.choice(["production", "staging"]),
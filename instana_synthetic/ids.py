@@ -0,0 +1,174 @@
+from functools import lru_cache
+
+import numpy as np
+
+from instana_synthetic import streams
+
+# Collision-free, deterministic record IDs.
+#
+# The n-th ID of an allocator is a keyed permutation of n within the ID's
+# digit range, so IDs still look random (ISS-482913) but never repeat and
+# only depend on the master seed and the sequence number. Sharded builders
+# pass the record index as the sequence number; everything else draws from
+# a per-process counter that the orchestrator resets for every dataset.
+# Allocators sharing a prefix interleave their sequence numbers, so issues
+# in issues.jsonl and issues embedded in entity records never collide
+# either. Once a digit range is used up, IDs continue with one more digit.
+
+# prefix: (digits, allocator names sharing the prefix)
+ID_SPACES = {
+    "ISS": (6, ("issue", "entity_issue", "website_issue", "mobile_issue")),
+    "app": (6, ("application",)),
+    "ep": (6, ("endpoint",)),
+    "chk": (6, ("synthetic_check",)),
+    "run": (6, ("synthetic_run",)),
+    "event": (6, ("event",)),
+    "host": (6, ("host",)),
+    "container": (6, ("container",)),
+    "process": (6, ("process",)),
+    "deploy": (6, ("deployment",)),
+    "pod": (6, ("pod",)),
+    "trace": (16, ("trace", "tree_trace")),
+    "span": (16, ("span", "tree_span")),
+}
+
+_ALLOCATORS = {name: (prefix, digits, len(names), slot)
+               for prefix, (digits, names) in ID_SPACES.items()
+               for slot, name in enumerate(names)}
+
+_next = {}
+
+def reset(counters=None):
+    """Restart every allocator counter, or continue from a counters() snapshot."""
+    _next.clear()
+    _next.update(counters or {})
+
+def counters():
+    """Snapshot of the next sequence number of every allocator used so far."""
+    return dict(_next)
+
+@lru_cache(maxsize=None)
+def _permutation(seed, prefix, digits):
+    """
+    Keyed bijection over one digit range: a multiply/xorshift mix on the
+    smallest power-of-two domain holding the range, cycle-walked back into
+    it. Works the same on Python ints and uint64 arrays.
+    """
+    size = 9 * 10 ** (digits - 1)
+    bits = (size - 1).bit_length()
+    mask = (1 << bits) - 1
+    key = streams.stream_key(seed, f"ids:{prefix}", digits)
+    a = (key & mask) | 1
+    b = (key >> 21) & mask
+    c = ((key >> 11) * 0x9E3779B97F4A7C15 & mask) | 1
+    return size, mask, a, b, c, (bits + 1) // 2
+
+def _mix(x, size, mask, a, b, c, shift):
+    x = (x * a + b) & mask
+    x ^= x >> shift
+    return (x * c) & mask
+
+def _permute(index, params):
+    x = _mix(index, *params)
+    while x >= params[0]:
+        x = _mix(x, *params)
+    return x
+
+def make_id(name, seq):
+    """Return the ID with sequence number `seq` of allocator `name`."""
+    prefix, digits, stride, slot = _ALLOCATORS[name]
+    index = seq * stride + slot
+    seed = streams.get_seed()
+    params = _permutation(seed, prefix, digits)
+    while index >= params[0]:
+        index -= params[0]
+        digits += 1
+        params = _permutation(seed, prefix, digits)
+    return f"{prefix}-{10 ** (digits - 1) + _permute(index, params)}"
+
+def make_numbers(name, seqs):
+    """
+    Vectorized make_id() returning only the numeric part: make_id(name, n)
+    is f"{prefix}-{make_numbers(name, [n])[0]}". Returns an int64 array.
+    """
+    prefix, digits, stride, slot = _ALLOCATORS[name]
+    index = np.asarray(seqs, dtype=np.uint64) * np.uint64(stride) + np.uint64(slot)
+    seed = streams.get_seed()
+    numbers = np.empty(len(index), dtype=np.uint64)
+    todo = np.arange(len(index))
+    while len(todo):
+        params = tuple(np.uint64(v) for v in _permutation(seed, prefix, digits))
+        fits = index[todo] < params[0]
+        x = _mix(index[todo[fits]], *params)
+        walk = np.flatnonzero(x >= params[0])
+        while len(walk):
+            x[walk] = _mix(x[walk], *params)
+            walk = walk[x[walk] >= params[0]]
+        numbers[todo[fits]] = x + np.uint64(10 ** (digits - 1))
+        todo = todo[~fits]
+        index[todo] -= params[0]
+        digits += 1
+    return numbers.astype(np.int64)
+
+def allocate(name, seq=None):
+    """
+    Allocate an ID.
+
+    Args:
+        name: Allocator name, e.g. "pod" (see ID_SPACES)
+        seq: Sequence number, e.g. the record index of a sharded dataset.
+             Defaults to the allocator's next unused number.
+
+    Returns:
+        ID string such as "pod-731204"
+    """
+    if seq is None:
+        seq = _next.get(name, 0)
+    _next[name] = max(_next.get(name, 0), seq + 1)
+    return make_id(name, seq)
+
+class Interner:
+    """
+    String <-> dense integer table for joining datasets with integer arrays,
+    e.g. pods to deployments to clusters:
+
+        table = Interner()
+        pod_deployments = table.codes(p["deployment_id"] for p in pods)
+        rows = table.rows(table.codes(d["deployment_id"] for d in deployments))
+        deployment_row_of_pod = rows[pod_deployments]   # -1 where unknown
+    """
+
+    def __init__(self, strings=()):
+        self.strings = []
+        self._codes = {}
+        for s in strings:
+            self.intern(s)
+
+    def __len__(self):
+        return len(self.strings)
+
+    def intern(self, s):
+        """Return the code of `s`, adding it to the table if it is new."""
+        code = self._codes.get(s)
+        if code is None:
+            code = self._codes[s] = len(self.strings)
+            self.strings.append(s)
+        return code
+
+    def codes(self, values):
+        """Intern every value and return their codes as an int64 array."""
+        return np.fromiter((self.intern(v) for v in values), dtype=np.int64)
+
+    def lookup(self, codes):
+        """Map codes back to strings."""
+        return [self.strings[c] for c in np.asarray(codes).tolist()]
+
+    def rows(self, codes):
+        """
+        Inverse index of a key column: array over all codes holding the row
+        at which each code appears in `codes`, -1 for codes not present.
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        rows = np.full(len(self.strings), -1, dtype=np.int64)
+        rows[codes] = np.arange(len(codes))
+        return rows
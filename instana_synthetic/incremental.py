@@ -0,0 +1,215 @@
+import json
+import os
+import random
+
+from instana_synthetic import columnar, compression, eventstore, ids, rollups, streams, tsdb
+from instana_synthetic.datasets import DATA_DIR, load_ids
+from instana_synthetic.generators import (
+    now_ms, write_jsonl,
+    gen_timeseries_batch, gen_website_metrics_batch, gen_mobile_metrics_batch,
+    gen_infrastructure_metrics_batch, gen_application_metrics_batch,
+    gen_log_entry, gen_synthetic_run, gen_application_traces, iter_events,
+)
+
+# Append ("delta") mode: continue existing datasets instead of rewriting them.
+#
+# Every appendable file has a small state file under <out_dir>/.append_state/
+# holding its watermark (the generation time of the last cycle), its size at
+# that point and, for metric files, the last point of every series. A cycle
+# only reads that state, generates the window between the watermark and now,
+# appends it and advances the state, so it costs O(new data). A file without
+# a matching state (first append, or rewritten by a full generation since)
+# is scanned once to rebuild it. Compressed files are appended to with new
+# gzip members / zstd frames. Record-stream states also keep the ID
+# allocator counters, so appended records never reuse an existing ID, and
+# the IDs the records refer to (e.g. the entities of events), so appended
+# records point at the same ones.
+
+STATE_DIR = ".append_state"
+
+def _data_path(out_dir, filename):
+    """The existing (possibly compressed) file of a dataset."""
+    return compression.resolve(os.path.join(out_dir, filename))
+
+def _state_path(out_dir, filename):
+    return os.path.join(out_dir, STATE_DIR, filename + ".json")
+
+def load_state(out_dir, filename):
+    """Return the saved append state of a dataset file, or None."""
+    try:
+        with open(_state_path(out_dir, filename)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def save_state(out_dir, filename, state):
+    """Atomically replace the append state of a dataset file."""
+    path = _state_path(out_dir, filename)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    state = dict(state, size=compression.dataset_stat(_data_path(out_dir, filename))[0])
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f)
+    os.replace(path + ".tmp", path)
+
+def scan_metric_file(path, id_key):
+    """Full pass over a metric file: watermark and last point per (metric, series)."""
+    state = {"to": 0, "series": {}}
+    with compression.open_text(path) as f:
+        for line in f:
+            record = json.loads(line)
+            state["to"] = max(state["to"], record["timeframe"]["to"])
+            if not record["points"]:
+                continue
+            series = state["series"].setdefault(record["metric_name"], {})
+            last = record["points"][-1]
+            previous = series.get(record[id_key])
+            if previous is None or last["timestamp"] > previous["timestamp"]:
+                series[record[id_key]] = last
+    return state
+
+def scan_record_file(path, time_key, allocated=None, refs=None):
+    """
+    Full pass over a record-stream file: watermark is the latest timestamp.
+    allocated(record) names the ID allocator of every ID in a record; the
+    allocator counters continue after the IDs counted in the file. The
+    distinct values of the `refs` field are kept as the state's "refs".
+    """
+    to = 0
+    counters = {}
+    values = set()
+    with compression.open_text(path) as f:
+        for line in f:
+            record = json.loads(line)
+            to = max(to, record[time_key])
+            for name in allocated(record) if allocated else ():
+                counters[name] = counters.get(name, 0) + 1
+            if refs and record.get(refs):
+                values.add(record[refs])
+    state = {"to": to, "ids": counters}
+    if refs:
+        state["refs"] = sorted(values)
+    return state
+
+def _current_state(out_dir, filename, scan, required=()):
+    path = _data_path(out_dir, filename)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{path} does not exist; run a full generation before appending")
+    state = load_state(out_dir, filename)
+    if (state is None or state.get("size") != compression.dataset_stat(path)[0]
+            or any(key not in state for key in required)):
+        state = scan(path)
+    return state
+
+def append_metrics(out_dir, filename, id_key, batch):
+    """
+    Continue every series of a metric file up to now and append the new window.
+
+    Args:
+        out_dir: Dataset directory
+        filename: Metric JSONL file, e.g. metrics_timeseries.jsonl
+        id_key: Series ID field of the records
+        batch: batch(ids, metric_name, resume) -> iterator of records
+
+    Returns:
+        Number of records appended
+
+    Raises:
+        ValueError: if the dataset only exists in the columnar layout
+    """
+    path = _data_path(out_dir, filename)
+    if not os.path.exists(path) and columnar.is_fresh(path):
+        raise ValueError(f"{path} only exists in the columnar layout, which cannot be appended to; "
+                         "generate it with --metrics-format jsonl or both to use --append")
+    state = _current_state(out_dir, filename, lambda path: scan_metric_file(path, id_key))
+    streams.seed_stream(filename, f"append:{state['to']}")
+    to = now_ms()
+
+    def records():
+        for metric_name, series in state["series"].items():
+            for record in batch(list(series), metric_name, series):
+                series[record[id_key]] = record["points"][-1]
+                yield record
+
+    count = write_jsonl(path, records(), append=True)
+    state["to"] = max(state["to"], to)
+    save_state(out_dir, filename, state)
+    if os.path.isdir(tsdb.store_dir(path)):
+        # Roll up just the appended points while they are at hand
+        rollups.update_rollups(tsdb.open_store(path))
+    return count
+
+def append_records(out_dir, filename, time_key, make_records, allocated=None, refs=None):
+    """
+    Append records whose timestamps fall between the file's watermark and now.
+
+    make_records(max_age_ms) returns the records to append; every timestamp
+    must be at most max_age_ms before now. With `refs` (a record field),
+    make_records(max_age_ms, values) also gets the values of that field
+    already in the file. allocated and refs are passed on to
+    scan_record_file().
+    """
+    state = _current_state(out_dir, filename, lambda path: scan_record_file(path, time_key, allocated, refs),
+                           required=("refs",) if refs else ())
+    to = now_ms()
+    max_age_ms = to - state["to"] - 1
+    if max_age_ms < 0:
+        return 0
+    streams.seed_stream(filename, f"append:{state['to']}")
+    ids.reset(state.get("ids"))
+    path = _data_path(out_dir, filename)
+    records = make_records(max_age_ms, state["refs"]) if refs else make_records(max_age_ms)
+    if eventstore.is_stored(path):
+        count = eventstore.write_through(path, records,
+                                         lambda p, records: write_jsonl(p, records, append=True), append=True)
+    else:
+        count = write_jsonl(path, records, append=True)
+    new_state = {"to": to, "ids": ids.counters()}
+    if refs:
+        new_state["refs"] = state["refs"]
+    save_state(out_dir, filename, new_state)
+    return count
+
+# Metric datasets
+def append_timeseries(out_dir=DATA_DIR):
+    return append_metrics(out_dir, "metrics_timeseries.jsonl", "entity_id",
+                          lambda ids, metric, resume: gen_timeseries_batch(ids, metric, resume=resume))
+
+def append_website_metrics(out_dir=DATA_DIR):
+    return append_metrics(out_dir, "website_metrics.jsonl", "website_id",
+                          lambda ids, metric, resume: gen_website_metrics_batch(ids, resume=resume))
+
+def append_mobile_metrics(out_dir=DATA_DIR):
+    return append_metrics(out_dir, "mobile_metrics.jsonl", "mobile_app_id",
+                          lambda ids, metric, resume: gen_mobile_metrics_batch(ids, resume=resume))
+
+def append_infrastructure_metrics(out_dir=DATA_DIR):
+    return append_metrics(out_dir, "infrastructure_metrics.jsonl", "entity_id",
+                          lambda ids, metric, resume: gen_infrastructure_metrics_batch(ids, metric, resume=resume))
+
+def append_application_metrics(out_dir=DATA_DIR):
+    return append_metrics(out_dir, "application_metrics.jsonl", "application_id",
+                          lambda ids, metric, resume: gen_application_metrics_batch(ids, metric, resume=resume))
+
+# Record-stream datasets; count is the number of new records per cycle
+def append_logs(out_dir=DATA_DIR, count=100):
+    entity_ids = [f"srv-{15284626 + i}" for i in range(10)]  # same sample as generate_logs
+    return append_records(out_dir, "logs.jsonl", "timestamp",
+                          lambda age: (gen_log_entry(entity_ids, age) for _ in range(count)))
+
+def append_events(out_dir=DATA_DIR, count=50):
+    # New events refer to the entities of the existing ones
+    return append_records(out_dir, "events.jsonl", "timestamp",
+                          lambda age, entity_ids: iter_events(entity_ids, count, age),
+                          lambda r: ("event",), refs="entity_id")
+
+def append_synthetic_runs(out_dir=DATA_DIR, count=100):
+    check_ids = load_ids(out_dir, "synthetic_checks.jsonl", "check_id")
+    return append_records(out_dir, "synthetic_runs.jsonl", "timestamp",
+                          lambda age: (gen_synthetic_run(random.choice(check_ids), age) for _ in range(count)),
+                          lambda r: ("synthetic_run",))
+
+def append_application_traces(out_dir=DATA_DIR, count=10):
+    app_ids = load_ids(out_dir, "applications.jsonl", "application_id")
+    return append_records(out_dir, "application_traces.jsonl", "start_time",
+                          lambda age: (gen_application_traces(random.choice(app_ids), 5, age) for _ in range(count)),
+                          lambda r: ["trace"] + ["span"] * len(r["spans"]))
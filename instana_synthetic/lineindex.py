@@ -0,0 +1,316 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+
+import numpy as np
+
+from instana_synthetic import compression, links, locks
+
+# Persisted line index for record-stream datasets.
+#
+#   data/instana/logs.lineidx/part-00001.npz
+#                            /part-00002.npz   ...
+#
+# Each part covers a run of lines of the dataset (the file and its segments
+# as one stream, see compression.py) and holds, per line, its byte offset
+# (the offset of its gzip member / zstd frame in a compressed file) and its
+# record time, plus postings:
+#
+#   by_time                  line numbers in record time order
+#   <field>.values           distinct values of an ID field, sorted
+#   <field>.start, .rows     the lines holding each value (CSR)
+#
+# query() binary-searches the time and ID postings of every part and reads
+# only the matching lines (decompressing only the frames that hold them), so
+# a lookup costs O(matching lines) instead of a pass over the file.
+#
+# Parts are written together with the data: write_lines() indexes the lines
+# it wrote (a rewrite starts the index over, an append adds a part for its
+# tail), and update() catches up with lines written any other way. Parts
+# are new files, merged like dataset segments (links.to_merge()), so an
+# index never changes a file a published snapshot links to. Inside a
+# published snapshot the index is only read; lines it does not cover are
+# scanned.
+
+# filename: (time field, indexed ID fields)
+INDEXED = {
+    "logs.jsonl": ("timestamp", ("entity_id", "correlation_id")),
+    "events.jsonl": ("timestamp", ("entity_id",)),
+    "synthetic_runs.jsonl": ("timestamp", ("check_id",)),
+    "issues.jsonl": ("start_time", ("entity_id",)),
+}
+
+# Leading bytes compared to tell an append from a rewrite of the file
+HEAD_BYTES = 1 << 16
+
+_PART = re.compile(r"^part-(\d{5})\.npz$")
+
+_parts = {}  # part file -> (stat key, arrays)
+_lock = threading.Lock()
+
+def is_indexed(path):
+    return os.path.basename(compression.strip_extension(path)) in INDEXED
+
+def index_dir(path):
+    """Index directory of a dataset: logs.lineidx next to logs.jsonl (or logs.jsonl.gz)."""
+    return compression.strip_extension(path)[:-len(".jsonl")] + ".lineidx"
+
+def _spec(path):
+    return INDEXED[os.path.basename(compression.strip_extension(path))]
+
+def _head_digest(source, size):
+    """Digest of the first `size` bytes of a dataset, to tell an append from a rewrite."""
+    with compression.open_raw(source) as f:
+        return hashlib.blake2b(f.read(size), digest_size=16).hexdigest()
+
+def _find_parts(directory):
+    """(number, path) of the parts of an index, in order."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return sorted((int(m.group(1)), os.path.join(directory, m.group(0))) for m in map(_PART.match, names) if m)
+
+def _load_part(path):
+    stat = os.stat(path)
+    key = (stat.st_ino, stat.st_mtime_ns)
+    with _lock:
+        cached = _parts.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    with np.load(path, allow_pickle=False) as data:
+        part = {name: data[name] for name in data.files}
+    part["sorted_time"] = part["time"][part["by_time"]]
+    with _lock:
+        _parts[path] = (key, part)
+        for gone in [p for p in _parts if not os.path.exists(p)]:
+            del _parts[gone]  # merged, rewritten or removed with its snapshot
+    return part
+
+def _load(source):
+    """
+    The parts of a dataset's index and the bytes they cover; ([], 0) when
+    there is no index or it belongs to an earlier state of the file.
+    """
+    parts = [_load_part(p) for _, p in _find_parts(index_dir(source))]
+    if not parts:
+        return [], 0
+    first = parts[0]
+    size = compression.dataset_stat(source)[0]
+    if (str(first["source"]) != os.path.basename(source) or int(first["start"]) != 0
+            or any(int(a["end"]) != int(b["start"]) for a, b in zip(parts, parts[1:]))
+            or int(parts[-1]["end"]) > size
+            or _head_digest(source, int(first["head_size"])) != str(first["head"])):
+        return [], 0
+    return parts, int(parts[-1]["end"])
+
+def _scan(source, start, codec, time_key, fields):
+    """
+    Lines of a dataset from byte `start` on.
+
+    Returns:
+        (offsets, times, {field: values}, end of the last complete line or frame)
+    """
+    offsets, times, values = [], [], {field: [] for field in fields}
+    end = start
+
+    def add(offset, line):
+        record = json.loads(line)
+        offsets.append(offset)
+        times.append(record.get(time_key) or 0)
+        for field in fields:
+            value = record.get(field)
+            values[field].append(None if value is None else str(value))
+
+    size = compression.dataset_stat(source)[0]
+    with compression.open_raw(source) as f:
+        if codec is not None:
+            for offset, block in compression.iter_frames(f, codec, start):
+                if offset >= size:
+                    break  # appended after the scan started; the next update takes it
+                for line in block.splitlines():
+                    if line.strip():
+                        add(offset, line)
+            end = max(start, size)
+        else:
+            f.seek(start)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                if line.strip():
+                    add(end, line)
+                end += len(line)
+    return offsets, times, values, end
+
+def _postings(values):
+    """(sorted distinct values, CSR starts, rows) of per-line values; None is left out."""
+    rows = np.array([i for i, v in enumerate(values) if v is not None], dtype=np.int64)
+    present = np.array([values[i] for i in rows.tolist()], dtype=str)
+    order = np.argsort(present, kind="stable")
+    distinct, first = np.unique(present[order], return_index=True)
+    return distinct, np.append(first, len(rows)).astype(np.int64), rows[order]
+
+def _line_values(part, field):
+    """Per-line values of an ID field of a part (None where missing)."""
+    values = np.full(len(part["offset"]), None, dtype=object)
+    values[part[f"{field}.rows"]] = np.repeat(part[f"{field}.values"], np.diff(part[f"{field}.start"]))
+    return values.tolist()
+
+def _write_part(directory, number, source, codec, start, end, head, offsets, times, values):
+    arrays = {
+        "source": np.array(os.path.basename(source)), "compression": np.array(codec or "none"),
+        "start": np.array(start, dtype=np.int64), "end": np.array(end, dtype=np.int64),
+        "head": np.array(head[0]), "head_size": np.array(head[1], dtype=np.int64),
+        "offset": np.asarray(offsets, dtype=np.int64), "time": np.asarray(times, dtype=np.int64),
+    }
+    arrays["by_time"] = np.argsort(arrays["time"], kind="stable")
+    for field, per_line in values.items():
+        arrays[f"{field}.values"], arrays[f"{field}.start"], arrays[f"{field}.rows"] = _postings(per_line)
+    path = os.path.join(directory, f"part-{number:05d}.npz")
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+def index_tail(path, rebuild=False):
+    """
+    Index the lines of a dataset its index does not cover yet, in a new part
+    (merged with the newest parts when links.to_merge() says so). The
+    caller holds the dataset's file lock, or is its only writer.
+
+    Args:
+        path: Dataset path, e.g. data/instana/logs.jsonl (compressed variants are found)
+        rebuild: Start the index over, e.g. after a rewrite of the file
+
+    Returns:
+        Number of lines indexed
+    """
+    source = compression.resolve(path)
+    if not os.path.exists(source) or links.is_published(source):
+        return 0
+    directory = index_dir(source)
+    time_key, fields = _spec(source)
+    codec = compression.compression_of(source)
+    parts, start = ([], 0) if rebuild else _load(source)
+    if not parts and os.path.exists(directory):
+        shutil.rmtree(directory)
+    offsets, times, values, end = _scan(source, start, codec, time_key, fields)
+    if not offsets:
+        return 0
+    count = len(offsets)
+    os.makedirs(directory, exist_ok=True)
+    found = _find_parts(directory)
+    merged = links.to_merge(found)
+    if merged:
+        old = parts[len(parts) - len(merged):]
+        start = int(old[0]["start"])
+        offsets = np.concatenate([p["offset"] for p in old] + [np.asarray(offsets, dtype=np.int64)])
+        times = np.concatenate([p["time"] for p in old] + [np.asarray(times, dtype=np.int64)])
+        values = {field: [v for p in old for v in _line_values(p, field)] + values[field] for field in fields}
+    if parts:
+        head = str(parts[0]["head"]), int(parts[0]["head_size"])
+    else:
+        head = _head_digest(source, min(end, HEAD_BYTES)), min(end, HEAD_BYTES)
+    _write_part(directory, (found[-1][0] + 1) if found else 1, source, codec, start, end, head,
+                offsets, times, values)
+    for _, part_path in merged:
+        os.remove(part_path)
+    return count
+
+def update(path, rebuild=False):
+    """Bring a dataset's index up to date with the file (see index_tail()), holding its file lock."""
+    source = compression.resolve(path)
+    if not os.path.exists(source) or links.is_published(source):
+        return 0
+    with locks.exclusive(locks.file_lock(source)):
+        return index_tail(source, rebuild)
+
+def _match(part, start, end, lookups):
+    """Sorted line numbers of a part whose time and indexed IDs match."""
+    rows = None
+    for field, value in lookups.items():
+        distinct = part[f"{field}.values"]
+        i = int(np.searchsorted(distinct, value))
+        if i == len(distinct) or distinct[i] != value:
+            return np.empty(0, dtype=np.int64)
+        found = np.sort(part[f"{field}.rows"][part[f"{field}.start"][i]:part[f"{field}.start"][i + 1]])
+        rows = found if rows is None else np.intersect1d(rows, found, assume_unique=True)
+    if start is not None or end is not None:
+        lo = 0 if start is None else int(np.searchsorted(part["sorted_time"], start, side="left"))
+        hi = len(part["sorted_time"]) if end is None else int(np.searchsorted(part["sorted_time"], end, side="right"))
+        in_range = np.sort(part["by_time"][lo:hi])
+        rows = in_range if rows is None else np.intersect1d(rows, in_range, assume_unique=True)
+    return np.arange(len(part["offset"])) if rows is None else rows
+
+def _read_rows(f, part, rows, codec):
+    """Yield the records of the given lines of a part, in file order."""
+    offsets = part["offset"]
+    if codec is None:
+        for row in rows.tolist():
+            f.seek(int(offsets[row]))
+            yield json.loads(f.readline())
+        return
+    firsts = np.searchsorted(offsets, offsets[rows], side="left").tolist()
+    frame, lines = None, []
+    for row, first in zip(rows.tolist(), firsts):
+        if int(offsets[row]) != frame:
+            frame = int(offsets[row])
+            lines = [line for line in compression.read_frame(f, codec, frame).splitlines() if line.strip()]
+        yield json.loads(lines[row - first])
+
+def _read_tail(source, start, codec):
+    """Yield the records from byte `start` on (lines no index covers yet)."""
+    with compression.open_raw(source) as f:
+        if codec is not None:
+            for _, block in compression.iter_frames(f, codec, start):
+                for line in block.splitlines():
+                    if line.strip():
+                        yield json.loads(line)
+            return
+        f.seek(start)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            if line.strip():
+                yield json.loads(line)
+
+def query(path, start=None, end=None, **ids):
+    """
+    Records of an indexed dataset matching a time range and/or field values.
+
+    Args:
+        path: Dataset path, e.g. data/instana/logs.jsonl
+        start, end: Optional inclusive time range (epoch ms) on the dataset's time field
+        **ids: Record fields to match, e.g. entity_id="srv-15284626"; the
+               indexed ones (INDEXED) narrow the lines read
+
+    Returns:
+        List of records in file order
+
+    Raises:
+        FileNotFoundError: if the dataset does not exist
+    """
+    source = compression.resolve(path)
+    if not os.path.exists(source):
+        raise FileNotFoundError(f"No dataset at {path}")
+    if not links.is_published(source):
+        update(source)
+    time_key, fields = _spec(source)
+    codec = compression.compression_of(source)
+    parts, covered = _load(source)
+    lookups = {k: str(v) for k, v in ids.items() if k in fields and v is not None}
+
+    def matches(record):
+        time = record.get(time_key) or 0
+        return ((start is None or time >= start) and (end is None or time <= end)
+                and all(record.get(k) == v for k, v in ids.items()))
+
+    records = []
+    with compression.open_raw(source) as f:
+        for part in parts:
+            records.extend(r for r in _read_rows(f, part, _match(part, start, end, lookups), codec) if matches(r))
+    records.extend(r for r in _read_tail(source, covered, codec) if matches(r))
+    return records
@@ -0,0 +1,135 @@
+import os
+import re
+import shutil
+
+from instana_synthetic import compression
+
+# Files shared between snapshot versions by hard links.
+#
+# A staging directory starts as hard links to the files of the current
+# snapshot (link_tree()), so staging costs O(number of files), not O(data).
+# A link is only safe while nobody writes into the file, so:
+#
+#   - writers that create a new file and rename it over the old one (store
+#     segments, index.json, rollups, line index parts, append state,
+#     headers) replace the link and need nothing else
+#   - appends to a dataset file write into append_target(): the file, or a
+#     new segment next to it (see compression.py) when the file is shared,
+#     so an append costs O(new data) whatever the size of the dataset
+#   - truncating rewrites call detach() first, which drops the segments and
+#     unlinks a shared file, so the rewrite starts a fresh one
+#   - the SQLite event store follows the same pattern with segment databases
+#     (see eventstore.py)
+#
+# Published snapshots are never written: is_published() tells sidecar code
+# (time-series stores, rollups, event store, line indexes) to open what the
+# generator built before publishing instead of building it lazily.
+
+# A directory published by snapshots.publish(): .../snapshots/v000042/...
+_PUBLISHED = re.compile(r"(^|/)snapshots/v\d+(?:/|$)")
+
+def is_published(path):
+    """Whether a path lies inside a published (immutable) snapshot version."""
+    return _PUBLISHED.search(os.path.abspath(path).replace(os.sep, "/")) is not None
+
+def unversioned(path):
+    """
+    The same path in every snapshot version, with its snapshots/v<N>/ part
+    removed: a key for per-dataset state that carries over from one version
+    to the next.
+    """
+    return _PUBLISHED.sub(r"\1", os.path.abspath(path).replace(os.sep, "/"), count=1)
+
+def _link(source, target):
+    try:
+        os.link(source, target)
+    except OSError:  # e.g. a file system without hard links
+        shutil.copy2(source, target)
+
+# Most segments a dataset file keeps; the next one starts as a merge of them
+MAX_SEGMENTS = 8
+
+def link_tree(source, target, ignore=(), skip=lambda name: False):
+    """
+    Populate `target` with hard links to the files under `source`.
+
+    Args:
+        source, target: Directories; target may exist
+        ignore: Names skipped at the top level of source
+        skip: skip(name) -> True for files left out at any level (e.g. lock files)
+    """
+    for directory, dirs, files in os.walk(source):
+        if directory == source:
+            dirs[:] = [d for d in dirs if d not in ignore]
+            files = [f for f in files if f not in ignore]
+        destination = os.path.join(target, os.path.relpath(directory, source))
+        os.makedirs(destination, exist_ok=True)
+        for name in files:
+            if not skip(name):
+                _link(os.path.join(directory, name), os.path.join(destination, name))
+
+def is_shared(path):
+    """Whether a file has other links, e.g. into a published snapshot."""
+    try:
+        return os.stat(path).st_nlink > 1
+    except FileNotFoundError:
+        return False
+
+def append_target(path):
+    """
+    The file an append to a dataset file should write into: the last of the
+    file and its segments, or a new segment when that one is shared.
+
+    A new segment may start as a copy of the newest segments (see
+    to_merge()), which are removed; appends never copy the file itself.
+    Callers hold the dataset's file lock.
+    """
+    found = compression.segments(path)
+    last = found[-1][1] if found else path
+    if not is_shared(last):
+        return last
+    target = compression.segment_path(path, found[-1][0] + 1 if found else 1)
+    merged = to_merge(found)
+    if merged:
+        tmp = target + ".tmp"
+        with open(tmp, "wb") as out:
+            for _, segment in merged:
+                with open(segment, "rb") as f:
+                    shutil.copyfileobj(f, out, 1 << 20)
+        os.replace(tmp, target)
+        for _, segment in merged:
+            os.remove(segment)
+    return target
+
+def to_merge(found):
+    """
+    The newest of a file's segments that its next segment should start as a
+    merge of (possibly none).
+
+    Segments are merged like a binary counter: the newest ones are merged as
+    soon as they are at least as large as the segment before them, so every
+    byte is copied O(log n) times and sizes shrink from oldest to newest. All
+    of them are merged once there are MAX_SEGMENTS.
+
+    Args:
+        found: [(number, path)] of the segments, as from compression.segments()
+    """
+    sizes = [os.path.getsize(p) for _, p in found]
+    run, total = 1, sum(sizes[-1:])
+    while run < len(sizes) and sizes[-run - 1] <= total:
+        total += sizes[-run - 1]
+        run += 1
+    if run > 1:
+        return found[-run:]
+    return found if len(found) >= MAX_SEGMENTS else []
+
+def detach(path):
+    """
+    Prepare a dataset file for a rewrite in place: its segments are removed,
+    and the file itself too when it is shared, so the rewrite cannot change
+    another link of it.
+    """
+    for _, segment in compression.segments(path):
+        os.remove(segment)
+    if is_shared(path):
+        os.remove(path)
@@ -0,0 +1,34 @@
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: writers are then not serialized
+    fcntl = None
+
+# Advisory locks serializing the writers of one dataset file or store.
+#
+# A lock is an flock() on a small lock file next to what it protects, e.g.
+# data/instana/.logs.jsonl.lock or data/instana/mobile_metrics.tsdb/.lock.
+# The lock file itself is never replaced, so a writer that waited for the
+# lock still holds it on the file the others use, even when the protected
+# file was swapped with os.replace() meanwhile. flock() locks belong to the
+# open file, so threads of one process exclude each other as well; a holder
+# must not take the same lock again.
+
+@contextmanager
+def exclusive(lock_path):
+    """Hold an exclusive lock on lock_path (created if missing) for the block."""
+    with open(lock_path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def file_lock(path):
+    """Lock file of a dataset file: .<name>.lock in the same directory."""
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.lock")
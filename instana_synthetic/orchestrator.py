@@ -0,0 +1,316 @@
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from instana_synthetic import datasets, eventstore, generators, ids, incremental, lineindex, streams
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+log = logging.getLogger("orchestrator")
+
+# Named scale profiles: consistent counts across all datasets. "small" keeps
+# the historical toy sizes; "xl" is about 100k entities and 10M pods/log lines.
+PROFILES = {
+    "small": {"entities": 120, "apps": 15, "services": 40, "issues": 30, "minutes": 60,
+              "logs": 100, "synthetic_checks": 20, "synthetic_runs": 100, "events": 50,
+              "websites": 10, "mobile_apps": 10, "metric_entities": 20, "metric_apps": 20,
+              "clusters": 10, "deployments_per_cluster": 5, "pods_per_deployment": 3, "traces": 1_000, "shards": 1},
+    "medium": {"entities": 5_000, "apps": 200, "services": 1_000, "issues": 5_000, "minutes": 60,
+               "logs": 500_000, "synthetic_checks": 200, "synthetic_runs": 200_000, "events": 100_000,
+               "websites": 100, "mobile_apps": 100, "metric_entities": 1_000, "metric_apps": 200,
+               "clusters": 50, "deployments_per_cluster": 20, "pods_per_deployment": 50, "traces": 100_000,
+               "shards": 2},
+    "large": {"entities": 25_000, "apps": 1_000, "services": 5_000, "issues": 50_000, "minutes": 60,
+              "logs": 2_000_000, "synthetic_checks": 1_000, "synthetic_runs": 1_000_000, "events": 1_000_000,
+              "websites": 500, "mobile_apps": 500, "metric_entities": 5_000, "metric_apps": 1_000,
+              "clusters": 100, "deployments_per_cluster": 100, "pods_per_deployment": 100, "traces": 1_000_000,
+              "shards": 8},
+    "xl": {"entities": 100_000, "apps": 5_000, "services": 20_000, "issues": 500_000, "minutes": 60,
+           "logs": 10_000_000, "synthetic_checks": 2_000, "synthetic_runs": 5_000_000, "events": 5_000_000,
+           "websites": 1_000, "mobile_apps": 1_000, "metric_entities": 10_000, "metric_apps": 2_000,
+           "clusters": 200, "deployments_per_cluster": 500, "pods_per_deployment": 100, "traces": 10_000_000,
+           "shards": 32},
+}
+
+def build_plan(entities=120, apps=15, services=40, issues=30, minutes=60,
+               logs=100, synthetic_checks=20, synthetic_runs=100, events=50,
+               websites=10, mobile_apps=10, metric_entities=20, metric_apps=20,
+               clusters=10, deployments_per_cluster=5, pods_per_deployment=3, traces=1_000, shards=1,
+               metrics_format="jsonl"):
+    """
+    Build the dataset dependency graph used by generate_instana_all.py.
+    The keyword arguments match the keys of a PROFILES entry.
+
+    Args:
+        shards: Number of shards each record-stream dataset (datasets.SHARDABLE)
+                is split into; the merged output does not depend on it
+        metrics_format: Output format of the metric datasets and trace spans,
+                        one of datasets.METRIC_FORMATS
+
+    Returns:
+        Dict of dataset name -> {"func", "kwargs", "deps", "shards"}. A dataset
+        only starts once every dataset in its "deps" list has been written.
+    """
+    def task(func, deps=(), **kwargs):
+        return {"func": func, "kwargs": kwargs, "deps": list(deps), "shards": 1}
+
+    entity_deps = ["infrastructure_entities"]
+    app_deps = ["applications"]
+
+    plan = {
+        # Core APM datasets
+        "infrastructure_entities": task(datasets.generate_infrastructure_entities, count=entities),
+        "applications": task(datasets.generate_applications, count=apps),
+        "endpoints": task(datasets.generate_endpoints, count=services),
+        "issues": task(datasets.generate_issues, entity_deps, count=issues),
+        "timeseries": task(datasets.generate_timeseries, entity_deps, minutes=minutes, fmt=metrics_format),
+        "alert_configs": task(datasets.generate_alert_configs, entity_deps),
+        "catalogs": task(datasets.generate_catalogs),
+
+        # Website monitoring
+        "website_config": task(datasets.generate_website_config, count=websites),
+        "website_catalog": task(datasets.generate_website_catalog),
+        "website_metrics": task(datasets.generate_website_metrics, count=websites, minutes=minutes, fmt=metrics_format),
+        "website_analyze": task(datasets.generate_website_analyze, count=websites),
+
+        # Logging and synthetic checks
+        "logs": task(datasets.generate_logs, count=logs),
+        "synthetic_checks": task(datasets.generate_synthetic_checks, count=synthetic_checks),
+        "synthetic_runs": task(datasets.generate_synthetic_runs, ["synthetic_checks"], count=synthetic_runs),
+
+        # Mobile monitoring
+        "mobile_config": task(datasets.generate_mobile_config, count=mobile_apps),
+        "mobile_catalog": task(datasets.generate_mobile_catalog),
+        "mobile_metrics": task(datasets.generate_mobile_metrics, count=mobile_apps, minutes=minutes, fmt=metrics_format),
+        "mobile_analyze": task(datasets.generate_mobile_analyze, count=mobile_apps),
+
+        # v1.4.0 infrastructure monitoring
+        "infrastructure_metrics": task(datasets.generate_infrastructure_metrics, entity_deps, count=metric_entities, minutes=minutes,
+                                       fmt=metrics_format),
+        "infra_topology": task(datasets.generate_infra_topology, entity_deps, count=5),
+
+        # v1.4.0 application enhancements
+        "application_metrics": task(datasets.generate_application_metrics, app_deps, count=metric_apps, minutes=minutes,
+                                    fmt=metrics_format),
+        "application_traces": task(datasets.generate_application_traces, app_deps, count=10),
+        "app_topology": task(datasets.generate_app_topology, count=5),
+        "trace_spans": task(datasets.generate_trace_spans, app_deps + ["app_topology"], traces=traces,
+                            fmt=metrics_format),
+        "app_settings": task(datasets.generate_app_settings, app_deps, count=10),
+
+        # v1.4.0 alert configurations, event settings and host agent
+        "global_alert_configs": task(datasets.generate_global_alert_configs, count=10),
+        "infra_alert_configs": task(datasets.generate_infra_alert_configs, count=10),
+        "event_settings": task(datasets.generate_event_settings, count=5),
+        "host_agent_status": task(datasets.generate_host_agent_status, count=20),
+        "events": task(datasets.generate_events, count=events),
+
+        # v1.4.0 user management
+        "user_roles": task(datasets.generate_user_roles),
+        "api_tokens": task(datasets.generate_api_tokens, count=5),
+        "access_catalogs": task(datasets.generate_access_catalogs),
+
+        # v1.6.0 Kubernetes monitoring
+        "kubernetes_clusters": task(datasets.generate_kubernetes_clusters, count=clusters),
+        "kubernetes_deployments": task(datasets.generate_kubernetes_deployments, ["kubernetes_clusters"], per_cluster=deployments_per_cluster),
+        "kubernetes_pods": task(datasets.generate_kubernetes_pods, ["kubernetes_deployments"], per_deployment=pods_per_deployment),
+    }
+    for name in datasets.SHARDABLE:
+        plan[name]["shards"] = shards
+    return plan
+
+def build_append_plan(logs=100, synthetic_runs=100, events=50, traces=10):
+    """
+    Build the append-mode plan: continue the metric series and add new
+    log, event, synthetic run and trace records (see incremental.py).
+    Static datasets are left untouched.
+    """
+    def task(func, **kwargs):
+        return {"func": func, "kwargs": kwargs, "deps": [], "shards": 1}
+
+    return {
+        "timeseries": task(incremental.append_timeseries),
+        "website_metrics": task(incremental.append_website_metrics),
+        "mobile_metrics": task(incremental.append_mobile_metrics),
+        "infrastructure_metrics": task(incremental.append_infrastructure_metrics),
+        "application_metrics": task(incremental.append_application_metrics),
+        "logs": task(incremental.append_logs, count=logs),
+        "synthetic_runs": task(incremental.append_synthetic_runs, count=synthetic_runs),
+        "events": task(incremental.append_events, count=events),
+        "application_traces": task(incremental.append_application_traces, count=traces),
+    }
+
+def _check_plan(plan):
+    """Reject unknown dependencies and cycles before any work is submitted."""
+    for name, spec in plan.items():
+        for dep in spec["deps"]:
+            if dep not in plan:
+                raise ValueError(f"Dataset '{name}' depends on unknown dataset '{dep}'")
+
+    visiting, done = set(), set()
+
+    def visit(name):
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle detected at dataset '{name}'")
+        visiting.add(name)
+        for dep in plan[name]["deps"]:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in plan:
+        visit(name)
+
+def _run_task(name, func, kwargs, out_dir, seed, clock_ms, shard=0, shards=1, compression="none",
+              event_store=False):
+    """Build a single dataset (or one shard of it) inside a worker process and time it."""
+    # Every dataset gets its own stream derived from the master seed, so the
+    # output does not depend on which worker runs it or in what order.
+    streams.set_seed(seed)
+    streams.seed_stream(name)
+    ids.reset()
+    generators.set_clock(clock_ms)
+    datasets.set_compression(compression)
+    eventstore.set_enabled(event_store)
+    if shards > 1:
+        kwargs = dict(kwargs, shard=shard, shards=shards)
+    bytes_before = generators.write_stats["bytes"]
+    start = time.perf_counter()
+    records = func(out_dir=out_dir, **kwargs)
+    seconds = time.perf_counter() - start
+    return {"records": records, "seconds": seconds,
+            "bytes": generators.write_stats["bytes"] - bytes_before, "peak_rss": _peak_rss()}
+
+def _peak_rss():
+    """Peak resident set size of this process in bytes (0 where unsupported)."""
+    if resource is None:
+        return 0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def run_plan(plan, out_dir=datasets.DATA_DIR, jobs=None, seed=42, now_ms=None, benchmark=False,
+             compression="none", event_store=False):
+    """
+    Run every dataset in the plan, starting each one as soon as its
+    dependencies are done. Independent datasets and the shards of a
+    sharded dataset run concurrently on a process pool.
+
+    Args:
+        plan: Dataset graph as returned by build_plan()
+        out_dir: Directory the datasets are written to
+        jobs: Number of worker processes (defaults to the CPU count)
+        seed: Master seed; each dataset derives its own streams from it
+        now_ms: Timestamp all records are generated relative to. Defaults to
+                the wall clock at start; pass a fixed value for output that
+                is byte-identical across runs
+        benchmark: Run every task in a fresh worker process so that peak RSS
+                   is attributed to a single dataset
+        compression: Compression of the written JSONL files ("none", "gzip"
+                     or "zstd"); append plans continue whatever exists
+        event_store: Also write logs, events, issues and synthetic runs into
+                     the SQLite event store of out_dir (see eventstore.py)
+
+    Returns:
+        Dict of dataset name -> {"records", "seconds", "bytes", "peak_rss"}.
+        Records, seconds and bytes are summed over the dataset's shards,
+        peak_rss is the largest of them.
+    """
+    _check_plan(plan)
+    datasets.set_compression(compression)
+    eventstore.set_enabled(event_store)
+    os.makedirs(out_dir, exist_ok=True)
+    if now_ms is None:
+        now_ms = generators.now_ms()
+
+    results = {}
+    pending = dict(plan)
+    running = {}
+    partial = {}
+
+    pool_options = {"max_tasks_per_child": 1} if benchmark else {}
+    with ProcessPoolExecutor(max_workers=jobs, **pool_options) as pool:
+        while pending or running:
+            ready = [name for name, spec in pending.items()
+                     if all(dep in results for dep in spec["deps"])]
+            for name in ready:
+                spec = pending.pop(name)
+                shards = spec.get("shards", 1)
+                partial[name] = {"records": 0, "seconds": 0.0, "bytes": 0, "peak_rss": 0, "left": shards}
+                for shard in range(shards):
+                    future = pool.submit(_run_task, name, spec["func"], spec["kwargs"],
+                                         out_dir, seed, now_ms, shard, shards, compression, event_store)
+                    running[future] = name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    stats = future.result()
+                except Exception:
+                    for f in running:
+                        f.cancel()
+                    log.error(f"Dataset '{name}' failed")
+                    raise
+                progress = partial[name]
+                for key in ("records", "seconds", "bytes"):
+                    progress[key] += stats[key]
+                progress["peak_rss"] = max(progress["peak_rss"], stats["peak_rss"])
+                progress["left"] -= 1
+                if progress["left"]:
+                    continue
+
+                shards = plan[name].get("shards", 1)
+                if shards > 1:
+                    merged = datasets.output_path(out_dir, datasets.SHARDABLE[name])
+                    streams.merge_shards(merged, shards)
+                    if lineindex.is_indexed(merged):
+                        lineindex.update(merged, rebuild=True)
+                    if eventstore.is_stored(merged):
+                        eventstore.sync_dataset(merged, rebuild=True)
+                del progress["left"]
+                results[name] = progress
+                log.info(f"Generated {name}: {progress['records']} records in {progress['seconds']:.3f}s"
+                         + (f" ({shards} shards)" if shards > 1 else ""))
+
+    return results
+
+def _rate(amount, seconds):
+    return amount / seconds if seconds > 0 else 0.0
+
+def format_report(results, wall_seconds):
+    """Render per-dataset timings, throughput and peak RSS as text."""
+    mb = 1024 * 1024
+    lines = [f"{'dataset':<28}{'records':>12}{'seconds':>10}{'records/s':>12}{'MB/s':>9}{'peak MB':>9}"]
+    for name, res in sorted(results.items(), key=lambda kv: kv[1]["seconds"], reverse=True):
+        lines.append(f"{name:<28}{res['records']:>12}{res['seconds']:>10.3f}"
+                     f"{_rate(res['records'], res['seconds']):>12,.0f}"
+                     f"{_rate(res['bytes'], res['seconds']) / mb:>9.1f}{res['peak_rss'] / mb:>9.0f}")
+    total = sum(res["records"] for res in results.values())
+    total_bytes = sum(res["bytes"] for res in results.values())
+    lines.append(f"Total: {total} records, {total_bytes / mb:,.1f} MB in {wall_seconds:.3f}s "
+                 f"({_rate(total, wall_seconds):,.0f} records/s, "
+                 f"{_rate(total_bytes, wall_seconds) / mb:,.1f} MB/s)")
+    return "\n".join(lines)
+
+def write_benchmark(path, profile, config, results, wall_seconds):
+    """Save a benchmark run (profile, counts and per-dataset stats) as JSON."""
+    report = {
+        "profile": profile,
+        "config": config,
+        "wall_seconds": wall_seconds,
+        "records": sum(res["records"] for res in results.values()),
+        "bytes": sum(res["bytes"] for res in results.values()),
+        "peak_rss": max((res["peak_rss"] for res in results.values()), default=0),
+        "datasets": {name: dict(res,
+                                records_per_s=_rate(res["records"], res["seconds"]),
+                                bytes_per_s=_rate(res["bytes"], res["seconds"]))
+                     for name, res in results.items()},
+    }
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
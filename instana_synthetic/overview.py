@@ -0,0 +1,135 @@
+import os
+import threading
+from collections import Counter
+
+import numpy as np
+
+from instana_synthetic import eventstore, links, tsdb
+
+# Overview aggregation: every KPI and chart series of the dashboard's
+# Overview tab in one pass per dataset.
+#
+# Metric datasets are scanned segment by segment out of their time-series
+# store, accumulating point counts, field sums, counts below the health
+# thresholds and per-day sums into one Counter. The Counter and the segments
+# it covers are kept per dataset and tenant, across snapshot versions (which
+# share their unchanged segments), so after an append or a publish only the
+# new segments are scanned and added; a rebuilt store (its old segments gone)
+# is scanned from scratch. Event datasets are counted with one GROUP BY on the event store,
+# which itself only ingests the lines appended since its last sync.
+#
+# summarize() turns the totals into the compact summary both overview
+# callbacks read.
+
+UPTIME_THRESHOLD_MS = 5000  # website points below this response time count as up
+CRASH_THRESHOLD = 0.05      # mobile points below this crash rate count as stable
+
+DAY_MS = 86_400_000
+
+# dataset: (fields averaged, {field: threshold} for the share of points below, field averaged per day)
+METRICS = {
+    "website_metrics": (("value",), {"value": UPTIME_THRESHOLD_MS}, "value"),
+    "mobile_metrics": (("crash_rate", "response_time_ms"), {"crash_rate": CRASH_THRESHOLD}, "response_time_ms"),
+}
+
+# dataset: column counted per value
+EVENTS = {"synthetic_runs": "status", "logs": "severity"}
+
+_totals = {}  # unversioned store directory -> (store directory, covered segments, Counter)
+_lock = threading.Lock()
+
+def _scan(store, number, spec):
+    """Totals of one store segment."""
+    fields, thresholds, daily = spec
+    wanted = [f for f in dict.fromkeys(fields + (daily,)) if f in store.fields]
+    series, timestamps, values = store.segment_points(number, wanted)
+    live = series >= 0
+    totals = Counter({"count": int(live.sum())})
+    for field in wanted:
+        column = np.asarray(values[field][live], dtype=np.float64)
+        totals["sum", field] += float(np.nansum(column))
+        totals["valid", field] += int(np.count_nonzero(~np.isnan(column)))
+        if field in thresholds:
+            totals["below", field] += int(np.count_nonzero(column < thresholds[field]))
+    if daily in wanted:
+        column = np.asarray(values[daily][live], dtype=np.float64)
+        valid = ~np.isnan(column)
+        days, inverse = np.unique(np.asarray(timestamps[live])[valid] // DAY_MS * DAY_MS, return_inverse=True)
+        sums = np.bincount(inverse, weights=column[valid], minlength=len(days))
+        counts = np.bincount(inverse, minlength=len(days))
+        for day, count, total in zip(days.tolist(), counts.tolist(), sums.tolist()):
+            totals["day_count", day] += count
+            totals["day_sum", day] += total
+    return totals
+
+def metric_totals(path, spec):
+    """
+    Accumulated totals of a metric dataset, scanning only the store segments
+    added since the last call.
+
+    Raises:
+        FileNotFoundError: if the dataset does not exist
+    """
+    store = tsdb.open_store(path)
+    key = links.unversioned(store.directory)
+    segments = store.segment_numbers()
+    with _lock:
+        _, covered, totals = _totals.get(key, (None, (), Counter()))
+    if not set(covered) <= set(segments):
+        covered, totals = (), Counter()
+    new = [s for s in segments if s not in covered]
+    if new:
+        totals = Counter(totals)
+        for number in new:
+            totals.update(_scan(store, number, spec))
+        with _lock:
+            _totals[key] = (store.directory, tuple(segments), totals)
+            for gone in [k for k, entry in _totals.items() if not os.path.isdir(entry[0])]:
+                del _totals[gone]  # the dataset or tenant was removed
+    return totals
+
+def _metric_summary(totals, spec):
+    """Summary of metric totals, None without points."""
+    fields, thresholds, daily = spec
+    count = totals["count"]
+    if not count:
+        return None
+    days = sorted(key[1] for key in totals if isinstance(key, tuple) and key[0] == "day_count")
+    return {
+        "points": count,
+        "mean": {f: totals["sum", f] / totals["valid", f] if totals["valid", f] else None for f in fields},
+        "below": {f: totals["below", f] / count for f in thresholds},
+        "daily": {"timestamp": days,
+                  "avg": [totals["day_sum", d] / totals["day_count", d] for d in days]},
+    }
+
+def event_counts(path, column):
+    """Records per value of a column, {} without data."""
+    try:
+        store = eventstore.open_store(path)
+    except FileNotFoundError:
+        return {}
+    counts = store.count_by([column])
+    return dict(zip(counts[column], counts["count"]))
+
+def summarize(directory):
+    """
+    Overview summary of one tenant partition.
+
+    Returns:
+        {dataset: summary} where a metric dataset maps to None (no data) or
+        {"points", "mean": {field: avg}, "below": {field: share under the
+        threshold}, "daily": {"timestamp": [day ms], "avg": [avg]}}, and an
+        event dataset to its {value: count} per EVENTS column
+    """
+    summary = {}
+    for dataset, spec in METRICS.items():
+        try:
+            totals = metric_totals(os.path.join(directory, f"{dataset}.jsonl"), spec)
+        except FileNotFoundError:
+            summary[dataset] = None
+            continue
+        summary[dataset] = _metric_summary(totals, spec)
+    for dataset, column in EVENTS.items():
+        summary[dataset] = event_counts(os.path.join(directory, f"{dataset}.jsonl"), column)
+    return summary
@@ -0,0 +1,71 @@
+import logging
+import threading
+
+log = logging.getLogger("refresher")
+
+# One background refresher per process.
+#
+# The thread polls a cheap version function (a snapshot number or a digest of
+# file stat() signatures) and, when the version moves, runs a warm-up that
+# rebuilds the shared caches before publishing the new version. Clients only
+# compare their last seen version with refresher.version, so the work done
+# per data change is the same no matter how many viewers are connected.
+
+class Refresher:
+    """Background thread that publishes a data version after warming the caches for it."""
+
+    def __init__(self, version_of, warm, interval=15):
+        """
+        Args:
+            version_of: Zero-argument callable returning the current data version (a string)
+            warm: Callable(version) run before a new version is published
+            interval: Seconds between polls
+        """
+        self.version_of = version_of
+        self.warm = warm
+        self.interval = interval
+        self.version = None
+        self.refreshes = 0
+        self._thread = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def check(self):
+        """
+        Poll once: warm the caches and publish when the data version moved.
+
+        Returns:
+            True if a new version was published
+        """
+        with self._lock:
+            version = self.version_of()
+            if version == self.version:
+                return False
+            try:
+                self.warm(version)
+            except Exception as e:
+                log.error(f"Warming caches for data version {version} failed: {e}")
+            self.version = version
+            self.refreshes += 1
+            return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.check()
+            except Exception as e:
+                log.error(f"Data version check failed: {e}")
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """Start the polling thread once per process; later calls do nothing."""
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stop.clear()
+                    self._thread = threading.Thread(target=self._run, name="data-refresher", daemon=True)
+                    self._thread.start()
+
+    def stop(self):
+        self._stop.set()
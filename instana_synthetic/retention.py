@@ -0,0 +1,350 @@
+import glob
+import json
+import logging
+import os
+import re
+import time
+from datetime import datetime
+
+from instana_synthetic import compression, eventstore, incremental, lineindex, locks, snapshots, tenants, tsdb
+from instana_synthetic.datasets import DATA_DIR
+from instana_synthetic.generators import write_lines
+
+log = logging.getLogger("retention")
+
+# Retention and compaction of the files that grow for as long as the
+# deployment runs.
+#
+# The policy comes from event_settings.jsonl and is resolved per dataset: a
+# setting with a "datasets" list (e.g. ["logs", "events"]) applies to those
+# datasets only and takes precedence over the settings without one, which
+# apply to every dataset. Among them, the first enabled setting defining
+# retention_days / max_events_per_minute wins. Records older than
+# retention_days are dropped from every dataset that appends keep growing;
+# events.jsonl also keeps at most max_events_per_minute events per minute.
+#
+# Files are rewritten next to the original and swapped in with os.replace().
+# The swap holds the dataset's file lock (see locks.py), which appends hold
+# while they write, and lines appended while the file was being rewritten are
+# copied over first. Writers that keep a file open (logger.get_logger) reopen
+# it after the swap.
+#
+# Compaction also bounds read amplification: a rewrite packs the many small
+# gzip/zstd frames that appends leave behind into full-size ones and folds a
+# file's append segments (see compression.py) back into it, time-series
+# stores made of many small append segments are rebuilt into large segments,
+# and the WAL of the event store is checkpointed.
+#
+# A data directory with published snapshots is never compacted in place: the
+# pass works on a staging copy of the current snapshot and publishes it as
+# the next version when anything changed. Run it from the same loop as the
+# generator, since two writers staging from the same version would each
+# publish without the other's changes.
+
+SETTINGS_FILE = "event_settings.jsonl"
+
+DAY_MS = 86_400_000
+MINUTE_MS = 60_000
+
+# Lines per rewritten batch (and compressed frame)
+BATCH_LINES = 8192
+
+# A store is rebuilt when it has more than this many segments that are
+# smaller than a quarter of a full one
+MAX_SMALL_SEGMENTS = 4
+
+# Record-stream datasets of a data directory that appends grow: filename -> time field
+RECORD_DATASETS = {
+    "events.jsonl": "timestamp",
+    "logs.jsonl": "timestamp",
+    "synthetic_runs.jsonl": "timestamp",
+    "application_traces.jsonl": "start_time",
+}
+
+# Metric datasets that appends grow; a record expires with its timeframe's end
+METRIC_DATASETS = tsdb.DATASETS
+
+# The one dataset capped at max_events_per_minute
+RATE_LIMITED = "events.jsonl"
+
+# Operational files outside the data directories: name -> time field, or
+# None for "[YYYY-mm-dd HH:MM:SS] ..." log lines. The audit log lives in the
+# data root (data/, the parent of the data directory), the alert history and
+# monitoring log in the log directory (by default the one holding data/,
+# where the dashboard and runners are started).
+DATA_ROOT_FILES = {"audit_log.jsonl": "timestamp"}
+LOG_FILES = {"alert_history.jsonl": "timestamp", "monitoring.log": None}
+
+_LOG_TIME = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\]")
+
+def load_policy(out_dir=DATA_DIR, dataset=None):
+    """
+    Retention policy of one dataset from the event settings of a data directory.
+
+    Args:
+        out_dir: Data directory holding event_settings.jsonl
+        dataset: Dataset name (e.g. "logs"); None resolves the settings that
+                 apply to every dataset
+
+    Returns:
+        {"retention_days", "max_events_per_minute"}; each is None when no
+        enabled setting for the dataset defines it
+    """
+    specific, general = [], []
+    path = os.path.join(out_dir, SETTINGS_FILE)
+    if compression.dataset_exists(path):
+        with compression.open_dataset(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                setting = json.loads(line)
+                if not setting.get("enabled", True):
+                    continue
+                if "datasets" not in setting:
+                    general.append(setting)
+                elif dataset in setting["datasets"]:
+                    specific.append(setting)
+    policy = {}
+    for key in ("retention_days", "max_events_per_minute"):
+        values = [s[key] for s in specific + general if s.get(key) is not None]
+        policy[key] = values[0] if values else None
+    return policy
+
+def _dataset_name(filename):
+    return filename[:-len(".jsonl")]
+
+def _cutoff(policy, now_ms):
+    days = policy["retention_days"]
+    return now_ms - days * DAY_MS if days is not None else None
+
+def _json_time(key):
+    return lambda line: json.loads(line).get(key)
+
+def _metric_time(line):
+    return json.loads(line)["timeframe"]["to"]
+
+def _log_line_time(line):
+    """Epoch ms of a log line, or None for a continuation line (e.g. a traceback)."""
+    match = _LOG_TIME.match(line)
+    if match is None:
+        return None
+    return int(datetime.strptime(match.group(1), "%Y-%m-%d %H:%M:%S").timestamp() * 1000)
+
+def _kept_lines(path, time_of, cutoff_ms, per_minute, stats):
+    """Lines of a file that survive the cutoff and the per-minute cap; continuation lines follow their record."""
+    per_minute_seen, keep = {}, True
+    with compression.open_text(path) as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            timestamp = time_of(line)
+            if timestamp is not None:
+                keep = cutoff_ms is None or timestamp >= cutoff_ms
+                if keep and per_minute is not None:
+                    minute = timestamp // MINUTE_MS
+                    per_minute_seen[minute] = per_minute_seen.get(minute, 0) + 1
+                    keep = per_minute_seen[minute] <= per_minute
+                stats["kept" if keep else "dropped"] += 1
+            if keep:
+                yield line
+
+def _batches(lines):
+    batch = []
+    for line in lines:
+        batch.append(line)
+        if len(batch) >= BATCH_LINES:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def compact_file(path, time_of, cutoff_ms=None, per_minute=None):
+    """
+    Rewrite a line-oriented file without the records older than cutoff_ms
+    (epoch ms) and beyond per_minute records per minute.
+
+    Args:
+        path: File to compact (plain, .gz or .zst)
+        time_of: Callable returning a line's epoch-ms timestamp, or None for
+                 a line that continues the previous record
+        cutoff_ms: Oldest timestamp to keep; None keeps every age
+        per_minute: Records kept per minute of timestamps; None for no cap
+
+    Returns:
+        {"kept", "dropped", "bytes_before", "bytes_after"}; the file is left
+        untouched (bytes_after == bytes_before) when nothing was dropped and
+        it has no small frames to merge (its segments are folded into a rewrite)
+    """
+    stats = {"kept": 0, "dropped": 0, "bytes_before": compression.dataset_stat(path)[0]}
+    size = stats["bytes_before"]
+    directory, name = os.path.split(path)
+    tmp = os.path.join(directory, f".compact-{name}")
+    codec = compression.compression_of(path)
+    try:
+        write_lines(tmp, _batches(_kept_lines(path, time_of, cutoff_ms, per_minute, stats)))
+        if not stats["dropped"] and (codec is None or os.path.getsize(tmp) >= size):
+            os.remove(tmp)
+            stats["bytes_after"] = size
+            return stats
+        # Carry over what writers appended meanwhile (whole lines / frames), then
+        # swap; appends wait for the lock, so nothing lands in between
+        with locks.exclusive(locks.file_lock(path)):
+            with compression.open_raw(path) as src, open(tmp, "ab") as dst:
+                src.seek(size)
+                while True:
+                    chunk = src.read(1 << 20)
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+            os.replace(tmp, path)
+            for _, segment in compression.segments(path):
+                os.remove(segment)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    stats["bytes_after"] = os.path.getsize(path)
+    return stats
+
+def compact_store(path):
+    """
+    Rebuild the time-series store of a metric dataset when appends left it
+    with many small segments.
+
+    Returns:
+        (segments before, segments after)
+    """
+    store = tsdb.open_store(path)
+    segments = store.index["segments"]
+    small = [s for s in segments if s["points"] < tsdb.SEGMENT_POINTS // 4]
+    if len(small) <= MAX_SMALL_SEGMENTS:
+        return len(segments), len(segments)
+    return len(segments), len(tsdb.build_store(path)["segments"])
+
+def compact_data_dir(out_dir=DATA_DIR, now_ms=None):
+    """
+    Apply the retention policy of one data directory (tenant partition) and
+    compact its stores.
+
+    Returns:
+        Dict of file or store path -> stats
+    """
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    report = {}
+    datasets = dict(RECORD_DATASETS, **{filename: None for filename in METRIC_DATASETS})
+    for filename, time_key in datasets.items():
+        path = compression.resolve(os.path.join(out_dir, filename))
+        if not os.path.exists(path):
+            continue
+        policy = load_policy(out_dir, _dataset_name(filename))
+        per_minute = policy["max_events_per_minute"] if filename == RATE_LIMITED else None
+        time_of = _metric_time if time_key is None else _json_time(time_key)
+        stats = report[path] = compact_file(path, time_of, _cutoff(policy, now_ms), per_minute)
+        if stats["bytes_after"] != stats["bytes_before"]:
+            _after_rewrite(out_dir, filename, path, stats)
+    for directory in sorted(glob.glob(os.path.join(out_dir, "*.tsdb"))):
+        dataset = os.path.join(out_dir, os.path.basename(directory)[:-len(".tsdb")] + ".jsonl")
+        try:
+            before, after = compact_store(dataset)
+        except FileNotFoundError:
+            continue
+        report[directory] = {"segments_before": before, "segments_after": after}
+    db = eventstore.db_path(out_dir)
+    if os.path.exists(db):
+        cutoffs = {table: _cutoff(load_policy(out_dir, table), now_ms) for table in eventstore.TABLES}
+        report[db] = {"deleted": eventstore.purge(db, cutoffs)}
+    return report
+
+def _after_rewrite(out_dir, filename, path, stats):
+    """Bring what mirrors a compacted dataset file up to date with it."""
+    # The append state keeps its watermark and ID counters: IDs of dropped
+    # records are not handed out again
+    state = incremental.load_state(out_dir, filename)
+    if state is not None and state.get("size") == stats["bytes_before"]:
+        incremental.save_state(out_dir, filename, state)
+    if lineindex.is_indexed(path):
+        lineindex.update(path, rebuild=True)
+    if eventstore.dataset_of(path) and os.path.exists(eventstore.db_path(out_dir)):
+        eventstore.sync_dataset(path, rebuild=True)
+
+def operational_files(out_dir=DATA_DIR, log_dir=None):
+    """
+    Operational files of the deployment whose data directory is out_dir:
+    absolute path -> time field (see DATA_ROOT_FILES and LOG_FILES).
+    """
+    data_root = os.path.dirname(os.path.abspath(out_dir))
+    log_dir = os.path.abspath(log_dir) if log_dir else os.path.dirname(data_root)
+    files = {os.path.join(data_root, name): key for name, key in DATA_ROOT_FILES.items()}
+    files.update({os.path.join(log_dir, name): key for name, key in LOG_FILES.items()})
+    return files
+
+def compact_operational_files(policy, now_ms=None, files=None, out_dir=DATA_DIR, log_dir=None):
+    """
+    Apply a retention policy to the audit log, alert history and monitoring
+    log, including the monitoring log's rotated backups.
+
+    Args:
+        files: path -> time field; defaults to operational_files(out_dir, log_dir)
+
+    Returns:
+        Dict of path -> stats
+    """
+    days = policy["retention_days"]
+    if days is None:
+        return {}
+    now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+    cutoff = now_ms - days * DAY_MS
+    report = {}
+    for base, time_key in (files or operational_files(out_dir, log_dir)).items():
+        time_of = _log_line_time if time_key is None else _json_time(time_key)
+        paths = [base] + (sorted(glob.glob(base + ".[0-9]*")) if time_key is None else [])
+        for path in paths:
+            if os.path.exists(path):
+                stats = report[path] = compact_file(path, time_of, cutoff)
+                if path != base and not stats["kept"]:
+                    os.remove(path)  # a rotated backup with nothing left in retention
+    return report
+
+def _changed(stats):
+    return bool(stats.get("dropped") or stats.get("deleted")
+                or stats.get("segments_after", 0) != stats.get("segments_before", 0))
+
+def run_compaction(out_dir=DATA_DIR, now_ms=None, log_dir=None):
+    """
+    One compaction pass over every tenant partition and the operational
+    files (see operational_files()). With published snapshots, the compacted
+    copy becomes the next snapshot version (only if something changed).
+    """
+    snapshot = snapshots.current(out_dir)[0] is not None
+    data_dir = snapshots.begin(out_dir) if snapshot else out_dir
+    report = {}
+    try:
+        for tenant_id in tenants.list_tenants(data_dir):
+            report.update(compact_data_dir(tenants.tenant_dir(data_dir, tenant_id), now_ms))
+    except BaseException:
+        if snapshot:
+            snapshots.discard(data_dir)
+        raise
+    if snapshot:
+        if any(map(_changed, report.values())):
+            published = snapshots.snapshot_dir(out_dir, snapshots.publish(out_dir, data_dir))
+            report = {published + path[len(data_dir):] if path.startswith(data_dir) else path: stats
+                      for path, stats in report.items()}
+        else:
+            snapshots.discard(data_dir)
+    report.update(compact_operational_files(load_policy(snapshots.data_dir(out_dir)), now_ms,
+                                            out_dir=out_dir, log_dir=log_dir))
+    for path, stats in report.items():
+        if _changed(stats):
+            log.info(f"Compacted {path}: {stats}")
+    return report
+
+def run_forever(out_dir=DATA_DIR, interval=3600, log_dir=None):
+    """Run a compaction pass every `interval` seconds; errors are logged and retried next pass."""
+    while True:
+        try:
+            run_compaction(out_dir, log_dir=log_dir)
+        except Exception as e:
+            log.error(f"Compaction failed: {e}")
+        time.sleep(interval)
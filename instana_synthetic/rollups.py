@@ -0,0 +1,304 @@
+import json
+import math
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from instana_synthetic import links, tsdb
+
+# Multi-resolution rollups of the time-series store.
+#
+# Next to the raw one-minute points, every series of a store is rolled up
+# into 5-minute, hourly and daily buckets, stored in the store directory as
+# rollup-5m.npz, rollup-1h.npz and rollup-1d.npz. Each bucket row holds
+# count plus sum/min/max per point field, and a quantile sketch per field:
+# a DDSketch-style log histogram (relative error SKETCH_ACCURACY) kept as
+# sparse (row, bin, count) triples, so sketches of any buckets merge by
+# adding counts.
+#
+# Rollups track the store segments they cover. After an append only the new
+# segments are rolled up, and their buckets are merged into the existing rows
+# (the last bucket of a series is usually partial and gets completed this
+# way); a rebuilt store is rolled up from scratch. query() picks the finest
+# resolution whose bucket count fits the requested point budget.
+#
+# snapshots.publish() brings the rollups up to date before publishing. In a
+# published snapshot stale rollups are only recomputed in memory, never
+# saved into the snapshot.
+
+FORMAT = "instana-rollups/1"
+
+RAW_STEP_MS = 60_000  # metric datasets hold one point per minute
+
+# (name, bucket width in ms), finest first
+TIERS = (("5m", 300_000), ("1h", 3_600_000), ("1d", 86_400_000))
+
+SKETCH_ACCURACY = 0.01
+SKETCH_MIN = 1e-6  # values closer to zero share bin 0
+_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+_LOG_GAMMA = math.log(_GAMMA)
+_BIN_OFFSET = 1 << 15
+
+_loaded = {}  # unversioned store directory -> (store directory, covered segments, tables)
+_lock = threading.Lock()
+
+def sketch_bins(values):
+    """Sketch bin of every value: sign * (1 + ceil(log_gamma(|v| / SKETCH_MIN))), 0 near zero."""
+    values = np.asarray(values, dtype=np.float64)
+    magnitude = np.abs(values)
+    bins = np.ceil(np.log(np.maximum(magnitude, SKETCH_MIN) / SKETCH_MIN) / _LOG_GAMMA) + 1
+    bins = np.minimum(bins, _BIN_OFFSET - 1).astype(np.int64)
+    bins[magnitude < SKETCH_MIN] = 0
+    return np.where(values < 0, -bins, bins)
+
+def bin_values(bins):
+    """Representative value of sketch bins (within SKETCH_ACCURACY of every value in the bin)."""
+    bins = np.asarray(bins, dtype=np.int64)
+    magnitude = SKETCH_MIN * _GAMMA ** (np.abs(bins) - 1.0) * 2 / (1 + _GAMMA)
+    return np.where(bins == 0, 0.0, np.sign(bins) * magnitude)
+
+def rollup_path(store, tier):
+    return os.path.join(store.directory, f"rollup-{tier}.npz")
+
+def _point_table(series, timestamps, fields):
+    """Raw points as a table of one-point buckets."""
+    n = len(timestamps)
+    ones = np.ones(n, dtype=np.int64)
+    table = {"series": np.asarray(series, dtype=np.int64), "bucket": np.asarray(timestamps, dtype=np.int64),
+             "count": ones}
+    for f, values in fields.items():
+        values = np.asarray(values, dtype=np.float64)
+        table[f"{f}.sum"] = table[f"{f}.min"] = table[f"{f}.max"] = values
+        table[f"{f}.sk_row"] = np.arange(n, dtype=np.int64)
+        table[f"{f}.sk_bin"] = sketch_bins(values)
+        table[f"{f}.sk_count"] = ones
+    return table
+
+def _concat(tables, fields):
+    """Stack tables; sketch rows are shifted to the stacked row numbers."""
+    tables = [t for t in tables if t is not None and len(t["count"])]
+    if len(tables) == 1:
+        return tables[0]
+    out = {k: np.concatenate([t[k] for t in tables]) for k in ("series", "bucket", "count")}
+    bases = np.cumsum([0] + [len(t["count"]) for t in tables[:-1]])
+    for f in fields:
+        for k in ("sum", "min", "max", "sk_bin", "sk_count"):
+            out[f"{f}.{k}"] = np.concatenate([t[f"{f}.{k}"] for t in tables])
+        out[f"{f}.sk_row"] = np.concatenate([t[f"{f}.sk_row"] + base for t, base in zip(tables, bases)])
+    return out
+
+def _aggregate(table, fields, step):
+    """Merge the rows of a table into buckets of `step` ms per series, sorted by (series, bucket)."""
+    bucket = table["bucket"] // step * step
+    order = np.lexsort((bucket, table["series"]))
+    series, bucket = table["series"][order], bucket[order]
+    new = np.ones(len(order), dtype=bool)
+    new[1:] = (series[1:] != series[:-1]) | (bucket[1:] != bucket[:-1])
+    starts = np.flatnonzero(new)
+    group = np.empty(len(order), dtype=np.int64)
+    group[order] = np.cumsum(new) - 1
+    out = {"series": series[starts], "bucket": bucket[starts],
+           "count": np.add.reduceat(table["count"][order], starts)}
+    for f in fields:
+        out[f"{f}.sum"] = np.add.reduceat(table[f"{f}.sum"][order], starts)
+        out[f"{f}.min"] = np.minimum.reduceat(table[f"{f}.min"][order], starts)
+        out[f"{f}.max"] = np.maximum.reduceat(table[f"{f}.max"][order], starts)
+        key = group[table[f"{f}.sk_row"]] * (2 * _BIN_OFFSET) + table[f"{f}.sk_bin"] + _BIN_OFFSET
+        unique, inverse = np.unique(key, return_inverse=True)
+        out[f"{f}.sk_row"] = unique // (2 * _BIN_OFFSET)
+        out[f"{f}.sk_bin"] = unique % (2 * _BIN_OFFSET) - _BIN_OFFSET
+        out[f"{f}.sk_count"] = np.bincount(inverse, weights=table[f"{f}.sk_count"],
+                                           minlength=len(unique)).astype(np.int64)
+    return out
+
+def _save(store, tier, table, meta):
+    target = rollup_path(store, tier)
+    tmp = target + ".tmp.npz"
+    np.savez(tmp, meta=np.array(json.dumps(meta)), **table)
+    os.replace(tmp, target)
+
+def _load(store, tier):
+    try:
+        npz = np.load(rollup_path(store, tier))
+    except FileNotFoundError:
+        return None, None
+    with npz:
+        meta = json.loads(str(npz["meta"]))
+        if meta.get("format") != FORMAT:
+            return None, None
+        return meta, {k: npz[k] for k in npz.files if k != "meta"}
+
+def update_rollups(store):
+    """
+    Bring the rollups of a store up to date: roll up the segments added
+    since the last update, or everything if the store was rebuilt.
+
+    Returns:
+        {tier: table} with the bucket rows of every tier
+    """
+    segments = store.segment_numbers()
+    fields = store.fields
+    tables, covered = {}, None
+    for tier, _ in TIERS:
+        meta, table = _load(store, tier)
+        if meta is None or not set(meta["segments"]) <= set(segments) or meta["fields"] != fields:
+            tables, covered = {}, []
+            break
+        tables[tier] = table
+        covered = meta["segments"] if covered is None else [s for s in covered if s in meta["segments"]]
+    new = [s for s in segments if s not in covered]
+    if not new:
+        return tables
+
+    delta = _concat([_point_table(*store.segment_points(number)) for number in new], fields)
+    meta = {"format": FORMAT, "segments": segments, "fields": fields}
+    for tier, step in TIERS:
+        delta = _aggregate(delta, fields, step)  # each tier is rolled up from the previous one
+        merged = _aggregate(_concat([tables.get(tier), delta], fields), fields, step) \
+            if tables.get(tier) is not None else delta
+        if not links.is_published(store.directory):
+            _save(store, tier, merged, meta)
+        tables[tier] = merged
+    return tables
+
+def load_rollups(store):
+    """
+    Up-to-date rollup tables of a store, memoized per dataset and tenant and
+    set of store segments, so a published snapshot that added no segments
+    reuses the tables of the previous version.
+    """
+    key = links.unversioned(store.directory)
+    segments = tuple(store.segment_numbers())
+    with _lock:
+        cached = _loaded.get(key)
+        if cached and cached[1] == segments:
+            return cached[2]
+    tables = update_rollups(store)
+    with _lock:
+        _loaded[key] = (store.directory, segments, tables)
+        for gone in [k for k, entry in _loaded.items() if not os.path.isdir(entry[0])]:
+            del _loaded[gone]  # the dataset or tenant was removed
+    return tables
+
+def select_tier(start, end, max_points):
+    """Finest resolution ("raw", "5m", "1h" or "1d") with at most max_points buckets in [start, end]."""
+    for tier, step in (("raw", RAW_STEP_MS),) + TIERS:
+        if (end - start) // step + 1 <= max_points:
+            return tier
+    return TIERS[-1][0]
+
+def _rows(table, position, start, end):
+    """Slice of the rows of one series with buckets in [start, end]."""
+    lo, hi = np.searchsorted(table["series"], [position, position + 1])
+    buckets = table["bucket"][lo:hi]
+    first = lo + (np.searchsorted(buckets, start, side="left") if start is not None else 0)
+    last = lo + (np.searchsorted(buckets, end, side="right") if end is not None else len(buckets))
+    return slice(int(first), int(last))
+
+def quantiles(table, field, q, rows=None):
+    """Estimate quantile q (0..1) of every bucket row (or of rows[slice]) from its sketch."""
+    counts = table["count"] if rows is None else table["count"][rows]
+    sk_row, sk_bin, sk_count = table[f"{field}.sk_row"], table[f"{field}.sk_bin"], table[f"{field}.sk_count"]
+    if rows is not None:
+        lo, hi = np.searchsorted(sk_row, [rows.start, rows.stop])
+        sk_row, sk_bin, sk_count = sk_row[lo:hi] - rows.start, sk_bin[lo:hi], sk_count[lo:hi]
+    if not len(counts):
+        return np.empty(0)
+    cumulative = np.cumsum(sk_count)
+    base = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rank = base + np.floor(q * (counts - 1))
+    return bin_values(sk_bin[np.searchsorted(cumulative, rank, side="right")])
+
+def fraction_below(table, field, threshold, rows=None):
+    """Estimated share of the points of every bucket row below `threshold`, from the sketches."""
+    counts = table["count"] if rows is None else table["count"][rows]
+    sk_row, sk_bin, sk_count = table[f"{field}.sk_row"], table[f"{field}.sk_bin"], table[f"{field}.sk_count"]
+    if rows is not None:
+        lo, hi = np.searchsorted(sk_row, [rows.start, rows.stop])
+        sk_row, sk_bin, sk_count = sk_row[lo:hi] - rows.start, sk_bin[lo:hi], sk_count[lo:hi]
+    below = bin_values(sk_bin) < threshold
+    return np.bincount(sk_row[below], weights=sk_count[below], minlength=len(counts)) / np.maximum(counts, 1)
+
+def query(path, series_id, metric_name, start=None, end=None, max_points=1000, field="value", q=()):
+    """
+    Points of one series at the finest resolution that fits the budget.
+
+    Args:
+        path: Metric dataset path, e.g. data/instana/website_metrics.jsonl
+        series_id, metric_name: The series
+        start, end: Inclusive time range (epoch ms); defaults to the whole series
+        max_points: Point budget used to pick the tier (see select_tier())
+        field: Point field to return
+        q: Quantiles to estimate per bucket, e.g. (0.5, 0.95)
+
+    Returns:
+        Dict with "tier" and arrays "timestamp", "count", "sum", "min", "max",
+        "avg" and one "p<q*100>" array per requested quantile. Raw points come
+        back as one-point buckets.
+    """
+    store = tsdb.open_store(path)
+    position = next((i for i, s in enumerate(store.series())
+                     if s["id"] == series_id and s["metric_name"] == metric_name), None)
+    if position is None:
+        raise KeyError(f"No series ({series_id}, {metric_name}) in {path}")
+    extents = store.series()[position]["extents"]
+    first = min(e[3] for e in extents) if start is None else start
+    last = max(e[4] for e in extents) if end is None else end
+    tier = select_tier(first, last, max_points)
+
+    if tier == "raw":
+        timestamps, fields = store.read(series_id, metric_name, start, end, fields=[field])
+        values = np.asarray(fields[field], dtype=np.float64)
+        result = {"tier": tier, "timestamp": np.asarray(timestamps), "count": np.ones(len(values), dtype=np.int64),
+                  "sum": values, "min": values, "max": values, "avg": values}
+        for quantile in q:
+            result[f"p{quantile * 100:g}"] = values
+        return result
+
+    table = load_rollups(store)[tier]
+    step = dict(TIERS)[tier]
+    rows = _rows(table, position, None if start is None else start // step * step, end)
+    counts = table["count"][rows]
+    result = {"tier": tier, "timestamp": table["bucket"][rows], "count": counts,
+              "sum": table[f"{field}.sum"][rows], "min": table[f"{field}.min"][rows],
+              "max": table[f"{field}.max"][rows], "avg": table[f"{field}.sum"][rows] / np.maximum(counts, 1)}
+    for quantile in q:
+        result[f"p{quantile * 100:g}"] = quantiles(table, field, quantile, rows)
+    return result
+
+def frame(path, tier, field="value", tenant_id=None, below=None):
+    """
+    One tier of a metric dataset as a DataFrame: series ID, metric_name,
+    timestamp (bucket start, epoch ms), count, sum, min, max and avg of `field`.
+    With below=threshold, a "below" column holds the estimated share of
+    points under the threshold.
+    """
+    store = tsdb.open_store(path)
+    table = load_rollups(store)[tier]
+    series = store.series()
+    keep = np.array([not tenant_id or s.get("tenant_id") == tenant_id for s in series], dtype=bool)
+    rows = keep[table["series"]] if len(series) else np.zeros(0, dtype=bool)
+    counts = table["count"][rows]
+    df = pd.DataFrame({
+        store.id_key or "id": np.array([s["id"] for s in series], dtype=object)[table["series"][rows]],
+        "metric_name": np.array([s["metric_name"] for s in series], dtype=object)[table["series"][rows]],
+        "timestamp": table["bucket"][rows],
+        "count": counts,
+        "sum": table[f"{field}.sum"][rows],
+        "min": table[f"{field}.min"][rows],
+        "max": table[f"{field}.max"][rows],
+        "avg": table[f"{field}.sum"][rows] / np.maximum(counts, 1),
+    })
+    if below is not None:
+        df["below"] = fraction_below(table, field, below)[rows]
+    return df
+
+def combined(path, tier, field="value", tenant_id=None):
+    """All series of a dataset merged per bucket: timestamp, count, sum, min, max, avg."""
+    df = frame(path, tier, field, tenant_id)
+    out = df.groupby("timestamp").agg(count=("count", "sum"), sum=("sum", "sum"),
+                                      min=("min", "min"), max=("max", "max")).reset_index()
+    out["avg"] = out["sum"] / out["count"].clip(lower=1)
+    return out
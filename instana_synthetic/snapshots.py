@@ -0,0 +1,199 @@
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+
+from instana_synthetic import columnar, compression, eventstore, lineindex, links, rollups, tsdb
+from instana_synthetic.datasets import DATA_DIR
+
+log = logging.getLogger("snapshots")
+
+# Versioned, immutable snapshots of a data directory.
+#
+#   data/instana/snapshots/v000041/...   a published generation, never modified
+#   data/instana/snapshots/v000042/...
+#   data/instana/current.json            {"version": 42, "path": "snapshots/v000042", ...}
+#
+# A generator stages its output in snapshots/.staging-<pid>, seeded with hard
+# links to the files of the current snapshot so --append continues it (see
+# links.py: appends go to new segment files and rewrites to new files, so
+# the published version never changes and staging copies no data).
+# publish() then builds the sidecars readers need (time-series stores,
+# rollups, event store, line indexes), renames the staging directory to the
+# next version and swaps current.json with os.replace(). Readers therefore
+# see either the old or the new generation, never a half-written file, and
+# the version number tells every cache that data changed without looking at
+# file sizes and mtimes. Sidecars carried
+# over from the previous version are only topped up with the new data.
+#
+# Readers pin one version for the duration of a request (pin()), so all the
+# datasets a request touches come from the same generation. The newest
+# KEEP_SNAPSHOTS versions are kept for requests still pinned to an older one.
+#
+# Without current.json (data generated before snapshots, or without
+# --snapshot) the data directory itself is read, as before.
+
+POINTER_FILE = "current.json"
+SNAPSHOTS_DIR = "snapshots"
+
+KEEP_SNAPSHOTS = 3
+
+_VERSION_DIR = re.compile(r"^v(\d+)$")
+
+_pinned = threading.local()
+
+def pointer_path(out_dir=DATA_DIR):
+    """Path of the current-version pointer of a data directory."""
+    return os.path.join(out_dir, POINTER_FILE)
+
+def snapshot_dir(out_dir, version):
+    """Directory of a published snapshot version."""
+    return os.path.join(out_dir, SNAPSHOTS_DIR, f"v{version:06d}")
+
+def current(out_dir=DATA_DIR):
+    """
+    The published snapshot of a data directory.
+
+    Returns:
+        (version, directory); (None, out_dir) when nothing was published
+    """
+    try:
+        with open(pointer_path(out_dir)) as f:
+            pointer = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None, out_dir
+    return pointer["version"], os.path.join(out_dir, pointer["path"])
+
+def _versions(out_dir):
+    """Versions that have a snapshot directory, ascending."""
+    try:
+        names = os.listdir(os.path.join(out_dir, SNAPSHOTS_DIR))
+    except FileNotFoundError:
+        return []
+    return sorted(int(m.group(1)) for m in map(_VERSION_DIR.match, names) if m)
+
+def _stage_data(source, target):
+    """Link datasets and sidecars of a data directory into target, without its snapshots."""
+    if not links.is_published(source):
+        for partition in _partitions(source):
+            db = eventstore.db_path(partition)
+            if os.path.exists(db):
+                eventstore.checkpoint(db)  # the WAL is not linked
+    links.link_tree(source, target, ignore={SNAPSHOTS_DIR, POINTER_FILE},
+                    skip=lambda name: name.endswith((".lock", "-wal", "-shm")))
+
+def begin(out_dir=DATA_DIR, seed=True):
+    """
+    Create a staging directory for the next snapshot.
+
+    Args:
+        out_dir: Data directory
+        seed: Start from the files of the current snapshot (or of the data
+              directory itself before the first snapshot)
+
+    Returns:
+        Path of the staging directory, to pass to publish() or discard()
+    """
+    staging = os.path.join(out_dir, SNAPSHOTS_DIR, f".staging-{os.getpid()}")
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    os.makedirs(staging)
+    _, source = current(out_dir)
+    if seed and os.path.isdir(source):
+        _stage_data(source, staging)
+    return staging
+
+def _partitions(directory):
+    """The data directory itself and every tenant partition below it."""
+    found = [directory]
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if (os.path.isdir(path) and not name.startswith(".") and name != SNAPSHOTS_DIR
+                and any(compression.strip_extension(f).endswith(".jsonl") for f in os.listdir(path))):
+            found.append(path)
+    return found
+
+def build_sidecars(directory):
+    """Build or top up the sidecars readers open in every partition of a staged data directory."""
+    for partition in _partitions(directory):
+        for filename in tsdb.DATASETS:
+            path = os.path.join(partition, filename)
+            if compression.dataset_exists(path) or columnar.is_fresh(path):
+                rollups.update_rollups(tsdb.open_store(path))
+        for dataset in eventstore.TABLES:
+            path = os.path.join(partition, f"{dataset}.jsonl")
+            if compression.dataset_exists(path):
+                eventstore.sync_dataset(path)
+        for filename in lineindex.INDEXED:
+            path = os.path.join(partition, filename)
+            if compression.dataset_exists(path):
+                lineindex.update(path)
+        db = eventstore.db_path(partition)
+        if os.path.exists(db):
+            eventstore.checkpoint(db)
+
+def discard(staging):
+    """Remove a staging directory that will not be published."""
+    shutil.rmtree(staging, ignore_errors=True)
+
+def publish(out_dir, staging, keep=KEEP_SNAPSHOTS):
+    """
+    Publish a staging directory as the next version and switch current.json to it.
+
+    Returns:
+        The new version number
+    """
+    build_sidecars(staging)
+    version = max([current(out_dir)[0] or 0] + _versions(out_dir)) + 1
+    target = snapshot_dir(out_dir, version)
+    os.rename(staging, target)
+    pointer = {"version": version, "path": os.path.relpath(target, out_dir),
+               "published_ms": int(time.time() * 1000)}
+    tmp = pointer_path(out_dir) + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(pointer, f)
+    os.replace(tmp, pointer_path(out_dir))
+    for old in _versions(out_dir)[:-keep]:
+        shutil.rmtree(snapshot_dir(out_dir, old), ignore_errors=True)
+    log.info(f"Published snapshot v{version} of {out_dir}")
+    return version
+
+@contextmanager
+def pin(out_dir=DATA_DIR):
+    """
+    Pin the current snapshot of a data directory for the calling thread, so
+    every data_dir() lookup inside the block resolves to the same version.
+    Nested pins keep the outer version.
+
+    Yields:
+        The pinned version (None without snapshots)
+    """
+    pins = getattr(_pinned, "pins", None)
+    if pins is None:
+        pins = _pinned.pins = {}
+    if out_dir in pins:
+        yield pins[out_dir][0]
+        return
+    pins[out_dir] = current(out_dir)
+    try:
+        yield pins[out_dir][0]
+    finally:
+        del pins[out_dir]
+
+def _resolve(out_dir):
+    pins = getattr(_pinned, "pins", None)
+    if pins and out_dir in pins:
+        return pins[out_dir]
+    return current(out_dir)
+
+def data_dir(out_dir=DATA_DIR):
+    """Directory readers should open: the pinned (or else current) snapshot, or out_dir itself."""
+    return _resolve(out_dir)[1]
+
+def pinned_version(out_dir=DATA_DIR):
+    """Version readers see: the pinned (or else current) one; None without snapshots."""
+    return _resolve(out_dir)[0]
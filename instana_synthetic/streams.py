@@ -0,0 +1,94 @@
+import hashlib
+import os
+import random
+import shutil
+
+from instana_synthetic import compression
+
+# Counter-based seeding for reproducible, shardable generation.
+#
+# Every random stream is keyed by (master seed, dataset, block), hashed into
+# a 64-bit seed for the `random` module (which also seeds the NumPy walk
+# engine through engine.make_rng). Record-stream datasets are cut into
+# fixed-size blocks and the stream is reseeded at each block boundary, so a
+# record's values only depend on its block, never on which worker or machine
+# generated it. Shards are contiguous runs of whole blocks: concatenating the
+# shard outputs in order is byte-identical to a single-process run (for
+# compressed files, the decompressed content is).
+
+# Records per block; part of the output format, changing it changes the data
+BLOCK_RECORDS = 4096
+
+_master_seed = None
+
+def set_seed(seed):
+    """Set the master seed for this process; None restores unseeded generation."""
+    global _master_seed
+    _master_seed = seed
+
+def get_seed():
+    return _master_seed
+
+def stream_key(seed, dataset, block="setup"):
+    """Derive the 64-bit seed of one stream from the master seed."""
+    digest = hashlib.blake2b(f"{seed}:{dataset}:{block}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+def seed_stream(dataset, block="setup"):
+    """Reseed `random` for one stream of a dataset. No-op when no master seed is set."""
+    if _master_seed is not None:
+        random.seed(stream_key(_master_seed, dataset, block))
+
+def shard_blocks(count, shard=0, shards=1, block_records=BLOCK_RECORDS):
+    """Return the range of block numbers owned by `shard` out of `shards`."""
+    if not 0 <= shard < shards:
+        raise ValueError(f"shard must be in [0, {shards}), got {shard}")
+    blocks = -(-count // block_records)
+    per_shard, extra = divmod(blocks, shards)
+    first = shard * per_shard + min(shard, extra)
+    return range(first, first + per_shard + (1 if shard < extra else 0))
+
+def records(dataset, count, shard=0, shards=1, block_records=BLOCK_RECORDS):
+    """
+    Yield the record indices of one shard, reseeding at every block boundary.
+
+    Args:
+        dataset: Stream name, usually the output dataset name
+        count: Total number of records across all shards
+        shard: Index of this shard
+        shards: Total number of shards
+
+    Yields:
+        Record indices in [0, count), in order
+    """
+    if shards > 1 and _master_seed is None:
+        raise ValueError("Sharded generation requires a master seed")
+    for block in shard_blocks(count, shard, shards, block_records):
+        seed_stream(dataset, block)
+        yield from range(block * block_records, min(count, (block + 1) * block_records))
+
+def shard_path(path, shard=0, shards=1):
+    """
+    Output path of one shard; the plain path when the dataset is not sharded.
+    A compression extension stays last (logs.jsonl.part00001.gz).
+    """
+    if shards == 1:
+        return path
+    base = compression.strip_extension(path)
+    return f"{base}.part{shard:05d}{path[len(base):]}"
+
+def merge_shards(path, shards):
+    """Concatenate shard files into `path` in shard order and remove them."""
+    if shards == 1:
+        return
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        for shard in range(shards):
+            part = shard_path(path, shard, shards)
+            with open(part, "rb") as f:
+                shutil.copyfileobj(f, out, 1 << 20)
+    os.replace(tmp_path, path)
+    for _, segment in compression.segments(path):
+        os.remove(segment)  # appends to the file just replaced
+    for shard in range(shards):
+        os.remove(shard_path(path, shard, shards))
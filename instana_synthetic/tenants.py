@@ -0,0 +1,61 @@
+import os
+import re
+
+from instana_synthetic import compression, snapshots
+from instana_synthetic.datasets import DATA_DIR
+
+# Tenant partitions of the data directory.
+#
+#   data/instana/<dataset>.jsonl            the "default" tenant
+#   data/instana/<tenant>/<dataset>.jsonl   every other tenant
+#
+# A tenant's loaders only ever open files in its own partition, so the cost
+# of a request scales with that tenant's data, and records never need to be
+# filtered by tenant_id after reading. Sidecar files (columnar copies,
+# time-series stores, indexes) live next to the data file inside the
+# partition as usual.
+#
+# Readers resolve partitions inside the pinned snapshot of the data directory
+# (see instana_synthetic/snapshots.py) when one was published.
+
+DEFAULT_TENANT = "default"
+
+_TENANT_ID = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+
+def check_tenant_id(tenant_id):
+    """Reject tenant IDs that are not a single safe path component."""
+    if not _TENANT_ID.match(tenant_id or ""):
+        raise ValueError(f"Invalid tenant ID {tenant_id!r}")
+    return tenant_id
+
+def tenant_dir(out_dir=DATA_DIR, tenant_id=None):
+    """Directory holding a tenant's datasets; None means the default tenant."""
+    if tenant_id in (None, DEFAULT_TENANT):
+        return out_dir
+    return os.path.join(out_dir, check_tenant_id(tenant_id))
+
+def dataset_path(filename, tenant_id=None, out_dir=DATA_DIR):
+    """
+    Path of a dataset in a tenant's partition for readers, e.g.
+    data/instana/tenant-1/logs.jsonl, or inside the pinned snapshot:
+    data/instana/snapshots/v000042/tenant-1/logs.jsonl.
+    """
+    return os.path.join(tenant_dir(snapshots.data_dir(out_dir), tenant_id), filename)
+
+def list_tenants(out_dir=DATA_DIR):
+    """The default tenant plus every partition directory that holds datasets."""
+    found = []
+    if os.path.isdir(out_dir):
+        for name in sorted(os.listdir(out_dir)):
+            path = os.path.join(out_dir, name)
+            if name == DEFAULT_TENANT or not _TENANT_ID.match(name) or not os.path.isdir(path):
+                continue
+            if any(compression.strip_extension(f).endswith(".jsonl") for f in os.listdir(path)):
+                found.append(name)
+    return [DEFAULT_TENANT] + found
+
+def tag_records(records, tenant_id):
+    """Set tenant_id on every record of an iterable (lazily)."""
+    for record in records:
+        record["tenant_id"] = tenant_id
+        yield record
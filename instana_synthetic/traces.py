@@ -0,0 +1,280 @@
+import json
+import os
+
+import numpy as np
+
+from instana_synthetic import compression, engine, ids, streams
+from instana_synthetic.generators import now_ms, write_lines
+
+# Topology-driven span trees, generated a batch of traces at a time.
+#
+# Every trace starts at a random service of the application call graph
+# (gen_app_topology) and fans out level by level: a span calls each
+# downstream service of its own service with a probability that grows with
+# the edge weight, up to MAX_DEPTH levels. Children of a span run one after
+# another, so a parent covers its own work plus every child call and its
+# network gap. Errors start at a per-service rate and propagate to the
+# caller with PROPAGATE_PROB.
+#
+# Output is either JSONL, one span per line, or a span table: one raw
+# binary file per column under <stem>.columns/ plus a manifest with the
+# dtypes, the row count and the string tables of the coded columns.
+
+FORMAT = "instana-spans/1"
+
+# Traces per batch; every batch has its own random stream
+TRACE_BLOCK = 16384
+MAX_DEPTH = 5
+PROPAGATE_PROB = 0.7
+
+SPAN_NAMES = ["GET /api/user", "POST /api/order", "GET /api/product", "PUT /api/cart"]
+PROTOCOLS = ["http", "grpc", "kafka"]
+ERROR_CODES = np.array([500, 502, 503], dtype=np.int16)
+
+COLUMNS = {
+    "trace_id": np.int64,      # numeric part of the trace ID
+    "span_id": np.int64,       # numeric part of the span ID
+    "parent": np.int64,        # row of the parent span, -1 for roots
+    "application": np.int32,   # code into the "application" table
+    "service": np.int32,       # code into the "service" table
+    "name": np.int8,           # code into the "name" table
+    "protocol": np.int8,       # code into the "protocol" table
+    "start_time": np.int64,
+    "duration_ms": np.int32,
+    "error": np.bool_,
+    "status_code": np.int16,
+}
+
+def call_graph(topology):
+    """
+    Compile a gen_app_topology() record into CSR arrays.
+
+    Returns:
+        Dict with "services" (names), "offsets"/"targets" (outgoing calls of
+        service s are targets[offsets[s]:offsets[s+1]]), per-edge
+        "call_prob" and "protocol" codes, and per-service "scale_ms" (mean
+        self time) and "error_rate"
+    """
+    services = ids.Interner(node["id"] for node in topology["nodes"])
+    edges = sorted(topology["edges"], key=lambda e: services.intern(e["from"]))
+    sources = np.array([services.intern(e["from"]) for e in edges], dtype=np.int64)
+    rng = engine.make_rng()
+    return {
+        "services": services.strings,
+        "offsets": np.searchsorted(sources, np.arange(len(services) + 1)),
+        "targets": np.array([services.intern(e["to"]) for e in edges], dtype=np.int64),
+        "call_prob": np.array([0.15 + 0.06 * e.get("weight", 5) for e in edges]),
+        "protocol": np.array([PROTOCOLS.index(e.get("protocol", "http")) for e in edges], dtype=np.int8),
+        "scale_ms": rng.uniform(2.0, 20.0, size=len(services)),
+        "error_rate": rng.uniform(0.002, 0.03, size=len(services)),
+    }
+
+def _fan_out(rng, graph, services):
+    """One level of calls: (caller row, callee service, edge) for every call made."""
+    offsets = graph["offsets"]
+    degree = offsets[services + 1] - offsets[services]
+    caller = np.repeat(np.arange(len(services)), degree)
+    first = np.repeat(np.cumsum(degree) - degree, degree)
+    edge = offsets[services][caller] + np.arange(len(caller)) - first
+    called = rng.random(len(edge)) < graph["call_prob"][edge]
+    return caller[called], graph["targets"][edge[called]], edge[called]
+
+def _groups(parent):
+    """Start index and size of every run of equal values in a sorted array."""
+    starts = np.flatnonzero(np.r_[True, parent[1:] != parent[:-1]]) if len(parent) else np.empty(0, np.int64)
+    return starts, np.diff(np.r_[starts, len(parent)])
+
+def span_batch(rng, graph, n_traces, n_apps, max_age_ms=3600000, max_depth=MAX_DEPTH):
+    """
+    Generate the span trees of n_traces traces.
+
+    Returns:
+        Dict of column arrays (see COLUMNS) with spans grouped by trace,
+        roots first; "trace" holds the trace's index in the batch, "parent"
+        a batch-local row and trace_id/span_id are left for the caller
+    """
+    # Build the trees level by level; rows are (level, caller) ordered
+    trace = [np.arange(n_traces)]
+    service = [rng.integers(0, len(graph["services"]), size=n_traces)]
+    parent = [np.full(n_traces, -1, dtype=np.int64)]
+    protocol = [np.zeros(n_traces, dtype=np.int8)]
+    base = 0
+    for _ in range(max_depth - 1):
+        caller, callee, edge = _fan_out(rng, graph, service[-1])
+        if not len(caller):
+            break
+        trace.append(trace[-1][caller])
+        parent.append(base + caller)
+        base += len(service[-1])
+        service.append(callee)
+        protocol.append(graph["protocol"][edge])
+    sizes = [len(level) for level in service]
+    bounds = np.cumsum([0] + sizes)
+    trace, service, parent, protocol = (np.concatenate(c) for c in (trace, service, parent, protocol))
+    total = len(service)
+
+    # Bottom-up: a span lasts its own work plus every child call and gap
+    duration = np.rint(rng.gamma(2.0, graph["scale_ms"][service] / 2.0)).astype(np.int64) + 1
+    gap = rng.integers(1, 5, size=total)
+    error = rng.random(total) < graph["error_rate"][service]
+    for level in range(len(sizes) - 1, 0, -1):
+        rows = slice(bounds[level], bounds[level + 1])
+        callers = parent[rows] - bounds[level - 1]
+        span = bounds[level] - bounds[level - 1]
+        duration[bounds[level - 1]:bounds[level]] += np.bincount(
+            callers, weights=duration[rows] + gap[rows], minlength=span).astype(np.int64)
+        failed = np.bincount(callers, weights=error[rows], minlength=span) > 0
+        error[bounds[level - 1]:bounds[level]] |= failed & (rng.random(span) < PROPAGATE_PROB)
+
+    # Top-down: children start one after another inside their parent
+    start = np.empty(total, dtype=np.int64)
+    start[:n_traces] = now_ms() - rng.integers(0, max_age_ms, size=n_traces)
+    for level in range(1, len(sizes)):
+        rows = slice(bounds[level], bounds[level + 1])
+        step = duration[rows] + gap[rows]
+        done = np.cumsum(step) - step
+        first, count = _groups(parent[rows])
+        done -= np.repeat(done[first], count)
+        start[rows] = start[parent[rows]] + done + gap[rows]
+
+    status = np.where(rng.random(total) < 0.3, 201, 200).astype(np.int16)
+    status[error] = ERROR_CODES[rng.integers(0, len(ERROR_CODES), size=int(error.sum()))]
+
+    # Group by trace (stable, so roots stay first) and remap parent rows
+    order = np.argsort(trace, kind="stable")
+    position = np.empty(total, dtype=np.int64)
+    position[order] = np.arange(total)
+    parent = parent[order]
+    parent[parent >= 0] = position[parent[parent >= 0]]
+    return {
+        "trace": trace[order],
+        "parent": parent,
+        "application": rng.integers(0, max(n_apps, 1), size=n_traces)[trace[order]].astype(np.int32),
+        "service": service[order].astype(np.int32),
+        "name": rng.integers(0, len(SPAN_NAMES), size=total).astype(np.int8)[order],
+        "protocol": protocol[order],
+        "start_time": start[order],
+        "duration_ms": duration[order].astype(np.int32),
+        "error": error[order],
+        "status_code": status[order],
+    }
+
+def iter_span_batches(graph, traces, n_apps, max_age_ms=3600000, max_depth=MAX_DEPTH):
+    """
+    Yield span batches covering `traces` traces, with trace_id, span_id and
+    parent_span_id (-1 for roots) filled in and "parent" rebased to a row of
+    the whole table.
+    """
+    span_seq = 0
+    for block in streams.shard_blocks(traces, block_records=TRACE_BLOCK):
+        streams.seed_stream("trace_spans", block)
+        rng = engine.make_rng()
+        first = block * TRACE_BLOCK
+        batch = span_batch(rng, graph, min(TRACE_BLOCK, traces - first), n_apps, max_age_ms, max_depth)
+        parent = batch["parent"]
+        batch["trace_id"] = ids.make_numbers("tree_trace", first + batch.pop("trace"))
+        batch["span_id"] = ids.make_numbers("tree_span", np.arange(span_seq, span_seq + len(parent)))
+        batch["parent_span_id"] = np.where(parent >= 0, batch["span_id"][np.maximum(parent, 0)], -1)
+        parent[parent >= 0] += span_seq
+        span_seq += len(parent)
+        yield batch
+
+def span_lines(batch, tables):
+    """Render a span batch as JSONL lines, one span per line."""
+    lookup = {key: np.array(values, dtype=object) for key, values in tables.items()}
+    columns = (
+        batch["trace_id"].tolist(),
+        batch["span_id"].tolist(),
+        ["null" if p < 0 else f'"span-{p}"' for p in batch["parent_span_id"].tolist()],
+        lookup["application"][batch["application"]].tolist(),
+        lookup["service"][batch["service"]].tolist(),
+        lookup["name"][batch["name"]].tolist(),
+        lookup["protocol"][batch["protocol"]].tolist(),
+        batch["start_time"].tolist(),
+        batch["duration_ms"].tolist(),
+        np.where(batch["error"], "true", "false").tolist(),
+        batch["status_code"].tolist(),
+    )
+    return [SPAN_TEMPLATE % values for values in zip(*columns)]
+
+# Same layout json.dumps() would produce for the span dict
+SPAN_TEMPLATE = ('{"trace_id": "trace-%d", "span_id": "span-%d", "parent_span_id": %s, '
+                 '"application_id": "%s", "service_name": "%s", "name": "%s", "protocol": "%s", '
+                 '"start_time": %d, "duration_ms": %d, "error": %s, "status_code": %d}')
+
+def columns_dir(path):
+    stem = compression.strip_extension(path)
+    return (stem[:-len(".jsonl")] if stem.endswith(".jsonl") else stem) + ".columns"
+
+def stream_span_table(path, batches, tables):
+    """
+    Append every batch to the column files of `path` (see columns_dir())
+    while passing it on; the table is published once the batches run out.
+
+    Args:
+        path: Dataset path, e.g. data/instana/trace_spans.jsonl
+        batches: Batches from iter_span_batches()
+        tables: {"application"|"service"|"name"|"protocol": list of strings}
+    """
+    directory = columns_dir(path)
+    os.makedirs(directory, exist_ok=True)
+    files = {name: open(os.path.join(directory, f"{name}.bin.tmp"), "wb", buffering=1 << 20)
+             for name in COLUMNS}
+    rows = 0
+    try:
+        for batch in batches:
+            for name, dtype in COLUMNS.items():
+                files[name].write(np.ascontiguousarray(batch[name], dtype=dtype).tobytes())
+            rows += len(batch["parent"])
+            yield batch
+    finally:
+        for f in files.values():
+            f.close()
+    # Columns first, manifest last: a reader never sees a manifest without its data
+    for name in COLUMNS:
+        os.replace(os.path.join(directory, f"{name}.bin.tmp"), os.path.join(directory, f"{name}.bin"))
+    manifest = {"format": FORMAT, "rows": rows,
+                "columns": {name: np.dtype(dtype).str for name, dtype in COLUMNS.items()},
+                "tables": tables}
+    with open(os.path.join(directory, "manifest.json.tmp"), "w") as f:
+        json.dump(manifest, f)
+    os.replace(os.path.join(directory, "manifest.json.tmp"), os.path.join(directory, "manifest.json"))
+
+def load_span_table(path, mmap=True):
+    """Return (manifest, {column: array}) of a span table, memory-mapped by default."""
+    directory = columns_dir(path)
+    with open(os.path.join(directory, "manifest.json")) as f:
+        manifest = json.load(f)
+    columns = {}
+    for name, dtype in manifest["columns"].items():
+        file = os.path.join(directory, f"{name}.bin")
+        if mmap and manifest["rows"]:
+            columns[name] = np.memmap(file, dtype=np.dtype(dtype), mode="r", shape=(manifest["rows"],))
+        else:
+            columns[name] = np.fromfile(file, dtype=np.dtype(dtype))
+    return manifest, columns
+
+def write_spans(path, topology, app_ids, traces, fmt="jsonl", max_age_ms=3600000, max_depth=MAX_DEPTH):
+    """
+    Generate `traces` span trees over `topology` and write them.
+
+    Args:
+        path: JSONL path of the dataset; the span table goes next to it
+        topology: gen_app_topology() record
+        app_ids: Application IDs the traces are spread over
+        traces: Number of traces
+        fmt: "jsonl", "columnar" (span table) or "both"
+
+    Returns:
+        Number of spans written
+    """
+    streams.seed_stream("trace_spans", "services")
+    graph = call_graph(topology)
+    tables = {"application": list(app_ids), "service": graph["services"],
+              "name": SPAN_NAMES, "protocol": PROTOCOLS}
+    batches = iter_span_batches(graph, traces, len(app_ids), max_age_ms, max_depth)
+    if fmt != "jsonl":
+        batches = stream_span_table(path, batches, tables)
+    if fmt == "columnar":
+        return sum(len(batch["parent"]) for batch in batches)
+    return write_lines(path, (span_lines(batch, tables) for batch in batches))
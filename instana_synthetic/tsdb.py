@@ -0,0 +1,373 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from instana_synthetic import columnar, compression, links, locks
+
+# Memory-mapped time-series store for the metric datasets.
+#
+# For data/instana/mobile_metrics.jsonl the store lives in
+# data/instana/mobile_metrics.tsdb/:
+#
+#   seg-000000.timestamps     int64 epoch ms, fixed width
+#   seg-000000.<field>        one array per point field (value, crash_rate, ...)
+#   index.json                per series (id, metric_name): its extents, i.e.
+#                             [segment, offset, length, first_ts, last_ts]
+#                             runs of points inside the segment arrays
+#
+# open_store() keeps the store in sync with the dataset: it is built from the
+# columnar copy when that is fresh, otherwise by one streaming pass over the
+# JSONL file. When a plain JSONL file only grew (append mode), just the new
+# tail is ingested into a new segment. Reads return NumPy views into the
+# memory-mapped segments, so a single-extent series costs no copy; a series
+# continued by appends is stitched together from its extents.
+#
+# Builds and appends hold an flock on .lock in the store directory, so
+# concurrent openers (dashboard workers, the refresher, the exporter) never
+# ingest the same tail twice. Segment files are written under a temporary
+# name and renamed into place before index.json is swapped, so an index
+# never points at a partly written segment.
+#
+# The index records the source by file name, size and mtime, not by path, so
+# a store staged next to its dataset stays current when the directory is
+# published as a snapshot. Stores in a published snapshot are opened as they
+# are: snapshots.publish() builds them beforehand, and a missing or stale
+# one is an error rather than something to write into the snapshot.
+
+FORMAT = "instana-tsdb/1"
+INDEX = "index.json"
+
+# Points buffered before a segment is flushed while ingesting JSONL
+SEGMENT_POINTS = 4_000_000
+
+ID_KEYS = ("entity_id", "application_id", "website_id", "mobile_app_id")
+
+# Metric datasets readers open through a store
+DATASETS = (
+    "metrics_timeseries.jsonl",
+    "website_metrics.jsonl",
+    "mobile_metrics.jsonl",
+    "infrastructure_metrics.jsonl",
+    "application_metrics.jsonl",
+)
+
+def store_dir(path):
+    stem = compression.strip_extension(path)
+    return (stem[:-len(".jsonl")] if stem.endswith(".jsonl") else stem) + ".tsdb"
+
+def _signature(path):
+    size, mtime_ns = compression.dataset_stat(path)
+    return {"path": os.path.basename(path), "size": size, "mtime_ns": mtime_ns}
+
+def _source(path):
+    """The file the store should reflect: the fresh columnar manifest or the (compressed) JSONL file."""
+    if columnar.is_fresh(path):
+        return "columnar", columnar.manifest_path(path)
+    resolved = compression.resolve(path)
+    if not os.path.exists(resolved):
+        raise FileNotFoundError(f"No metric dataset at {path}")
+    return "jsonl", resolved
+
+class _Builder:
+    """Accumulates extents and segment arrays for a new index."""
+
+    def __init__(self, directory, index):
+        self.directory = directory
+        self.index = index
+        self.series = {(s["id"], s["metric_name"]): s for s in index["series"]}
+        self.timestamps = []
+        self.fields = {}
+        self.points = 0
+
+    def add(self, header, series_id, timestamps, fields):
+        """Buffer one run of points of a series."""
+        if not len(timestamps):
+            return
+        key = (series_id, header["metric_name"])
+        entry = self.series.get(key)
+        if entry is None:
+            entry = self.series[key] = {"id": series_id, "metric_name": header["metric_name"],
+                                        "aggregation": header.get("aggregation"), "extents": []}
+            if header.get("tenant_id"):
+                entry["tenant_id"] = header["tenant_id"]
+            self.index["series"].append(entry)
+        # Fields are stored in one dtype per segment; remember which series
+        # were integers in the source so their values read back as ints
+        arrays = {name: np.asarray(values) for name, values in fields.items()}
+        integer = [name for name, values in arrays.items() if values.dtype.kind in "iu"]
+        if entry["extents"]:
+            integer = [name for name in entry.get("integer", []) if name in integer]
+        if integer:
+            entry["integer"] = integer
+        else:
+            entry.pop("integer", None)
+        segment = self.index["next_segment"]
+        entry["extents"].append([segment, self.points, len(timestamps), int(timestamps[0]), int(timestamps[-1])])
+        self.timestamps.append(np.asarray(timestamps, dtype=np.int64))
+        for name, values in arrays.items():
+            self.fields.setdefault(name, []).append(values)
+        self.points += len(timestamps)
+        if self.points >= SEGMENT_POINTS:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered points as the next segment."""
+        if not self.points:
+            return
+        name = f"seg-{self.index['next_segment']:06d}"
+        arrays = {"timestamps": np.concatenate(self.timestamps)}
+        for field, parts in self.fields.items():
+            arrays[field] = np.concatenate(parts)
+        for field, values in arrays.items():
+            target = os.path.join(self.directory, f"{name}.{field}")
+            tmp = f"{target}.tmp-{os.getpid()}-{threading.get_ident()}"
+            values.tofile(tmp)
+            os.replace(tmp, target)
+        self.index["segments"].append({"name": name, "points": self.points,
+                                       "dtypes": {f: v.dtype.str for f, v in arrays.items()}})
+        self.index["fields"] = sorted(set(self.index["fields"]) | set(self.fields))
+        self.index["next_segment"] += 1
+        self.timestamps, self.fields, self.points = [], {}, 0
+
+def _ingest_columnar(builder, path):
+    for entry, timestamps, fields in columnar.iter_series(path):
+        builder.add(entry, entry["id"], timestamps, fields)
+
+def _ingest_jsonl(builder, lines):
+    for line in lines:
+        record = json.loads(line)
+        id_key = builder.index["id_key"] or next(k for k in ID_KEYS if k in record)
+        builder.index["id_key"] = id_key
+        points = record.get("points") or []
+        if not points:
+            continue
+        fields = {name: [p[name] for p in points] for name in points[0] if name != "timestamp"}
+        builder.add(record, record[id_key], [p["timestamp"] for p in points], fields)
+
+def _write_index(directory, index):
+    tmp = os.path.join(directory, INDEX + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp, os.path.join(directory, INDEX))
+
+def _load_index(directory):
+    try:
+        with open(os.path.join(directory, INDEX)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+def _remove_unused(directory, index):
+    live = {s["name"] for s in index["segments"]}
+    for file in os.listdir(directory):
+        if file.startswith("seg-") and file.split(".")[0] not in live:
+            os.remove(os.path.join(directory, file))
+
+def _lock(path):
+    directory = store_dir(path)
+    os.makedirs(directory, exist_ok=True)
+    return locks.exclusive(os.path.join(directory, ".lock"))
+
+def build_store(path):
+    """(Re)build the store of a metric dataset from scratch and return its index."""
+    with _lock(path):
+        return _build(path)
+
+def _build(path):
+    kind, source = _source(path)
+    directory = store_dir(path)
+    old = _load_index(directory)
+    index = {"format": FORMAT, "id_key": None, "fields": [], "segments": [], "series": [],
+             "next_segment": old["next_segment"] if old else 0,
+             "source": dict(_signature(source), kind=kind)}
+    builder = _Builder(directory, index)
+    if kind == "columnar":
+        with open(source) as f:
+            index["id_key"] = json.load(f)["id_key"]
+        _ingest_columnar(builder, path)
+    else:
+        with compression.open_text(source) as f:
+            _ingest_jsonl(builder, f)
+    builder.flush()
+    # Segments first, index last; segments of the old index are removed
+    # afterwards (open memory maps keep working on POSIX)
+    _write_index(directory, index)
+    _remove_unused(directory, index)
+    return index
+
+def _append_tail(path, index):
+    """Ingest the lines appended to a plain JSONL file since the index was written."""
+    directory = store_dir(path)
+    _, source = _source(path)
+    builder = _Builder(directory, index)
+    with compression.open_raw(source) as f:
+        f.seek(index["source"]["size"])
+        _ingest_jsonl(builder, f)
+        ingested = f.tell()  # lines appended after the read are picked up by the next sync
+    builder.flush()
+    index["source"] = dict(_signature(source), size=ingested, kind="jsonl")
+    _write_index(directory, index)
+    return index
+
+def _is_current(index, path):
+    kind, source = _source(path)
+    return (index is not None and index.get("format") == FORMAT
+            and index["source"] == dict(_signature(source), kind=kind))
+
+def sync_store(path):
+    """Bring the store of a metric dataset up to date and return its index."""
+    _source(path)  # FileNotFoundError before a store directory is created
+    index = _load_index(store_dir(path))
+    if _is_current(index, path):
+        return index
+    if links.is_published(path):
+        raise FileNotFoundError(f"No current time-series store for {path} in a published snapshot")
+    with _lock(path):
+        # Another process may have synced the store while we waited
+        index = _load_index(store_dir(path))
+        if _is_current(index, path):
+            return index
+        return _sync(path, index)
+
+def _sync(path, index):
+    kind, source = _source(path)
+    if index is None or index.get("format") != FORMAT:
+        return _build(path)
+    current = dict(_signature(source), kind=kind)
+    old = index["source"]
+    if (kind == "jsonl" and old["kind"] == "jsonl" and old["path"] == current["path"]
+            and compression.compression_of(source) is None and current["size"] > old["size"]):
+        with compression.open_raw(source) as f:
+            f.seek(old["size"] - 1)
+            if f.read(1) == b"\n":  # the old content ends on a line boundary: it was appended to
+                return _append_tail(path, index)
+    return _build(path)
+
+class TimeSeriesStore:
+    """Read side of a store: zero-copy NumPy views of series and time ranges."""
+
+    def __init__(self, directory, index):
+        self.directory = directory
+        self.index = index
+        self.id_key = index["id_key"]
+        self.fields = index["fields"]
+        self._series = {(s["id"], s["metric_name"]): s for s in index["series"]}
+        self._segments = {int(s["name"][len("seg-"):]): s for s in index["segments"]}
+        self._maps = {}
+
+    def __len__(self):
+        return len(self.index["series"])
+
+    def series(self):
+        """All series entries: id, metric_name, aggregation, extents (and tenant_id if tagged)."""
+        return self.index["series"]
+
+    def _array(self, segment, field):
+        key = (segment, field)
+        if key not in self._maps:
+            info = self._segments[segment]
+            file = os.path.join(self.directory, f"{info['name']}.{field}")
+            self._maps[key] = np.memmap(file, dtype=np.dtype(info["dtypes"][field]), mode="r",
+                                        shape=(info["points"],))
+        return self._maps[key]
+
+    def read_entry(self, entry, start=None, end=None, fields=None):
+        """
+        Points of one series entry within [start, end] (epoch ms, inclusive).
+
+        Returns:
+            (timestamps, {field: values}); views into the memory maps when
+            the range falls inside a single extent
+        """
+        fields = self.fields if fields is None else fields
+        parts = []
+        for segment, offset, length, first, last in entry["extents"]:
+            if (start is not None and last < start) or (end is not None and first > end):
+                continue
+            timestamps = self._array(segment, "timestamps")[offset:offset + length]
+            lo = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+            hi = length if end is None else int(np.searchsorted(timestamps, end, side="right"))
+            window = slice(offset + lo, offset + hi)
+            parts.append((self._array(segment, "timestamps")[window],
+                          {f: self._array(segment, f)[window] for f in fields}))
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return np.empty(0, dtype=np.int64), {f: np.empty(0) for f in fields}
+        return (np.concatenate([p[0] for p in parts]),
+                {f: np.concatenate([p[1][f] for p in parts]) for f in fields})
+
+    def segment_numbers(self):
+        """Numbers of the segments in the store, oldest first."""
+        return sorted(self._segments)
+
+    def segment_points(self, number, fields=None):
+        """
+        All points of one segment: (series, timestamps, {field: values}),
+        where series[i] is the position in series() of the i-th point's series.
+        """
+        fields = self.fields if fields is None else fields
+        series = np.full(self._segments[number]["points"], -1, dtype=np.int64)
+        for position, entry in enumerate(self.index["series"]):
+            for segment, offset, length, _, _ in entry["extents"]:
+                if segment == number:
+                    series[offset:offset + length] = position
+        return series, self._array(number, "timestamps"), {f: self._array(number, f) for f in fields}
+
+    def to_list(self, entry, field, values):
+        """Values as Python numbers, ints for series that were integers in the source."""
+        if field in entry.get("integer", ()):
+            return values.astype(np.int64).tolist()
+        return values.tolist()
+
+    def read(self, series_id, metric_name, start=None, end=None, fields=None):
+        """read_entry() for the series (series_id, metric_name); KeyError if unknown."""
+        return self.read_entry(self._series[(series_id, metric_name)], start, end, fields)
+
+    def iter_series(self, start=None, end=None, fields=None, tenant_id=None):
+        """Yield (entry, timestamps, {field: values}) for every series."""
+        for entry in self.index["series"]:
+            if tenant_id and entry.get("tenant_id") != tenant_id:
+                continue
+            timestamps, values = self.read_entry(entry, start, end, fields)
+            yield entry, timestamps, values
+
+    def to_frame(self, tenant_id=None, fields=None, start=None, end=None):
+        """
+        Long-format DataFrame: one row per point with the series ID,
+        metric_name, timestamp (epoch ms) and the point fields.
+        """
+        fields = self.fields if fields is None else fields
+        entries, timestamps, values = [], [], {f: [] for f in fields}
+        for entry, ts, vals in self.iter_series(start, end, fields, tenant_id):
+            entries.append(entry)
+            timestamps.append(ts)
+            for f in fields:
+                values[f].append(vals[f])
+        lengths = np.array([len(ts) for ts in timestamps], dtype=np.int64)
+        frame = {
+            self.id_key or "id": np.repeat(np.array([e["id"] for e in entries], dtype=object), lengths),
+            "metric_name": np.repeat(np.array([e["metric_name"] for e in entries], dtype=object), lengths),
+            "timestamp": np.concatenate(timestamps) if timestamps else np.empty(0, dtype=np.int64),
+        }
+        for f in fields:
+            frame[f] = np.concatenate(values[f]) if values[f] else np.empty(0)
+        return pd.DataFrame(frame)
+
+def open_store(path):
+    """
+    Open the time-series store of a metric dataset, building or updating it
+    first if the dataset changed.
+
+    Args:
+        path: Dataset path, e.g. data/instana/metrics_timeseries.jsonl
+
+    Raises:
+        FileNotFoundError: if neither the JSONL file nor a columnar copy
+            exists, or the store of a published snapshot is missing or stale
+    """
+    index = sync_store(path)
+    return TimeSeriesStore(store_dir(path), index)
@@ -4,6 +4,31 @@ import os
 from datetime import datetime
 from alerting import get_alert_manager
 
+class WatchedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    RotatingFileHandler that reopens its file when another process replaced
+    it, e.g. the retention job (instana_synthetic/retention.py) swapping in a
+    compacted copy.
+    """
+
+    def _open(self):
+        stream = super()._open()
+        stat = os.fstat(stream.fileno())
+        self._identity = (stat.st_dev, stat.st_ino)
+        return stream
+
+    def emit(self, record):
+        if self.stream is not None:
+            try:
+                stat = os.stat(self.baseFilename)
+                replaced = (stat.st_dev, stat.st_ino) != self._identity
+            except FileNotFoundError:
+                replaced = True
+            if replaced:
+                self.stream.close()
+                self.stream = None  # reopened by the next write
+        super().emit(record)
+
 def get_logger(name: str, log_file: str = "monitoring.log", max_bytes: int = 1024*1024, backup_count: int = 5) -> logging.Logger:
     """
     Get a configured logger with console and rotating file output.
@@ -39,7 +64,7 @@ def get_logger(name: str, log_file: str = "monitoring.log", max_bytes: int = 102
     logger.addHandler(console_handler)
 
     # Rotating file handler
-    file_handler = logging.handlers.RotatingFileHandler(
+    file_handler = WatchedRotatingFileHandler(
         log_file,
         maxBytes=max_bytes,
         backupCount=backup_count
@@ -4,7 +4,7 @@ from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.holtwinters import ExponentialSmoothing
 import logging
 from typing import Dict, List, Tuple, Optional
-import json
+from instana_synthetic import tsdb
 
 log = logging.getLogger("predictive_analytics")
 
@@ -89,7 +89,7 @@ class TimeSeriesForecaster:
 
 def forecast_timeseries(filepath: str, hours_ahead: int = 24, method: str = "arima") -> Dict[str, Dict]:
     """
-    Forecast timeseries data from JSONL file.
+    Forecast every series of a metric dataset, read from its time-series store.
 
     Args:
         filepath: Path to timeseries JSONL file
@@ -100,37 +100,15 @@ def forecast_timeseries(filepath: str, hours_ahead: int = 24, method: str = "ari
         Dictionary with forecast data by entity
     """
     try:
-        # Load timeseries data
-        data = []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                data.append(json.loads(line.strip()))
-
-        if not data:
-            return {}
-
-        # Group by entity and metric
-        grouped_data = {}
-        for record in data:
-            key = f"{record['entity_id']}_{record['metric_name']}"
-            if key not in grouped_data:
-                grouped_data[key] = []
-            grouped_data[key].append(record)
+        # One zero-copy view per series from the time-series store
+        store = tsdb.open_store(filepath)
 
         forecast_results = {}
 
-        for key, records in grouped_data.items():
-            # Sort by timeframe
-            records.sort(key=lambda x: x['timeframe']['from'])
-
-            # Extract values
-            values = []
-            timestamps = []
-            for record in records:
-                if record['points']:
-                    for point in record['points']:
-                        values.append(point['value'])
-                        timestamps.append(point['timestamp'])
+        for series, series_timestamps, fields in store.iter_series(fields=["value"]):
+            key = f"{series['id']}_{series['metric_name']}"
+            values = store.to_list(series, "value", fields["value"])
+            timestamps = series_timestamps.tolist()
 
             if len(values) < 10:
                 log.warning(f"Insufficient data for {key}")
@@ -1,6 +1,7 @@
 from typing import List, Dict
 import json
 import os
+from instana_synthetic import columnar, compression, snapshots, tsdb
 
 def to_prometheus_format(metric_name: str, labels: Dict, value: float, timestamp_ms: int = None) -> str:
     """
@@ -34,6 +35,18 @@ def export_metrics_to_prometheus(timeseries_data: List[Dict], output_file: str):
     except Exception as e:
         print(f"Error exporting to Prometheus format: {e}")
 
+def iter_metric_points(filepath: str, id_key: str):
+    """
+    Yield (metric_name, series_id, timestamp, value) for every point of a metric
+    dataset, read from its memory-mapped time-series store.
+    """
+    if not compression.dataset_exists(filepath) and not columnar.is_fresh(filepath):
+        return
+    store = tsdb.open_store(filepath)
+    for series, timestamps, fields in store.iter_series(fields=["value"]):
+        for timestamp, value in zip(timestamps.tolist(), store.to_list(series, "value", fields["value"])):
+            yield series["metric_name"], series["id"], timestamp, value
+
 def export_all_metrics_to_prometheus(output_file: str):
     """
     Export all available metrics (application, infrastructure, Kubernetes) to Prometheus format.
@@ -43,35 +56,23 @@ def export_all_metrics_to_prometheus(output_file: str):
     # Create directory if it doesn't exist
     os.makedirs(os.path.dirname(output_file), exist_ok=True)
 
-    # Export application metrics
-    if os.path.exists('data/instana/application_metrics.jsonl'):
-        with open('data/instana/application_metrics.jsonl', 'r') as f:
-            for line in f:
-                record = json.loads(line)
-                metric_name = record.get("metric_name", "unknown_metric")
-                app_id = record.get("application_id", "unknown_app")
+    # Resolve the current snapshot once, so every dataset of this export
+    # comes from the same version even if the generator publishes meanwhile
+    data_dir = snapshots.data_dir()
 
-                for point in record.get("points", []):
-                    labels = {"application_id": app_id, "type": "application"}
-                    prom_line = to_prometheus_format(metric_name, labels, point['value'], point['timestamp'])
-                    prom_lines.append(prom_line)
+    # Export application metrics
+    for metric_name, app_id, timestamp, value in iter_metric_points(os.path.join(data_dir, 'application_metrics.jsonl'), "application_id"):
+        labels = {"application_id": app_id, "type": "application"}
+        prom_lines.append(to_prometheus_format(metric_name, labels, value, timestamp))
 
     # Export infrastructure metrics
-    if os.path.exists('data/instana/infrastructure_metrics.jsonl'):
-        with open('data/instana/infrastructure_metrics.jsonl', 'r') as f:
-            for line in f:
-                record = json.loads(line)
-                metric_name = record.get("metric_name", "unknown_metric")
-                entity_id = record.get("entity_id", "unknown_entity")
-
-                for point in record.get("points", []):
-                    labels = {"entity_id": entity_id, "type": "infrastructure"}
-                    prom_line = to_prometheus_format(metric_name, labels, point['value'], point['timestamp'])
-                    prom_lines.append(prom_line)
+    for metric_name, entity_id, timestamp, value in iter_metric_points(os.path.join(data_dir, 'infrastructure_metrics.jsonl'), "entity_id"):
+        labels = {"entity_id": entity_id, "type": "infrastructure"}
+        prom_lines.append(to_prometheus_format(metric_name, labels, value, timestamp))
 
     # Export Kubernetes metrics
-    if os.path.exists('data/instana/kubernetes_pods.jsonl'):
-        with open('data/instana/kubernetes_pods.jsonl', 'r') as f:
+    if compression.dataset_exists(os.path.join(data_dir, 'kubernetes_pods.jsonl')):
+        with compression.open_dataset(os.path.join(data_dir, 'kubernetes_pods.jsonl')) as f:
             for line in f:
                 record = json.loads(line)
                 pod_id = record.get("pod_id", "unknown_pod")
@@ -93,8 +94,8 @@ def export_all_metrics_to_prometheus(output_file: str):
                 prom_lines.append(prom_line)
 
     # Export cluster metrics
-    if os.path.exists('data/instana/kubernetes_clusters.jsonl'):
-        with open('data/instana/kubernetes_clusters.jsonl', 'r') as f:
+    if compression.dataset_exists(os.path.join(data_dir, 'kubernetes_clusters.jsonl')):
+        with compression.open_dataset(os.path.join(data_dir, 'kubernetes_clusters.jsonl')) as f:
             for line in f:
                 record = json.loads(line)
                 cluster_id = record.get("cluster_id", "unknown_cluster")
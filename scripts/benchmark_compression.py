@@ -0,0 +1,79 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, '.')
+from instana_synthetic import compression, datasets, streams
+from instana_synthetic.datasets import parse_count
+from instana_synthetic.generators import set_clock
+
+# Datasets used for the comparison: a record stream and a metric file
+DATASETS = {
+    "logs.jsonl": lambda out_dir, args: datasets.generate_logs(out_dir=out_dir, count=args.logs),
+    "application_metrics.jsonl": lambda out_dir, args: datasets.generate_application_metrics(
+        out_dir=out_dir, count=args.metric_apps, minutes=args.minutes),
+}
+
+def read_all(path):
+    """Parse every record of a dataset; returns (records, uncompressed bytes)."""
+    records = size = 0
+    with compression.open_dataset(path) as f:
+        for line in f:
+            json.loads(line)
+            records += 1
+            size += len(line)
+    return records, size
+
+def run(args):
+    available = [c for c in compression.COMPRESSIONS if c != "zstd" or compression.zstandard is not None]
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for codec in available:
+            out_dir = os.path.join(tmp, codec)
+            os.makedirs(out_dir)
+            datasets.set_compression(codec)
+            datasets.generate_applications(out_dir=out_dir, count=args.metric_apps)  # metric series IDs
+            for filename, generate in DATASETS.items():
+                streams.set_seed(args.seed)
+                streams.seed_stream(filename)
+                start = time.perf_counter()
+                generate(out_dir, args)
+                write_seconds = time.perf_counter() - start
+                path = datasets.output_path(out_dir, filename)
+                start = time.perf_counter()
+                records, size = read_all(path)
+                read_seconds = time.perf_counter() - start
+                rows.append({"dataset": filename, "compression": codec, "records": records,
+                             "raw_bytes": size, "disk_bytes": os.path.getsize(path),
+                             "write_seconds": write_seconds, "read_seconds": read_seconds})
+    return rows, [c for c in compression.COMPRESSIONS if c not in available]
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare disk size and read throughput of plain, gzip and zstd JSONL")
+    parser.add_argument("--logs", type=parse_count, default=200000)
+    parser.add_argument("--metric-apps", type=parse_count, default=500)
+    parser.add_argument("--minutes", type=int, default=240)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", default=None, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+    set_clock(1700000000000)
+
+    rows, skipped = run(args)
+    mb = 1024 * 1024
+    print(f"{'dataset':<30}{'codec':>6}{'records':>10}{'disk MB':>9}{'ratio':>7}"
+          f"{'write s':>9}{'read s':>8}{'records/s':>11}{'MB/s':>8}")
+    for row in rows:
+        print(f"{row['dataset']:<30}{row['compression']:>6}{row['records']:>10}"
+              f"{row['disk_bytes'] / mb:>9.1f}{row['raw_bytes'] / max(row['disk_bytes'], 1):>7.1f}"
+              f"{row['write_seconds']:>9.2f}{row['read_seconds']:>8.2f}"
+              f"{row['records'] / row['read_seconds']:>11,.0f}{row['raw_bytes'] / mb / row['read_seconds']:>8.1f}")
+    if skipped:
+        print(f"Skipped {', '.join(skipped)}: install the 'zstandard' package to include it")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+sys.path.insert(0, '.')
+import pandas as pd
+from instana_synthetic import datasets, frames, streams, tsdb
+from instana_synthetic.datasets import parse_count
+from instana_synthetic.generators import set_clock
+
+# Row-by-row loaders as the dashboard had them, for comparison
+def read_records(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+def website_iterrows(path):
+    df = pd.DataFrame(read_records(path))
+    rows = []
+    for _, row in df.iterrows():
+        for point in row['points']:
+            rows.append({'website_id': row['website_id'],
+                         'timestamp': datetime.fromtimestamp(point['timestamp'] / 1000),
+                         'value': point['value']})
+    return pd.DataFrame(rows)
+
+def mobile_dict_per_point(path):
+    rows = []
+    for record in read_records(path):
+        for point in record['points']:
+            rows.append({'mobile_app_id': record['mobile_app_id'],
+                         'timestamp': pd.to_datetime(point['timestamp'], unit='ms'),
+                         'crash_rate': point['crash_rate'],
+                         'response_time_ms': point['response_time_ms']})
+    return pd.DataFrame(rows)
+
+def pods_apply(path):
+    df = pd.DataFrame(read_records(path))
+    return df['metrics'].apply(lambda x: x['cpu_usage_cores']), df['metrics'].apply(lambda x: x['memory_usage_mb'])
+
+# Column-at-a-time loaders of the dashboard
+def website_points_frame(path):
+    return frames.points_frame(read_records(path), 'website_id', ['value'], local=True)
+
+def mobile_points_frame(path):
+    return frames.points_frame(read_records(path), 'mobile_app_id', ['crash_rate', 'response_time_ms'])
+
+def store_frame(path, fields, local):
+    df = tsdb.open_store(path).to_frame(fields=fields)
+    df['timestamp'] = frames.to_datetimes(df['timestamp'], local=local)
+    return df
+
+def pods_read_frame(path):
+    df = frames.read_frame(path, nested=('metrics',))
+    return df['metrics.cpu_usage_cores'], df['metrics.memory_usage_mb']
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, len(result) if isinstance(result, pd.DataFrame) else len(result[0])
+
+def run(args):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        minutes = max(1, args.points // args.series)
+        streams.set_seed(args.seed)
+        datasets.generate_website_metrics(out_dir=tmp, count=args.series, minutes=minutes)
+        datasets.generate_mobile_metrics(out_dir=tmp, count=args.series, minutes=minutes)
+        datasets.generate_kubernetes_clusters(out_dir=tmp, count=10)
+        datasets.generate_kubernetes_deployments(out_dir=tmp, per_cluster=10)
+        datasets.generate_kubernetes_pods(out_dir=tmp, per_deployment=max(1, args.pods // 100))
+        website = os.path.join(tmp, "website_metrics.jsonl")
+        mobile = os.path.join(tmp, "mobile_metrics.jsonl")
+        pods = os.path.join(tmp, "kubernetes_pods.jsonl")
+        cases = [
+            ("website_metrics", "iterrows + fromtimestamp", website_iterrows, (website,)),
+            ("website_metrics", "frames.points_frame", website_points_frame, (website,)),
+            ("website_metrics", "tsdb store, first load", store_frame, (website, ['value'], True)),
+            ("website_metrics", "tsdb store, built", store_frame, (website, ['value'], True)),
+            ("mobile_metrics", "dict per point", mobile_dict_per_point, (mobile,)),
+            ("mobile_metrics", "frames.points_frame", mobile_points_frame, (mobile,)),
+            ("mobile_metrics", "tsdb store, first load", store_frame, (mobile, ['crash_rate', 'response_time_ms'], False)),
+            ("mobile_metrics", "tsdb store, built", store_frame, (mobile, ['crash_rate', 'response_time_ms'], False)),
+            ("kubernetes_pods", "DataFrame + apply", pods_apply, (pods,)),
+            ("kubernetes_pods", "frames.read_frame", pods_read_frame, (pods,)),
+        ]
+        for dataset, loader, func, func_args in cases:
+            seconds, count = timed(func, *func_args)
+            rows.append({"dataset": dataset, "loader": loader, "rows": count, "seconds": seconds})
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare row-by-row and columnar dashboard loaders")
+    parser.add_argument("--points", type=parse_count, default=1_000_000, help="Points per metric dataset")
+    parser.add_argument("--series", type=parse_count, default=1000, help="Series per metric dataset")
+    parser.add_argument("--pods", type=parse_count, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--report", default=None, help="Write the results as JSON to this file")
+    args = parser.parse_args()
+    set_clock(1700000000000)
+
+    rows = run(args)
+    print(f"{'dataset':<18}{'loader':<28}{'rows':>10}{'seconds':>9}{'rows/s':>12}")
+    for row in rows:
+        print(f"{row['dataset']:<18}{row['loader']:<28}{row['rows']:>10}{row['seconds']:>9.2f}"
+              f"{row['rows'] / row['seconds']:>12,.0f}")
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(rows, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+import argparse
+import logging
+import sys
+sys.path.insert(0, '.')
+from instana_synthetic.datasets import DATA_DIR
+from instana_synthetic.retention import run_compaction, run_forever
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply event_settings retention and compact data files")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--log-dir", default=None,
+                        help="Directory of monitoring.log and alert_history.jsonl (defaults to the parent of data/)")
+    parser.add_argument("--interval", type=int, default=0,
+                        help="Seconds between passes when running in the background; 0 runs a single pass")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] %(message)s')
+
+    if args.interval:
+        run_forever(args.data_dir, args.interval, log_dir=args.log_dir)
+    else:
+        report = run_compaction(args.data_dir, log_dir=args.log_dir)
+        for path, stats in report.items():
+            print(f"{path}: {stats}")
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,13 @@
 import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_app_topology, write_jsonl
+from instana_synthetic.datasets import generate_app_topology
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--count", type=int, default=5)
     args = parser.parse_args()
-
-    topologies = []
-    for i in range(args.count):
-        topologies.append(gen_app_topology())
-
-    write_jsonl("data/instana/app_topology.jsonl", topologies)
+    generate_app_topology(count=args.count)
 
 if __name__ == "__main__":
     main()
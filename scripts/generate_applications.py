@@ -1,14 +1,13 @@
 import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_application, write_jsonl
+from instana_synthetic.datasets import generate_applications
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--count", type=int, default=20)
     args = parser.parse_args()
-    records = [gen_application(i) for i in range(args.count)]
-    write_jsonl("data/instana/applications.jsonl", records)
+    generate_applications(count=args.count)
 
 if __name__ == "__main__":
     main()
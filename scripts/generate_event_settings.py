@@ -1,18 +1,13 @@
 import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_event_settings, write_jsonl
+from instana_synthetic.datasets import generate_event_settings
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--count", type=int, default=5)
     args = parser.parse_args()
-
-    settings = []
-    for i in range(args.count):
-        settings.append(gen_event_settings())
-
-    write_jsonl("data/instana/event_settings.jsonl", settings)
+    generate_event_settings(count=args.count)
 
 if __name__ == "__main__":
     main()
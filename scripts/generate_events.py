@@ -1,19 +1,16 @@
 import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_events, write_jsonl
+from instana_synthetic.datasets import (
+    generate_events, parse_count, add_shard_arguments, apply_shard_arguments
+)
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--count", type=int, default=50)
+    parser.add_argument("--count", type=parse_count, default=50)
+    add_shard_arguments(parser)
     args = parser.parse_args()
-
-    # Generate entity IDs for correlation
-    entity_ids = [f"entity-{random.randint(100000,999999)}" for _ in range(20)]
-    events = gen_events(entity_ids, args.count)
-
-    write_jsonl("data/instana/events.jsonl", events)
+    generate_events(count=args.count, **apply_shard_arguments(args, "events"))
 
 if __name__ == "__main__":
-    import random
     main()
@@ -1,18 +1,13 @@
 import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_infra_alert_config, write_jsonl
+from instana_synthetic.datasets import generate_infra_alert_configs
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--count", type=int, default=10)
     args = parser.parse_args()
-
-    configs = []
-    for i in range(args.count):
-        configs.append(gen_infra_alert_config())
-
-    write_jsonl("data/instana/infra_alert_configs.jsonl", configs)
+    generate_infra_alert_configs(count=args.count)
 
 if __name__ == "__main__":
     main()
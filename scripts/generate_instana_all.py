@@ -1,101 +1,99 @@
 import argparse
-import subprocess
+import logging
+import os
 import sys
-
-def run_script(script, args):
-    cmd = [sys.executable, script] + args
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        print(f"Error running {script}: {result.stderr}")
-        sys.exit(1)
-    else:
-        print(f"Successfully ran {script}")
+import time
+sys.path.insert(0, '.')
+from instana_synthetic import snapshots
+from instana_synthetic.compression import COMPRESSIONS
+from instana_synthetic.datasets import DATA_DIR, METRIC_FORMATS, parse_count
+from instana_synthetic.tenants import tenant_dir
+from instana_synthetic.orchestrator import PROFILES, build_plan, build_append_plan, run_plan, format_report, write_benchmark
+from validate_kubernetes import validate_metrics
 
 def main():
     parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="small",
+                        help="Scale profile; individual count options below override it")
     parser.add_argument("--seed", type=int, default=42)
-    parser.add_argument("--entities", type=int, default=120)
-    parser.add_argument("--apps", type=int, default=15)
-    parser.add_argument("--services", type=int, default=40)
-    parser.add_argument("--issues", type=int, default=30)
+    for key in PROFILES["small"]:
+        # e.g. --entities, --pods-per-deployment; counts accept k/M/G suffixes
+        parser.add_argument(f"--{key.replace('_', '-')}", type=parse_count, default=None)
+    parser.add_argument("--now-ms", type=int, default=None,
+                        help="Fixed generation time in epoch ms, for byte-identical reruns")
+    parser.add_argument("--jobs", type=int, default=None, help="Worker processes (defaults to CPU count)")
+    parser.add_argument("--out-dir", default=DATA_DIR)
+    parser.add_argument("--metrics-format", choices=METRIC_FORMATS, default="jsonl",
+                        help="Metric datasets as jsonl, columnar (NPZ + manifest) or both")
+    parser.add_argument("--compress", choices=COMPRESSIONS, default="none",
+                        help="Compress the JSONL datasets (.jsonl.gz / .jsonl.zst); readers detect it by extension")
+    parser.add_argument("--event-store", action="store_true",
+                        help="Also write logs, events, issues and synthetic runs into a SQLite event store "
+                             "(events.sqlite) that the dashboard queries")
+    parser.add_argument("--tenants", type=int, default=0,
+                        help="Generate every dataset for N tenants, each into its own <out-dir>/tenant-<n> partition")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="Generate into a fresh snapshot directory and publish it as the next version "
+                             "(current.json) once complete, instead of rewriting the datasets readers have open")
+    parser.add_argument("--append", action="store_true",
+                        help="Continue the existing series and append new records instead of regenerating")
+    parser.add_argument("--benchmark", action="store_true",
+                        help="Isolate each dataset in its own process and report records/s, MB/s and peak RSS")
+    parser.add_argument("--report", default=None, help="Write the benchmark results as JSON to this file")
     args = parser.parse_args()
+    if args.append and args.metrics_format == "columnar":
+        parser.error("--append extends the JSONL files; use --metrics-format jsonl or both")
 
-    import random
-    random.seed(args.seed)
-
-    # Generate entities
-    run_script("scripts/generate_entities.py", ["--count", str(args.entities)])
-
-    # Generate applications
-    run_script("scripts/generate_applications.py", ["--count", str(args.apps)])
-
-    # Generate endpoints
-    run_script("scripts/generate_endpoints.py", ["--count", str(args.services)])
-
-    # Generate issues
-    run_script("scripts/generate_issues.py", ["--count", str(args.issues)])
-
-    # Generate timeseries (depends on entities)
-    run_script("scripts/generate_timeseries.py", ["--minutes", "60"])
-
-    # Generate topology
-    run_script("scripts/generate_topology.py", [])
-
-    # Generate alert configs
-    run_script("scripts/generate_alert_configs.py", [])
-
-    # Generate catalogs
-    run_script("scripts/generate_catalogs.py", [])
-
-    # Generate website monitoring
-    run_script("scripts/generate_website_config.py", ["--count", "10"])
-    run_script("scripts/generate_website_catalog.py", [])
-    run_script("scripts/generate_website_metrics.py", ["--count", "10", "--minutes", "60"])
-    run_script("scripts/generate_website_analyze.py", ["--count", "10"])
+    logging.basicConfig(level=logging.INFO, format='[%(asctime)s] [%(levelname)s] %(message)s')
 
-    # Generate logging
-    run_script("scripts/generate_logs.py", ["--count", "100"])
-
-    # Generate synthetic checks
-    run_script("scripts/generate_synthetic_checks.py", ["--count", "20"])
-    run_script("scripts/generate_synthetic_runs.py", ["--count", "100"])
-
-    # Generate mobile monitoring
-    run_script("scripts/generate_mobile_config.py", ["--count", "10"])
-    run_script("scripts/generate_mobile_catalog.py", [])
-    run_script("scripts/generate_mobile_metrics.py", ["--count", "10", "--minutes", "60"])
-    run_script("scripts/generate_mobile_analyze.py", ["--count", "10"])
-
-    # Generate v1.4.0 infrastructure monitoring
-    run_script("scripts/generate_infrastructure_entities.py", ["--count", "50"])
-    run_script("scripts/generate_infrastructure_metrics.py", ["--count", "20", "--minutes", "60"])
-    run_script("scripts/generate_infra_topology.py", ["--count", "5"])
-
-    # Generate v1.4.0 application enhancements
-    run_script("scripts/generate_application_metrics.py", ["--count", "20", "--minutes", "60"])
-    run_script("scripts/generate_application_traces.py", ["--count", "10"])
-    run_script("scripts/generate_app_topology.py", ["--count", "5"])
-    run_script("scripts/generate_app_settings.py", ["--count", "10"])
-
-    # Generate v1.4.0 alert configurations
-    run_script("scripts/generate_global_alert_configs.py", ["--count", "10"])
-    run_script("scripts/generate_infra_alert_configs.py", ["--count", "10"])
-
-    # Generate v1.4.0 event settings and host agent
-    run_script("scripts/generate_event_settings.py", ["--count", "5"])
-    run_script("scripts/generate_host_agent_status.py", ["--count", "20"])
-    run_script("scripts/generate_events.py", ["--count", "50"])
-
-    # Generate v1.4.0 user management
-    run_script("scripts/generate_user_roles.py", [])
-    run_script("scripts/generate_api_tokens.py", ["--count", "5"])
-    run_script("scripts/generate_access_catalogs.py", [])
-
-    # Generate v1.6.0 Kubernetes monitoring
-    run_script("scripts/generate_kubernetes_data.py", ["--clusters", "10", "--deployments-per-cluster", "5", "--pods-per-deployment", "3"])
+    config = dict(PROFILES[args.profile])
+    config.update({key: getattr(args, key) for key in config if getattr(args, key) is not None})
+    if args.append:
+        plan = build_append_plan(logs=config["logs"], synthetic_runs=config["synthetic_runs"],
+                                 events=config["events"], traces=config["traces"])
+    else:
+        plan = build_plan(**config, metrics_format=args.metrics_format)
+
+    # Tenants get their own partition and seed; without --tenants everything goes to the default tenant
+    partitions = [(f"tenant-{t+1}", args.seed + t + 1) for t in range(args.tenants)] or [(None, args.seed)]
+    # With --snapshot, write into a staging copy (of the current snapshot, when appending)
+    data_dir = snapshots.begin(args.out_dir, seed=args.append) if args.snapshot else args.out_dir
+    results = {}
+    start = time.perf_counter()
+    try:
+        for tenant_id, seed in partitions:
+            out_dir = tenant_dir(data_dir, tenant_id)
+            os.makedirs(out_dir, exist_ok=True)
+            tenant_results = run_plan(plan, out_dir=out_dir, jobs=args.jobs, seed=seed,
+                                      now_ms=args.now_ms, benchmark=args.benchmark, compression=args.compress,
+                                      event_store=args.event_store)
+            for name, stats in tenant_results.items():
+                total = results.setdefault(name, dict(stats, records=0, seconds=0.0, bytes=0))
+                for key in ("records", "seconds", "bytes"):
+                    total[key] += stats[key]
+                total["peak_rss"] = max(total["peak_rss"], stats["peak_rss"])
+            if tenant_id:
+                print(f"Generated tenant {tenant_id} into {out_dir}")
+    except Exception as e:
+        print(f"Error generating datasets: {e}")
+        if args.snapshot:
+            snapshots.discard(data_dir)
+        sys.exit(1)
+    if args.snapshot:
+        version = snapshots.publish(args.out_dir, data_dir)
+        data_dir = snapshots.snapshot_dir(args.out_dir, version)
+        print(f"Published snapshot v{version} ({data_dir})")
+    wall_seconds = time.perf_counter() - start
+    print(format_report(results, wall_seconds))
+    if args.report:
+        write_benchmark(args.report, args.profile, config, results, wall_seconds)
+        print(f"Benchmark report written to {args.report}")
+    if args.benchmark:
+        return
 
     # Validate Kubernetes data for dashboard
-    run_script("scripts/validate_kubernetes.py", [])
+    if not validate_metrics(f"{data_dir}/kubernetes_metrics.jsonl", "grafana_dashboards/kubernetes_metrics.json"):
+        sys.exit(1)
 
     print("All Instana synthetic data generated successfully!")
 
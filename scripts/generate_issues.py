@@ -1,18 +1,14 @@
-import json, random, time
+import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_issue_record, write_jsonl
+from instana_synthetic.datasets import generate_issues, add_shard_arguments, apply_shard_arguments
 
 def main():
-    # Load entity IDs from infrastructure_entities.jsonl
-    with open("data/instana/infrastructure_entities.jsonl") as f:
-        blob = json.loads(next(f))
-    entity_ids = [item["entity_id"] for item in blob["items"]]
-
-    # Generate 30 issues referencing valid entity IDs
-    issues = [gen_issue_record(i, entity_ids) for i in range(30)]
-
-    write_jsonl("data/instana/issues.jsonl", issues)
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--count", type=int, default=30)
+    add_shard_arguments(parser)
+    args = parser.parse_args()
+    generate_issues(count=args.count, **apply_shard_arguments(args, "issues"))
 
 if __name__ == "__main__":
     main()
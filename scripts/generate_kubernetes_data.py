@@ -1,4 +1,5 @@
 import argparse
+import os
 import sys
 sys.path.insert(0, '.')
 from instana_synthetic.generators import (
@@ -7,32 +8,50 @@ from instana_synthetic.generators import (
     gen_kubernetes_pod,
     write_jsonl
 )
+from instana_synthetic.datasets import (
+    DATA_DIR, parse_count, output_path, add_compression_argument, apply_compression_argument
+)
+from instana_synthetic.tenants import tag_records, tenant_dir
+
+def generate(out_dir, args, tenant_id=None):
+    """Write clusters, deployments and pods into one directory; returns the three counts."""
+    clusters = [gen_kubernetes_cluster(i) for i in range(args.clusters)]
+    deployments = [gen_kubernetes_deployment(i, c['cluster_id']) for c in clusters for i in range(args.deployments_per_cluster)]
+    # Pods dominate the volume, so they are streamed straight to disk
+    pods = (gen_kubernetes_pod(i, d['cluster_id'], d['deployment_id']) for d in deployments for i in range(args.pods_per_deployment))
+    if tenant_id:
+        clusters, deployments = list(tag_records(clusters, tenant_id)), list(tag_records(deployments, tenant_id))
+        pods = tag_records(pods, tenant_id)
+
+    write_jsonl(output_path(out_dir, "kubernetes_clusters.jsonl"), clusters)
+    write_jsonl(output_path(out_dir, "kubernetes_deployments.jsonl"), deployments)
+    pod_count = write_jsonl(output_path(out_dir, "kubernetes_pods.jsonl"), pods)
+    return len(clusters), len(deployments), pod_count
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--clusters", type=int, default=10, help="Number of clusters to generate")
     parser.add_argument("--deployments-per-cluster", type=int, default=5, help="Number of deployments per cluster")
-    parser.add_argument("--pods-per-deployment", type=int, default=3, help="Number of pods per deployment")
-    parser.add_argument("--tenants", type=int, default=1, help="Number of tenants to generate data for")
+    parser.add_argument("--pods-per-deployment", type=parse_count, default=3, help="Number of pods per deployment")
+    parser.add_argument("--tenants", type=int, default=0,
+                        help="Number of tenants; with N > 0 each tenant-<n> gets its own partition "
+                             "under the data directory, otherwise the data goes to the default tenant")
+    add_compression_argument(parser)
     args = parser.parse_args()
- 
-    all_clusters = []
-    all_deployments = []
-    all_pods = []
+    apply_compression_argument(args)
 
+    if not args.tenants:
+        clusters, deployments, pods = generate(DATA_DIR, args)
+        print(f"Generated {clusters} clusters, {deployments} deployments, and {pods} pods.")
+        return
+
+    totals = [0, 0, 0]
     for t in range(args.tenants):
         tenant_id = f"tenant-{t+1}"
-        clusters = [gen_kubernetes_cluster(i) for i in range(args.clusters)]
-        deployments = [gen_kubernetes_deployment(i, c['cluster_id']) for c in clusters for i in range(args.deployments_per_cluster)]
-        pods = [gen_kubernetes_pod(i, d['cluster_id'], d['deployment_id']) for d in deployments for i in range(args.pods_per_deployment)]
-        all_clusters.extend(clusters)
-        all_deployments.extend(deployments)
-        all_pods.extend(pods)
-
-    write_jsonl("data/instana/kubernetes_clusters.jsonl", all_clusters)
-    write_jsonl("data/instana/kubernetes_deployments.jsonl", all_deployments)
-    write_jsonl("data/instana/kubernetes_pods.jsonl", all_pods)
-    print(f"Generated {len(all_clusters)} clusters, {len(all_deployments)} deployments, and {len(all_pods)} pods across {args.tenants} tenants.")
+        out_dir = tenant_dir(DATA_DIR, tenant_id)
+        os.makedirs(out_dir, exist_ok=True)
+        totals = [a + b for a, b in zip(totals, generate(out_dir, args, tenant_id))]
+    print(f"Generated {totals[0]} clusters, {totals[1]} deployments, and {totals[2]} pods across {args.tenants} tenants.")
 
 if __name__ == "__main__":
     main()
@@ -1,15 +1,16 @@
 import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_log_entry, write_jsonl
+from instana_synthetic.datasets import (
+    generate_logs, parse_count, add_shard_arguments, apply_shard_arguments
+)
 
 def main():
     parser = argparse.ArgumentParser()
-    parser.add_argument("--count", type=int, default=100)
+    parser.add_argument("--count", type=parse_count, default=100)
+    add_shard_arguments(parser)
     args = parser.parse_args()
-    entity_ids = [f"srv-{15284626 + i}" for i in range(10)]  # sample entity_ids
-    records = [gen_log_entry(entity_ids) for _ in range(args.count)]
-    write_jsonl("data/instana/logs.jsonl", records)
+    generate_logs(count=args.count, **apply_shard_arguments(args, "logs"))
 
 if __name__ == "__main__":
     main()
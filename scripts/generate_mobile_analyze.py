@@ -1,15 +1,13 @@
 import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_mobile_analyze, write_jsonl
+from instana_synthetic.datasets import generate_mobile_analyze
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--count", type=int, default=10)
     args = parser.parse_args()
-    mobile_app_ids = [f"mobile-{i+100000}" for i in range(args.count)]
-    records = [gen_mobile_analyze(mid) for mid in mobile_app_ids]
-    write_jsonl("data/instana/mobile_analyze.jsonl", records)
+    generate_mobile_analyze(count=args.count)
 
 if __name__ == "__main__":
     main()
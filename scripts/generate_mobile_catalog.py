@@ -1,10 +1,12 @@
+import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_mobile_catalog, write_jsonl
+from instana_synthetic.datasets import generate_mobile_catalog
 
 def main():
-    record = gen_mobile_catalog()
-    write_jsonl("data/instana/mobile_catalog.jsonl", [record]) # Corrected path
+    parser = argparse.ArgumentParser()
+    args = parser.parse_args()
+    generate_mobile_catalog()
 
 if __name__ == "__main__":
     main()
@@ -1,14 +1,13 @@
 import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_mobile_config, write_jsonl
+from instana_synthetic.datasets import generate_mobile_config
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--count", type=int, default=10)
     args = parser.parse_args()
-    records = [gen_mobile_config(i) for i in range(args.count)]
-    write_jsonl("data/instana/mobile_config.jsonl", records) # Corrected path
+    generate_mobile_config(count=args.count)
 
 if __name__ == "__main__":
     main()
@@ -1,16 +1,21 @@
 import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_mobile_metrics, write_jsonl
+from instana_synthetic.datasets import (
+    generate_mobile_metrics, METRIC_FORMATS,
+    add_compression_argument, apply_compression_argument
+)
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--count", type=int, default=10)
     parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--format", choices=METRIC_FORMATS, default="jsonl",
+                        help="jsonl, columnar (NPZ + manifest) or both")
+    add_compression_argument(parser)
     args = parser.parse_args()
-    mobile_app_ids = [f"mobile-{i+100000}" for i in range(args.count)]
-    records = [gen_mobile_metrics(mid, args.minutes) for mid in mobile_app_ids]
-    write_jsonl("data/instana/mobile_metrics.jsonl", records) # Corrected path
+    apply_compression_argument(args)
+    generate_mobile_metrics(count=args.count, minutes=args.minutes, fmt=args.format)
 
 if __name__ == "__main__":
     main()
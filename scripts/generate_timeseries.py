@@ -1,7 +1,10 @@
-import argparse, random
+import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_timeseries, write_jsonl
+from instana_synthetic.datasets import (
+    generate_timeseries, METRIC_FORMATS,
+    add_compression_argument, apply_compression_argument
+)
 
 def main():
     parser = argparse.ArgumentParser()
@@ -9,15 +12,12 @@ def main():
     parser.add_argument("--metric", default="latency_p95_ms")
     parser.add_argument("--minutes", type=int, default=60)
     parser.add_argument("--out", default="data/instana/metrics_timeseries.jsonl")
+    parser.add_argument("--format", choices=METRIC_FORMATS, default="jsonl",
+                        help="jsonl, columnar (NPZ + manifest) or both")
+    add_compression_argument(parser)
     args = parser.parse_args()
-
-    with open(args.entities_file) as f:
-        blob = json.loads(next(f))
-    entity_ids = [item["entity_id"] for item in blob["items"]]
-
-    records = [gen_timeseries(eid, args.metric, args.minutes) for eid in entity_ids]
-    write_jsonl(args.out, records)
+    apply_compression_argument(args)
+    generate_timeseries(minutes=args.minutes, metric=args.metric, entities_file=args.entities_file, out=args.out, fmt=args.format)
 
 if __name__ == "__main__":
-    import json
     main()
@@ -0,0 +1,27 @@
+import argparse
+import sys
+sys.path.insert(0, '.')
+from instana_synthetic.datasets import (
+    generate_trace_spans, parse_count, METRIC_FORMATS,
+    add_compression_argument, apply_compression_argument
+)
+from instana_synthetic.generators import set_clock
+from instana_synthetic.streams import set_seed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--traces", type=parse_count, default=1000)
+    parser.add_argument("--format", choices=METRIC_FORMATS, default="jsonl",
+                        help="jsonl (one span per line), columnar (span table) or both")
+    parser.add_argument("--seed", type=int, default=None, help="Master seed (unseeded if omitted)")
+    parser.add_argument("--now-ms", type=int, default=None, help="Fixed generation time in epoch ms")
+    add_compression_argument(parser)
+    args = parser.parse_args()
+    apply_compression_argument(args)
+    set_seed(args.seed)
+    set_clock(args.now_ms)
+    spans = generate_trace_spans(traces=args.traces, fmt=args.format)
+    print(f"Generated {spans} spans for {args.traces} traces.")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,12 @@
 import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_user_roles, write_jsonl
+from instana_synthetic.datasets import generate_user_roles
 
 def main():
     parser = argparse.ArgumentParser()
     args = parser.parse_args()
-
-    users = gen_user_roles()
-    write_jsonl("data/instana/user_roles.jsonl", [users])
+    generate_user_roles()
 
 if __name__ == "__main__":
     main()
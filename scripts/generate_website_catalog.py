@@ -1,10 +1,12 @@
+import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_website_catalog, write_jsonl
+from instana_synthetic.datasets import generate_website_catalog
 
 def main():
-    record = gen_website_catalog()
-    write_jsonl("data/instana/website_catalog.jsonl", [record])
+    parser = argparse.ArgumentParser()
+    args = parser.parse_args()
+    generate_website_catalog()
 
 if __name__ == "__main__":
     main()
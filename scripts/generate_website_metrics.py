@@ -1,16 +1,21 @@
 import argparse
 import sys
 sys.path.insert(0, '.')
-from instana_synthetic.generators import gen_website_metrics, write_jsonl
+from instana_synthetic.datasets import (
+    generate_website_metrics, METRIC_FORMATS,
+    add_compression_argument, apply_compression_argument
+)
 
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--count", type=int, default=10)
     parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--format", choices=METRIC_FORMATS, default="jsonl",
+                        help="jsonl, columnar (NPZ + manifest) or both")
+    add_compression_argument(parser)
     args = parser.parse_args()
-    website_ids = [f"web-{i+100000}" for i in range(args.count)]
-    records = [gen_website_metrics(wid, args.minutes) for wid in website_ids]
-    write_jsonl("data/instana/website_metrics.jsonl", records)
+    apply_compression_argument(args)
+    generate_website_metrics(count=args.count, minutes=args.minutes, fmt=args.format)
 
 if __name__ == "__main__":
     main()
@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from logger import AlertingLogger
 from alerting import check_synthetic_alert, get_alert_manager
 from anomaly_detector import AnomalyDetector
+from instana_synthetic import eventstore
 
 alert_log = AlertingLogger("synthetic_runner")
 alert_manager = get_alert_manager()
@@ -15,6 +16,21 @@ history_cache = {}
 # Store recent runs for alerting (in production, use a proper cache/database)
 recent_runs_cache = {}
 
+# SQLite event store the runs are recorded in (--event-store); None disables it
+event_store_db = None
+
+def record_run(check_id, run_record):
+    """Keep a run for alerting and, if enabled, insert it into the event store."""
+    if check_id not in recent_runs_cache:
+        recent_runs_cache[check_id] = []
+    recent_runs_cache[check_id].append(run_record)
+    recent_runs_cache[check_id] = recent_runs_cache[check_id][-10:]  # Keep only last 10
+    if event_store_db:
+        try:
+            eventstore.insert_records(event_store_db, "synthetic_runs", [dict(run_record, check_id=check_id)])
+        except Exception as e:
+            alert_log.error(f"Failed to record run of {check_id} in the event store: {e}")
+
 def run_synthetic_check(check_config, enable_alerts=True):
     """
     Run a synthetic check based on the provided config.
@@ -74,10 +90,7 @@ def run_synthetic_check(check_config, enable_alerts=True):
         }
 
         # Store recent runs (keep last 10 for alerting logic)
-        if check_id not in recent_runs_cache:
-            recent_runs_cache[check_id] = []
-        recent_runs_cache[check_id].append(run_record)
-        recent_runs_cache[check_id] = recent_runs_cache[check_id][-10:]  # Keep only last 10
+        record_run(check_id, run_record)
 
         if response.status_code == expected_status:
             alert_log.log_monitoring_result("synthetic", url, True, duration)
@@ -96,10 +109,7 @@ def run_synthetic_check(check_config, enable_alerts=True):
             "duration_ms": int(timeout * 1000),
             "status_code": 0
         }
-        if check_id not in recent_runs_cache:
-            recent_runs_cache[check_id] = []
-        recent_runs_cache[check_id].append(run_record)
-        recent_runs_cache[check_id] = recent_runs_cache[check_id][-10:]
+        record_run(check_id, run_record)
 
         alert_log.log_monitoring_result("synthetic", url, False, error_msg=f"Timeout after {timeout}s")
         if enable_alerts:
@@ -111,10 +121,7 @@ def run_synthetic_check(check_config, enable_alerts=True):
             "duration_ms": 0,
             "status_code": 0
         }
-        if check_id not in recent_runs_cache:
-            recent_runs_cache[check_id] = []
-        recent_runs_cache[check_id].append(run_record)
-        recent_runs_cache[check_id] = recent_runs_cache[check_id][-10:]
+        record_run(check_id, run_record)
 
         alert_log.log_monitoring_result("synthetic", url, False, error_msg=str(e))
         if enable_alerts:
@@ -256,11 +263,16 @@ def main():
                        help='Enable alerting for failures')
     parser.add_argument('--no-alerts', action='store_true',
                        help='Disable alerting for failures')
+    parser.add_argument('--event-store', type=str, default=None,
+                       help='Record every run in this SQLite event store, e.g. data/instana/events.sqlite')
 
     args = parser.parse_args()
 
     if args.no_alerts:
         args.alerts = False
+    if args.event_store:
+        global event_store_db
+        event_store_db = args.event_store
 
     run_synthetic_from_config(args.config, args.interval, args.alerts)
 
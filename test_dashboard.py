@@ -7,6 +7,8 @@ Tests data loading functions and basic chart generation.
 import sys
 import os
 sys.path.append(os.getcwd())
+import json
+import dash
 import pandas as pd
 
 from dashboard import (
@@ -14,8 +16,20 @@ from dashboard import (
     load_mobile_analyze,
     load_website_metrics,
     load_synthetic_runs,
-    load_logs
+    load_logs,
+    _load_logs,
+    load_anomalous_timeseries,
+    load_forecast_data,
+    cached_figures,
+    session_user,
+    line_points,
+    zoom_range
 )
+from datetime import datetime
+from instana_synthetic import frames, snapshots, tenants
+from instana_synthetic.generators import write_jsonl
+from instana_synthetic.cache import DatasetCache
+from instana_synthetic.refresher import Refresher
 
 def test_load_mobile_metrics():
     """Test loading mobile metrics data."""
@@ -77,10 +91,232 @@ def test_load_logs():
     else:
         print("No logs data to test.")
 
+def test_columnar_frames():
+    """Test that the columnar frame builders match the row-by-row results."""
+    print("Testing columnar frames...")
+    timestamps = list(range(1_762_000_000_000, 1_763_000_000_000, 3_600_123))
+    local = frames.to_datetimes(timestamps, local=True)
+    assert [t.to_pydatetime() for t in local] == [datetime.fromtimestamp(t / 1000) for t in timestamps]
+    assert frames.to_datetimes(timestamps).equals(pd.to_datetime(timestamps, unit='ms'))
+
+    pods = [{"pod_id": "a", "metrics": {"cpu_usage_cores": 1.5, "memory_usage_mb": 100}},
+            {"pod_id": "b", "metrics": {"cpu_usage_cores": 0.5}, "restarts": 2}]
+    df = frames.records_frame(pods, nested=("metrics",))
+    assert list(df.columns) == ["pod_id", "metrics.cpu_usage_cores", "metrics.memory_usage_mb", "restarts"]
+    assert df["metrics.cpu_usage_cores"].tolist() == [1.5, 0.5] and df["restarts"].isna().tolist() == [True, False]
+
+    records = [{"website_id": "w1", "points": [{"timestamp": 0, "value": 1}, {"timestamp": 60000, "value": 2}]},
+               {"website_id": "w2", "points": []},
+               {"website_id": "w3", "points": [{"timestamp": 0, "value": 3}]}]
+    points = frames.points_frame(records, "website_id")
+    assert points["website_id"].tolist() == ["w1", "w1", "w3"] and points["value"].tolist() == [1, 2, 3]
+    assert points["timestamp"].tolist() == pd.to_datetime([0, 60000, 0], unit='ms').tolist()
+
+def test_dataset_cache(tmp_path):
+    """Test that the dataset cache parses once per file version and evicts LRU entries."""
+    print("Testing dataset cache...")
+    path = tmp_path / "logs.jsonl"
+    path.write_text(json.dumps({"severity": "INFO"}) + "\n")
+    cache = DatasetCache(max_bytes=1 << 20)
+    builds = []
+
+    def build():
+        builds.append(1)
+        with open(path) as f:
+            return pd.DataFrame([json.loads(line) for line in f])
+
+    first = cache.get("logs", [str(path)], build)
+    first["severity"] = "changed"  # callers only modify their own copy
+    assert cache.get("logs", [str(path)], build)["severity"].tolist() == ["INFO"]
+    assert len(builds) == 1
+
+    with open(path, "a") as f:
+        f.write(json.dumps({"severity": "ERROR"}) + "\n")
+    assert len(cache.get("logs", [str(path)], build)) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], len(builds)) == (1, 2, 2)
+
+    small = DatasetCache(max_bytes=stats["bytes"] + 1)
+    small.get("a", [str(path)], build)
+    small.get("b", [str(path)], build)
+    assert small.stats()["evictions"] == 1 and small.stats()["entries"] == 1
+
+def test_tenant_partitions(tmp_path):
+    """Test that each tenant's datasets live in, and are read from, its own partition."""
+    print("Testing tenant partitions...")
+    assert tenants.tenant_dir(str(tmp_path)) == str(tmp_path)
+    assert tenants.tenant_dir(str(tmp_path), "default") == str(tmp_path)
+    for tenant_id, severity in [(None, "INFO"), ("tenant-1", "ERROR")]:
+        path = tenants.dataset_path("logs.jsonl", tenant_id, out_dir=str(tmp_path))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            for record in tenants.tag_records([{"timestamp": 0, "severity": severity}], tenant_id or "default"):
+                f.write(json.dumps(record) + "\n")
+    (tmp_path / "empty").mkdir()
+    assert tenants.list_tenants(str(tmp_path)) == ["default", "tenant-1"]
+
+    df = _load_logs(tenants.dataset_path("logs.jsonl", "tenant-1", out_dir=str(tmp_path)))
+    assert df["severity"].tolist() == ["ERROR"] and df["tenant_id"].tolist() == ["tenant-1"]
+    # A tenant without a partition gets no data rather than another tenant's
+    assert load_logs("tenant-without-data").empty
+    assert load_anomalous_timeseries("tenant-without-data") == []
+    assert load_forecast_data("tenant-without-data") == {}
+    try:
+        tenants.dataset_path("logs.jsonl", "../default")
+        assert False, "path traversal accepted"
+    except ValueError:
+        pass
+
+def test_indexed_loaders(tmp_path):
+    """Test that filtered log loads go through the line index and match a full load."""
+    print("Testing indexed loaders...")
+    path = str(tmp_path / "logs.jsonl")
+    write_jsonl(path, [{"timestamp": 1000 * i, "severity": "INFO", "entity_id": f"srv-{i % 3}",
+                        "correlation_id": f"corr-{i % 4}", "message": "ok"} for i in range(24)])
+    assert os.path.exists(str(tmp_path / "logs.lineidx" / "part-00001.npz"))
+    full = _load_logs(path)
+    df = _load_logs(path, correlation_id="corr-1")
+    assert df["correlation_id"].tolist() == ["corr-1"] * 6
+    df = _load_logs(path, start=5000, end=15000, entity_id="srv-2")
+    expected = full[(full["timestamp"] >= pd.Timestamp(5000, unit="ms")) & (full["timestamp"] <= pd.Timestamp(15000, unit="ms"))
+                    & (full["entity_id"] == "srv-2")]
+    assert df["timestamp"].tolist() == expected["timestamp"].tolist() == [pd.Timestamp(1000 * i, unit="ms") for i in (5, 8, 11, 14)]
+    assert _load_logs(str(tmp_path / "missing.jsonl"), correlation_id="corr-1").empty
+
+def test_snapshot_publishing(tmp_path):
+    """Test that readers pin one published snapshot version and caches key on it."""
+    print("Testing snapshot publishing...")
+    out_dir = str(tmp_path)
+    with open(os.path.join(out_dir, "logs.jsonl"), "w") as f:
+        f.write(json.dumps({"timestamp": 0, "severity": "INFO"}) + "\n")
+    # Before the first snapshot, readers use the data directory itself
+    assert snapshots.current(out_dir) == (None, out_dir)
+    assert tenants.dataset_path("logs.jsonl", out_dir=out_dir) == os.path.join(out_dir, "logs.jsonl")
+
+    # The first snapshot starts from the existing data; staging is invisible until published
+    staging = snapshots.begin(out_dir)
+    write_jsonl(os.path.join(staging, "logs.jsonl"), [{"timestamp": 1, "severity": "ERROR"}], append=True)
+    assert snapshots.pinned_version(out_dir) is None
+    assert snapshots.publish(out_dir, staging) == 1
+    path = tenants.dataset_path("logs.jsonl", out_dir=out_dir)
+    assert path == os.path.join(snapshots.snapshot_dir(out_dir, 1), "logs.jsonl")
+    assert _load_logs(path)["severity"].tolist() == ["INFO", "ERROR"]
+
+    # A pinned reader keeps its version while the next one is published
+    cache, builds = DatasetCache(), []
+    def build():
+        builds.append(1)
+        return _load_logs(tenants.dataset_path("logs.jsonl", out_dir=out_dir))
+    with snapshots.pin(out_dir) as version:
+        assert version == 1
+        snapshots.publish(out_dir, snapshots.begin(out_dir, seed=False))
+        assert snapshots.data_dir(out_dir) == snapshots.snapshot_dir(out_dir, 1)
+        assert len(cache.get("logs", [], build, version=version)) == 2
+        assert len(cache.get("logs", [], build, version=version)) == 2
+    assert snapshots.pinned_version(out_dir) == 2
+    assert cache.get("logs", [], build, version=2).empty
+    assert len(builds) == 2
+
+    # Only the newest KEEP_SNAPSHOTS versions stay on disk
+    for _ in range(snapshots.KEEP_SNAPSHOTS):
+        snapshots.publish(out_dir, snapshots.begin(out_dir))
+    kept = sorted(os.listdir(os.path.join(out_dir, snapshots.SNAPSHOTS_DIR)))
+    assert kept == [f"v{v:06d}" for v in range(3, 6)]
+
+def test_figure_cache(tmp_path):
+    """Test that tab callbacks render once per data version and filter combination."""
+    print("Testing figure cache...")
+    path = tmp_path / "logs.jsonl"
+    path.write_text(json.dumps({"severity": "INFO"}) + "\n")
+    renders = []
+
+    @cached_figures('logs', lambda tenant_id: [str(path)])
+    def update_test_charts(tab, severity, n, session):
+        if tab != 'logs':
+            return {}, "..."
+        renders.append((severity, session_user(session)['tenant_id']))
+        return {"data": [{"type": "bar", "y": [len(path.read_text().splitlines())]}]}, f"{severity}: ok"
+
+    session = {'user': 'viewer_user', 'tenant_id': 'tenant-2'}
+    first = update_test_charts('logs', 'all', 1, session)
+    assert first == [{"data": [{"type": "bar", "y": [1]}]}, "all: ok"]
+    assert update_test_charts('logs', 'all', 2, session) == first  # refresh tick
+    assert update_test_charts('logs', 'all', 2, dict(session, user='editor_user')) == first  # same tenant
+    assert update_test_charts('logs', 'ERROR', 2, session)[1] == "ERROR: ok"  # new filter value
+    update_test_charts('logs', 'all', 2, None)  # another session, default tenant
+    assert update_test_charts('website', 'all', 3, session) == ({}, "...")  # inactive tab, not cached
+    assert renders == [('all', 'tenant-2'), ('ERROR', 'tenant-2'), ('all', 'default')]
+
+    with open(path, "a") as f:
+        f.write(json.dumps({"severity": "ERROR"}) + "\n")
+    assert update_test_charts('logs', 'all', 4, session)[0]["data"][0]["y"] == [2]
+    assert renders[-1] == ('all', 'tenant-2')
+
+def test_session_user():
+    """Test that the session store selects user and tenant, but never the role."""
+    print("Testing session users...")
+    assert session_user(None) == {'user_id': 'admin_user', 'role': 'admin', 'tenant_id': 'default'}
+    user = session_user({'user': 'viewer_user', 'tenant_id': 'tenant-3', 'role': 'admin'})
+    assert user == {'user_id': 'viewer_user', 'role': 'viewer', 'tenant_id': 'tenant-3'}
+    try:
+        session_user({'user': 'viewer_user', 'tenant_id': '../default'})
+        assert False, "path traversal accepted"
+    except ValueError:
+        pass
+
+def test_refresher():
+    """Test that the refresher warms the caches before publishing, and only on a new version."""
+    print("Testing data refresher...")
+    state = {'version': 'a'}
+    events = []
+    refresher = Refresher(lambda: state['version'], lambda v: events.append(('warm', v, refresher.version)))
+    assert refresher.check()
+    assert refresher.version == 'a' and events == [('warm', 'a', None)]
+    assert not refresher.check()
+    state['version'] = 'b'
+    assert refresher.check()
+    assert events[-1] == ('warm', 'b', 'a')
+    assert refresher.version == 'b' and refresher.refreshes == 2
+
+    # A failing warm-up still publishes: clients then render on a cache miss
+    refresher = Refresher(lambda: 'c', lambda v: 1 / 0)
+    assert refresher.check() and refresher.version == 'c'
+
+def test_line_chart_zoom():
+    """Test that zooming narrows a line chart to the selected range at full detail."""
+    print("Testing line chart zoom...")
+    assert zoom_range({'xaxis.range[0]': '2025-11-20 14:00', 'xaxis.range[1]': '2025-11-20 15:00'}) == \
+        ['2025-11-20 14:00', '2025-11-20 15:00']
+    assert zoom_range({'xaxis.autorange': True}) is None
+    assert zoom_range({'autosize': True}) is dash.no_update
+
+    timestamps = pd.date_range('2025-11-20', periods=10080, freq='min')
+    df = pd.DataFrame({'website_id': 'site-1', 'timestamp': timestamps, 'value': range(10080)})
+    overview_points = line_points(df, 'value', 'website_id', 1920, None)
+    assert len(overview_points) == 1920
+    zoomed = line_points(df, 'value', 'website_id', 1920, ['2025-11-21 00:00', '2025-11-21 06:00'])
+    assert len(zoomed) == 361
+    assert zoomed['timestamp'].min() == pd.Timestamp('2025-11-21 00:00')
+
 if __name__ == "__main__":
     test_load_mobile_metrics()
     test_load_mobile_analyze()
     test_load_website_metrics()
     test_load_synthetic_runs()
     test_load_logs()
+    test_columnar_frames()
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as tmp:
+        test_dataset_cache(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_tenant_partitions(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_indexed_loaders(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_snapshot_publishing(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_figure_cache(pathlib.Path(tmp))
+    test_session_user()
+    test_refresher()
+    test_line_chart_zoom()
     print("\nAll data loading tests completed.")
@@ -0,0 +1,803 @@
+#!/usr/bin/env python3
+"""
+Test script for the synthetic data generators.
+Tests the vectorized walk engine and the gen_* record wrappers.
+"""
+
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import os
+sys.path.append(os.getcwd())
+import numpy as np
+
+from instana_synthetic import engine
+from instana_synthetic.generators import (
+    gen_timeseries,
+    gen_mobile_metrics,
+    gen_infrastructure_metrics,
+    gen_application_metrics_batch,
+    gen_app_topology,
+    iter_events,
+    write_jsonl
+)
+from instana_synthetic import (
+    streams, incremental, columnar, compression, ids, traces, tsdb, lineindex, rollups, eventstore, retention, entities,
+    overview, downsample, snapshots, links
+)
+from instana_synthetic.orchestrator import PROFILES, build_plan
+from instana_synthetic.datasets import (
+    parse_count, generate_events, generate_logs, generate_mobile_metrics, generate_application_metrics,
+    generate_infrastructure_entities, read_entity_ids, set_compression, generate_website_metrics,
+    generate_synthetic_runs
+)
+from instana_synthetic.generators import set_clock
+
+def test_walk_clamps_to_bounds():
+    """Test that walk-clamped specs never leave their bounds."""
+    print("Testing walk clamping...")
+    values = engine.walk(engine.infrastructure_walk("cpu_usage_percent"), 50, 500)
+    assert values.shape == (50, 500)
+    assert values.min() >= 0 and values.max() <= 100
+
+    crash = engine.walk(engine.MOBILE_CRASH_RATE_WALK, 50, 500)
+    assert crash.min() >= 0.0001 and crash.max() <= 0.1
+
+def test_floor_walk_matches_stepwise_reference():
+    """Test the vectorized one-sided floor against a per-step loop."""
+    print("Testing floor walk...")
+    spec = engine.MOBILE_RESPONSE_WALK
+    values = engine.walk(spec, 10, 200, np.random.default_rng(7))
+
+    rng = np.random.default_rng(7)
+    start = rng.integers(500, 3001, size=10)
+    inc = rng.integers(-200, 401, size=(200, 10))
+    for i in range(10):
+        val = start[i]
+        for t in range(200):
+            val = max(100, val + inc[t, i])
+            assert values[i, t] == val
+
+def test_record_wrappers():
+    """Test that the gen_* wrappers keep their record layout."""
+    print("Testing record wrappers...")
+    ts = gen_timeseries("srv-1", minutes=30)
+    assert ts["entity_id"] == "srv-1"
+    assert len(ts["points"]) == 30
+    assert all(isinstance(p["value"], int) and p["value"] >= 50 for p in ts["points"])
+
+    mobile = gen_mobile_metrics("mobile-1", minutes=10)
+    assert list(mobile["points"][0].keys()) == ["timestamp", "crash_rate", "response_time_ms"]
+
+    infra = gen_infrastructure_metrics("host-1", "memory_usage_percent", minutes=10)
+    assert all(isinstance(p["value"], float) for p in infra["points"])
+
+    apps = list(gen_application_metrics_batch(["app-1", "app-2"], "apdex_score", minutes=5))
+    assert [r["application_id"] for r in apps] == ["app-1", "app-2"]
+    assert all(0.5 <= p["value"] <= 1.0 for r in apps for p in r["points"])
+
+def test_streaming_write_jsonl(tmp_path):
+    """Test that write_jsonl consumes generators and reports the record count."""
+    print("Testing streaming writes...")
+    path = tmp_path / "events.jsonl"
+    count = write_jsonl(str(path), iter_events(["host-1"], count=20000))
+    assert count == 20000
+    assert sum(1 for _ in open(path)) == 20000
+    assert parse_count("250M") == 250_000_000
+    assert parse_count("1_500") == 1500
+
+def test_sharded_output_matches_single_run(tmp_path):
+    """Test that concatenated shards are byte-identical to an unsharded run."""
+    print("Testing sharded generation...")
+    streams.set_seed(42)
+    set_clock(1_760_000_000_000)
+    try:
+        single, sharded = tmp_path / "single", tmp_path / "sharded"
+        single.mkdir()
+        sharded.mkdir()
+        count = streams.BLOCK_RECORDS * 2 + 100
+        generate_events(out_dir=str(single), count=count)
+        for shard in range(3):
+            generate_events(out_dir=str(sharded), count=count, shard=shard, shards=3)
+        streams.merge_shards(str(sharded / "events.jsonl"), 3)
+        assert (single / "events.jsonl").read_bytes() == (sharded / "events.jsonl").read_bytes()
+        assert list(sharded.iterdir()) == [sharded / "events.jsonl"]
+    finally:
+        streams.set_seed(None)
+        set_clock(None)
+
+def test_scale_profiles():
+    """Test that every scale profile builds a complete plan."""
+    print("Testing scale profiles...")
+    for name, config in PROFILES.items():
+        assert set(config) == set(PROFILES["small"]), name
+        plan = build_plan(**config)
+        assert plan["logs"]["kwargs"]["count"] == config["logs"]
+        assert plan["logs"]["shards"] == config["shards"]
+    xl = PROFILES["xl"]
+    assert xl["clusters"] * xl["deployments_per_cluster"] * xl["pods_per_deployment"] == 10_000_000
+
+def test_append_continues_series(tmp_path):
+    """Test that append mode continues each walk and only adds the new window."""
+    print("Testing append mode...")
+    start = 1_760_000_000_000
+    try:
+        set_clock(start)
+        path = tmp_path / "mobile_metrics.jsonl"
+        generate_mobile_metrics(out_dir=str(tmp_path), count=3, minutes=10)
+        size = path.stat().st_size
+
+        set_clock(start + 5 * 60_000)
+        assert incremental.append_mobile_metrics(out_dir=str(tmp_path)) == 3
+        with open(path) as f:
+            f.seek(size)
+            appended = [json.loads(line) for line in f]
+        assert [len(r["points"]) for r in appended] == [5, 5, 5]
+        assert appended[0]["points"][0]["timestamp"] == start
+
+        # Nothing new to append until the clock moves on
+        assert incremental.append_mobile_metrics(out_dir=str(tmp_path)) == 0
+    finally:
+        set_clock(None)
+
+def test_columnar_matches_jsonl(tmp_path):
+    """Test that the columnar copy holds exactly the JSONL records."""
+    print("Testing columnar output...")
+    write_jsonl(str(tmp_path / "applications.jsonl"), [{"application_id": f"app-{i}"} for i in range(3)])
+    generate_application_metrics(out_dir=str(tmp_path), count=3, minutes=15, fmt="both")
+    path = str(tmp_path / "application_metrics.jsonl")
+    with open(path) as f:
+        expected = [json.loads(line) for line in f]
+    key = lambda r: (r["application_id"], r["metric_name"])
+    assert columnar.is_fresh(path)
+    assert sorted(columnar.iter_records(path), key=key) == sorted(expected, key=key)
+
+    frame = columnar.to_frame(path)
+    assert len(frame) == 3 * 4 * 15
+    assert list(frame.columns) == ["application_id", "metric_name", "timestamp", "value"]
+
+def test_columnar_tenant_and_append(tmp_path):
+    """Test that columnar series carry their tenant and columnar-only data refuses appends."""
+    print("Testing columnar tenants and appends...")
+    path = str(tmp_path / "application_metrics.jsonl")
+    chunks = gen_application_metrics_batch(["app-1", "app-2"], "apdex_score", minutes=5, columnar=True)
+    columnar.write_columnar(path, "application_id", chunks, tenant_id="tenant-a")
+    assert len(columnar.to_frame(path, tenant_id="tenant-a")) == 2 * 5
+    assert len(columnar.to_frame(path, tenant_id="tenant-b")) == 0
+    assert all(s["tenant_id"] == "tenant-a" for s in columnar.load(path)[0]["series"])
+
+    try:
+        incremental.append_metrics(str(tmp_path), "application_metrics.jsonl", "application_id", [])
+    except ValueError as e:
+        assert "columnar" in str(e)
+    else:
+        raise AssertionError("append to a columnar-only dataset was accepted")
+
+def test_gzip_shards_and_append(tmp_path):
+    """Test that gzip output round-trips through sharding and append mode."""
+    print("Testing gzip output...")
+    start = 1_760_000_000_000
+    streams.set_seed(42)
+    set_clock(start)
+    try:
+        plain, packed = tmp_path / "plain", tmp_path / "packed"
+        plain.mkdir()
+        packed.mkdir()
+        count = streams.BLOCK_RECORDS + 10
+        generate_logs(out_dir=str(plain), count=count)
+        set_compression("gzip")
+        for shard in range(2):
+            generate_logs(out_dir=str(packed), count=count, shard=shard, shards=2)
+        streams.merge_shards(str(packed / "logs.jsonl.gz"), 2)
+        assert sorted(os.listdir(packed)) == ["logs.jsonl.gz"]
+        with compression.open_dataset(str(packed / "logs.jsonl")) as f:
+            assert f.read() == (plain / "logs.jsonl").read_text()
+
+        set_clock(start + 60_000)
+        assert incremental.append_logs(out_dir=str(packed), count=5) == 5
+        with compression.open_dataset(str(packed / "logs.jsonl")) as f:
+            assert sum(1 for _ in f) == count + 5
+    finally:
+        set_compression("none")
+        streams.set_seed(None)
+        set_clock(None)
+
+def test_id_allocator(tmp_path):
+    """Test that allocated IDs are unique, deterministic and survive appends."""
+    print("Testing ID allocator...")
+    size = 9 * 10 ** 5
+    seqs = list(range(size - 1000, size + 1000))  # crosses into 7-digit IDs
+    pods = [ids.make_id("pod", n) for n in seqs]
+    assert len(set(pods)) == len(pods)
+    assert len(pods[0]) == len("pod-123456") and len(pods[-1]) == len("pod-1234567")
+    assert ids.make_id("pod", 7) == ids.make_id("pod", 7)
+    # Allocators sharing a prefix never hand out the same ID
+    issues = {ids.make_id(name, n) for name in ("issue", "entity_issue") for n in range(5000)}
+    assert len(issues) == 10000
+
+    set_clock(1_760_000_000_000)
+    ids.reset()
+    try:
+        generate_events(out_dir=str(tmp_path), count=50)
+        set_clock(1_760_000_060_000)
+        ids.reset()  # a new process: counters come from the file
+        assert incremental.append_events(out_dir=str(tmp_path), count=50) == 50
+        with open(tmp_path / "events.jsonl") as f:
+            events = [json.loads(line) for line in f]
+        assert len({e["event_id"] for e in events}) == 100
+        # Appended events refer to the entities already in the file
+        assert {e["entity_id"] for e in events[50:]} <= {e["entity_id"] for e in events[:50]}
+    finally:
+        set_clock(None)
+
+    table = ids.Interner()
+    deployments = table.codes(["deploy-1", "deploy-2"])
+    pod_deployments = table.codes(["deploy-2", "deploy-1", "deploy-3"])
+    assert table.rows(deployments)[pod_deployments].tolist() == [1, 0, -1]
+    assert table.lookup(pod_deployments) == ["deploy-2", "deploy-1", "deploy-3"]
+
+def test_trace_span_trees(tmp_path):
+    """Test that span trees follow the call graph and nest in time."""
+    print("Testing trace span trees...")
+    streams.set_seed(42)
+    set_clock(1_760_000_000_000)
+    try:
+        topology = gen_app_topology()
+        path = str(tmp_path / "trace_spans.jsonl")
+        spans = traces.write_spans(path, topology, ["app-1", "app-2"], 2000, fmt="both")
+        manifest, table = traces.load_span_table(path)
+        assert manifest["rows"] == spans > 2000
+    finally:
+        streams.set_seed(None)
+        set_clock(None)
+
+    parent = table["parent"]
+    child = parent >= 0
+    assert (~child).sum() == 2000
+    assert (table["trace_id"][parent[child]] == table["trace_id"][child]).all()
+    assert (table["start_time"][child] >= table["start_time"][parent[child]]).all()
+    child_end = table["start_time"][child] + table["duration_ms"][child]
+    assert (child_end <= table["start_time"][parent[child]] + table["duration_ms"][parent[child]]).all()
+    calls = {(e["from"], e["to"]) for e in topology["edges"]}
+    services = manifest["tables"]["service"]
+    assert all((services[a], services[b]) in calls
+               for a, b in zip(table["service"][parent[child]].tolist(), table["service"][child].tolist()))
+    assert len(set(table["span_id"].tolist())) == spans
+
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == spans
+    assert records[1]["parent_span_id"] in (None, f"span-{table['span_id'][parent[1]]}")
+    assert json.dumps(records[0]) == traces.span_lines(
+        {k: v[:1] for k, v in dict(table, parent_span_id=np.array([-1])).items()}, manifest["tables"])[0]
+
+def test_timeseries_store(tmp_path):
+    """Test that the time-series store mirrors the JSONL file and follows appends."""
+    print("Testing time-series store...")
+    start = 1_760_000_000_000
+    try:
+        set_clock(start)
+        generate_mobile_metrics(out_dir=str(tmp_path), count=3, minutes=10)
+        path = str(tmp_path / "mobile_metrics.jsonl")
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        store = tsdb.open_store(path)
+        assert len(store) == 3 and store.id_key == "mobile_app_id"
+        record = records[1]
+        timestamps, fields = store.read(record["mobile_app_id"], record["metric_name"])
+        assert isinstance(timestamps, np.memmap)
+        assert timestamps.tolist() == [p["timestamp"] for p in record["points"]]
+        assert fields["crash_rate"].tolist() == [p["crash_rate"] for p in record["points"]]
+
+        window, _ = store.read(record["mobile_app_id"], record["metric_name"],
+                               start=timestamps[2], end=timestamps[4])
+        assert window.tolist() == timestamps[2:5].tolist()
+        assert np.shares_memory(window, timestamps)
+
+        set_clock(start + 5 * 60_000)
+        incremental.append_mobile_metrics(out_dir=str(tmp_path))
+        store = tsdb.open_store(path)
+        assert len(store.index["segments"]) == 2  # only the appended tail was ingested
+        timestamps, _ = store.read(record["mobile_app_id"], record["metric_name"])
+        assert len(timestamps) == 15 and (np.diff(timestamps) > 0).all()
+        assert len(store.to_frame()) == 3 * 15
+
+        # Concurrent syncs after an append ingest the tail exactly once
+        set_clock(start + 10 * 60_000)
+        incremental.append_mobile_metrics(out_dir=str(tmp_path))
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            indexes = list(pool.map(lambda _: tsdb.sync_store(path), range(4)))
+        assert all(index["segments"] == indexes[0]["segments"] for index in indexes)
+        assert len(indexes[0]["segments"]) == 3
+        assert not [f for f in os.listdir(tsdb.store_dir(path)) if ".tmp" in f]
+        assert len(tsdb.open_store(path).to_frame()) == 3 * 20
+    finally:
+        set_clock(None)
+
+def test_line_index_queries(tmp_path):
+    """Test that indexed lookups return exactly the records a full scan finds, reading only those lines."""
+    print("Testing line index...")
+    start = 1_760_000_000_000
+    streams.set_seed(42)
+    set_clock(start)
+    (tmp_path / "gz").mkdir()
+    try:
+        generate_logs(out_dir=str(tmp_path), count=5000)
+        set_compression("gzip")
+        generate_logs(out_dir=str(tmp_path / "gz"), count=5000)
+        before = {d: sorted(os.listdir(lineindex.index_dir(str(d / "logs.jsonl")))) for d in (tmp_path, tmp_path / "gz")}
+        set_clock(start + 60_000)
+        incremental.append_logs(out_dir=str(tmp_path), count=50)
+        incremental.append_logs(out_dir=str(tmp_path / "gz"), count=50)
+    finally:
+        set_compression("none")
+        streams.set_seed(None)
+        set_clock(None)
+
+    for directory in (tmp_path, tmp_path / "gz"):
+        path = str(directory / "logs.jsonl")
+        with compression.open_dataset(path) as f:
+            records = [json.loads(line) for line in f]
+        # Generation wrote the index, the append added a part for its lines
+        parts = sorted(os.listdir(lineindex.index_dir(path)))
+        assert len(records) == 5050 and before[directory] == ["part-00001.npz"]
+        assert parts == ["part-00001.npz", "part-00002.npz"]
+        assert lineindex.query(path, start=start + 1) == [r for r in records if r["timestamp"] > start]
+        entity = records[-1]["entity_id"]
+        assert lineindex.query(path, entity_id=entity) == [r for r in records if r["entity_id"] == entity]
+        lo, hi = sorted(r["timestamp"] for r in records)[1000], start
+        assert lineindex.query(path, start=lo, end=hi) == [r for r in records if lo <= r["timestamp"] <= hi]
+        expected = [r for r in records if r["entity_id"] == entity and r["timestamp"] >= lo]
+        assert lineindex.query(path, start=lo, entity_id=entity) == expected
+        assert lineindex.query(path, correlation_id="corr-missing") == []
+        # The postings select exactly the matching lines; nothing else is read
+        loaded = lineindex._load(compression.resolve(path))[0]
+        assert sum(len(lineindex._match(p, lo, None, {"entity_id": entity})) for p in loaded) == len(expected)
+        correlation = records[123]["correlation_id"]
+        assert lineindex.query(path, correlation_id=correlation) == \
+            [r for r in records if r["correlation_id"] == correlation]
+
+    # Lines written around the index are still found; a rewrite starts it over
+    path = str(tmp_path / "logs.jsonl")
+    with open(path, "a") as f:
+        f.write(json.dumps(dict(records[0], correlation_id="corr-tail")) + "\n")
+    assert len(lineindex.query(path, correlation_id="corr-tail")) == 1
+    assert sorted(os.listdir(lineindex.index_dir(path)))[-1] == "part-00003.npz"
+    write_jsonl(path, records[:10])
+    assert sorted(os.listdir(lineindex.index_dir(path))) == ["part-00001.npz"]
+    assert lineindex.query(path, entity_id=records[0]["entity_id"]) == \
+        [r for r in records[:10] if r["entity_id"] == records[0]["entity_id"]]
+
+def test_event_store(tmp_path):
+    """Test that the event store mirrors the JSONL file through writes, appends and rewrites."""
+    print("Testing event store...")
+    start = 1_760_000_000_000
+    path = str(tmp_path / "logs.jsonl")
+    db = eventstore.db_path(str(tmp_path))
+    streams.set_seed(7)
+    set_clock(start)
+    try:
+        eventstore.set_enabled(True)
+        generate_logs(out_dir=str(tmp_path), count=3000)
+        eventstore.insert_records(db, "logs", [{"timestamp": start, "severity": "ERROR", "correlation_id": "live"}])
+        set_clock(start + 60_000)
+        incremental.append_logs(out_dir=str(tmp_path), count=40)
+    finally:
+        eventstore.set_enabled(False)
+        streams.set_seed(None)
+        set_clock(None)
+
+    def read_file():
+        with open(path) as f:
+            return [json.loads(line) for line in f]
+
+    records = read_file()
+    store = eventstore.open_store(path)
+    assert store.count() == len(records) + 1 == 3041
+    counts = store.count_by(["severity"])
+    expected = {s: sum(r["severity"] == s for r in records) + (s == "ERROR") for s in counts["severity"]}
+    assert dict(zip(counts["severity"], counts["count"])) == expected
+    entity = records[-1]["entity_id"]
+    assert store.records(entity_id=entity) == \
+        sorted((r for r in records if r["entity_id"] == entity), key=lambda r: r["timestamp"])
+    lo = sorted(r["timestamp"] for r in records)[1000]
+    assert store.count(start=lo, severity=["WARN", "INFO"]) == \
+        sum(r["timestamp"] >= lo and r["severity"] in ("WARN", "INFO") for r in records)
+    assert store.rows(["source"], correlation_id="live") == {"source": [None]}
+
+    # Lines appended without the store are picked up on the next open, rewrites replace the file rows
+    write_jsonl(path, [dict(records[0], correlation_id="tail")], append=True)
+    assert eventstore.open_store(path).count(correlation_id=["tail", "live"]) == 2
+    write_jsonl(path, records[:10])
+    assert eventstore.open_store(path).count() == 11
+
+def test_retention_compaction(tmp_path):
+    """Test that compaction enforces event_settings and merges small store segments."""
+    print("Testing retention and compaction...")
+    now = 1_760_000_000_000
+    day = retention.DAY_MS
+    write_jsonl(str(tmp_path / "event_settings.jsonl"), [
+        {"enabled": True, "retention_days": 7, "max_events_per_minute": 2},
+        {"enabled": False, "retention_days": 365, "max_events_per_minute": 1000},
+        {"enabled": True, "datasets": ["logs"], "retention_days": 2},
+    ])
+    events = [{"event_id": f"e{i}", "timestamp": t} for i, t in
+              enumerate([now - 30 * day, now - day, now - day + 1, now - day + 2, now - 5, now - 8 * day])]
+    write_jsonl(str(tmp_path / "events.jsonl"), events)
+    write_jsonl(str(tmp_path / "logs.jsonl"), [{"timestamp": t, "severity": "INFO"} for t in
+                                               (now - 3 * day, now - day, now - 5, now - 5)])
+    eventstore.insert_records(eventstore.db_path(str(tmp_path)), "synthetic_runs",
+                              [{"timestamp": now - 10 * day, "status": "success"}, {"timestamp": now, "status": "success"}])
+    try:
+        set_clock(now - 60 * 60_000)
+        generate_mobile_metrics(out_dir=str(tmp_path), count=2, minutes=30)
+        tsdb.open_store(str(tmp_path / "mobile_metrics.jsonl"))
+        for minutes in range(10, 70, 10):
+            set_clock(now - 60 * 60_000 + minutes * 60_000)
+            incremental.append_mobile_metrics(out_dir=str(tmp_path))
+    finally:
+        set_clock(None)
+
+    def point_counts():
+        store = tsdb.open_store(str(tmp_path / "mobile_metrics.jsonl"))
+        return [len(timestamps) for _, timestamps, _ in store.iter_series()]
+
+    points = point_counts()
+
+    assert retention.load_policy(str(tmp_path)) == {"retention_days": 7, "max_events_per_minute": 2}
+    assert retention.load_policy(str(tmp_path), "logs") == {"retention_days": 2, "max_events_per_minute": 2}
+    report = retention.compact_data_dir(str(tmp_path), now_ms=now)
+    with open(tmp_path / "events.jsonl") as f:
+        assert [json.loads(line)["event_id"] for line in f] == ["e1", "e2", "e4"]
+    assert report[str(tmp_path / "events.jsonl")]["dropped"] == 3
+    assert report[str(tmp_path / "logs.jsonl")] | {"bytes_before": 0, "bytes_after": 0} == \
+        {"kept": 3, "dropped": 1, "bytes_before": 0, "bytes_after": 0}  # no per-minute cap on logs
+    assert report[str(tmp_path / "mobile_metrics.jsonl")]["dropped"] == 0
+    assert eventstore.open_store(str(tmp_path / "events.jsonl")).count() == 3
+    assert eventstore.open_store(str(tmp_path / "synthetic_runs.jsonl")).count() == 1
+    stats = report[str(tmp_path / "mobile_metrics.tsdb")]
+    assert stats["segments_before"] == 7 and stats["segments_after"] == 1
+    assert point_counts() == points
+
+    # Log records keep their continuation lines; expired rotated backups are removed
+    log = tmp_path / "monitoring.log"
+    stamp = lambda ms: datetime.fromtimestamp(ms / 1000).strftime("%Y-%m-%d %H:%M:%S")
+    log.write_text(f"[{stamp(now - 9 * day)}] [ERROR] old\nTraceback\n[{stamp(now)}] [ERROR] new\nTraceback\n")
+    (tmp_path / "monitoring.log.1").write_text(f"[{stamp(now - 9 * day)}] [INFO] old\n")
+    retention.compact_operational_files({"retention_days": 7}, now_ms=now, out_dir=str(tmp_path / "instana"),
+                                        log_dir=str(tmp_path))
+    assert log.read_text() == f"[{stamp(now)}] [ERROR] new\nTraceback\n"
+    assert not (tmp_path / "monitoring.log.1").exists()
+    # Operational files resolve from the data directory, not the working directory
+    assert retention.operational_files("/srv/app/data/instana") == {
+        "/srv/app/data/audit_log.jsonl": "timestamp",
+        "/srv/app/alert_history.jsonl": "timestamp",
+        "/srv/app/monitoring.log": None,
+    }
+    assert retention.operational_files("/srv/app/data/instana", log_dir="/var/log/app")["/var/log/app/monitoring.log"] is None
+
+def test_snapshot_staging(tmp_path):
+    """Test that staging links unchanged files and publishes with the sidecars built."""
+    print("Testing snapshot staging...")
+    out_dir = str(tmp_path)
+    start = 1_760_000_000_000
+    try:
+        set_clock(start)
+        staging = snapshots.begin(out_dir)
+        generate_mobile_metrics(out_dir=staging, count=2, minutes=10)
+        generate_logs(out_dir=staging, count=100)
+        first = snapshots.snapshot_dir(out_dir, snapshots.publish(out_dir, staging))
+        set_clock(start + 5 * 60_000)
+        staging = snapshots.begin(out_dir)
+        sizes = {f: os.path.getsize(os.path.join(first, f)) for f in ("mobile_metrics.jsonl", "logs.jsonl")}
+        incremental.append_mobile_metrics(out_dir=staging)
+        incremental.append_logs(out_dir=staging, count=10)
+        second = snapshots.snapshot_dir(out_dir, snapshots.publish(out_dir, staging))
+    finally:
+        set_clock(None)
+
+    # The published version is untouched; unchanged files are shared, not copied, and
+    # appends went to new segments of the JSONL files and the event store
+    assert {f: os.path.getsize(os.path.join(first, f)) for f in sizes} == sizes
+    for name in (os.path.join("mobile_metrics.tsdb", "seg-000000.timestamps"), "logs.jsonl", "events.sqlite"):
+        assert os.path.samefile(os.path.join(first, name), os.path.join(second, name))
+    assert os.path.exists(os.path.join(second, "logs.jsonl.seg00001"))
+    assert os.path.exists(os.path.join(second, "events.sqlite.seg00001"))
+    assert not os.path.exists(os.path.join(first, "logs.jsonl.seg00001"))
+
+    # Sidecars were topped up before publishing and are opened without writing
+    before = sorted(os.listdir(second))
+    store = tsdb.open_store(os.path.join(second, "mobile_metrics.jsonl"))
+    assert len(store.index["segments"]) == 2 and len(store.to_frame()) == 2 * 15
+    assert eventstore.open_store(os.path.join(second, "logs.jsonl")).count() == 110
+    assert len(lineindex.query(os.path.join(second, "logs.jsonl"))) == 110
+    assert sorted(os.listdir(second)) == before
+
+    # Without its event store, a published version answers the same queries through the line index
+    logs = os.path.join(second, "logs.jsonl")
+    entity = lineindex.query(logs)[0]["entity_id"]
+    queries = [
+        lambda s: s.count(),
+        lambda s: s.count(start - 6 * 3_600_000, start - 3_600_000, severity=["ERROR", "WARN"]),
+        lambda s: s.count_by(["severity"]),
+        lambda s: s.count_by(["hour", "severity"], limit=5),
+        lambda s: s.records(entity_id=entity, limit=3, newest_first=True),
+        lambda s: s.rows(["timestamp", "entity_id"], severity=["ERROR", "WARN"]),
+    ]
+    expected = [query(eventstore.open_store(logs)) for query in queries]
+    for name in os.listdir(second):
+        if name.startswith("events.sqlite"):
+            os.remove(os.path.join(second, name))
+    store = eventstore.open_store(logs)
+    assert isinstance(store, eventstore.IndexedStore)
+    assert [query(store) for query in queries] == expected
+    assert not any(name.startswith("events.sqlite") for name in os.listdir(second))
+
+    # Overview totals carry over between versions: only the new segment is scanned
+    scanned, scan = [], overview._scan
+    overview._scan = lambda store, number, spec: scanned.append(number) or scan(store, number, spec)
+    try:
+        overview.summarize(first)
+        summary = overview.summarize(second)
+    finally:
+        overview._scan = scan
+    assert scanned == [0, 1] and summary["mobile_metrics"]["points"] == 2 * 15
+
+    os.remove(os.path.join(second, "mobile_metrics.tsdb", "index.json"))
+    try:
+        tsdb.open_store(os.path.join(second, "mobile_metrics.jsonl"))
+        assert False, "store built inside a published snapshot"
+    except FileNotFoundError:
+        pass
+
+def test_snapshot_segments(tmp_path):
+    """Test that append cycles chain segments, merge them and keep rewrites and purges consistent."""
+    print("Testing snapshot segments...")
+    out_dir = str(tmp_path)
+    start = 1_760_000_000_000
+    versions = []
+    try:
+        set_clock(start)
+        staging = snapshots.begin(out_dir)
+        generate_logs(out_dir=staging, count=200)
+        versions.append(snapshots.publish(out_dir, staging))
+        for cycle in range(1, 13):
+            set_clock(start + cycle * 60_000)
+            staging = snapshots.begin(out_dir)
+            incremental.append_logs(out_dir=staging, count=10)
+            eventstore.insert_records(eventstore.db_path(staging), "logs",
+                                      [{"timestamp": start + cycle, "correlation_id": "live"}])
+            versions.append(snapshots.publish(out_dir, staging))
+    finally:
+        set_clock(None)
+
+    def dataset(version):
+        directory = snapshots.snapshot_dir(out_dir, version)
+        with compression.open_dataset(os.path.join(directory, "logs.jsonl")) as f:
+            records = [json.loads(line) for line in f]
+        return directory, records, eventstore.open_store(os.path.join(directory, "logs.jsonl"))
+
+    # Every kept version reads its own data; segments stay bounded
+    for version in versions[-snapshots.KEEP_SNAPSHOTS:]:
+        directory, records, store = dataset(version)
+        assert len(records) == 200 + 10 * (version - 1)
+        assert store.count(correlation_id="live") == version - 1
+        assert store.count() == len(records) + version - 1
+        assert store.records(limit=3) == store.records()[:3]
+        assert len(compression.segments(os.path.join(directory, "logs.jsonl"))) <= links.MAX_SEGMENTS
+        assert len(compression.segments(eventstore.db_path(directory))) <= links.MAX_SEGMENTS
+    directory, records, _ = dataset(versions[-1])
+    assert os.path.samefile(os.path.join(directory, "logs.jsonl"),
+                            os.path.join(snapshots.snapshot_dir(out_dir, versions[-3]), "logs.jsonl"))
+
+    # A rewrite and a purge in the next version hide the older parts' rows
+    staging = snapshots.begin(out_dir)
+    write_jsonl(os.path.join(staging, "logs.jsonl"), records[:50])
+    assert eventstore.purge(eventstore.db_path(staging), {"logs": start + 7}) == 6
+    version = snapshots.publish(out_dir, staging)
+    _, records, store = dataset(version)
+    assert len(records) == 50 and store.count() == 50 + 6
+    assert store.count(correlation_id="live") == 6
+    assert dataset(version - 1)[2].count() == 200 + 10 * 12 + 12
+
+    # Later segments fold the hidden rows out of the base database
+    for cycle in range(6):
+        staging = snapshots.begin(out_dir)
+        incremental.append_logs(out_dir=staging, count=10)
+        version = snapshots.publish(out_dir, staging)
+    directory, records, store = dataset(version)
+    assert len(records) == 50 + 60 and store.count() == len(records) + 6
+    assert store.count(start=start + 7) == sum(r["timestamp"] >= start + 7 for r in records) + 6
+
+def test_rollup_tiers(tmp_path):
+    """Test that rollup tiers match the raw points and follow appends."""
+    print("Testing rollup tiers...")
+    start = 1_760_000_000_000
+    try:
+        set_clock(start)
+        generate_mobile_metrics(out_dir=str(tmp_path), count=2, minutes=600)
+        path = str(tmp_path / "mobile_metrics.jsonl")
+        rollups.load_rollups(tsdb.open_store(path))
+        set_clock(start + 90 * 60_000)
+        incremental.append_mobile_metrics(out_dir=str(tmp_path))
+    finally:
+        set_clock(None)
+
+    store = tsdb.open_store(path)
+    series = store.series()[0]
+    timestamps, fields = store.read(series["id"], series["metric_name"])
+    values = np.asarray(fields["response_time_ms"], dtype=np.float64)
+    assert len(values) == 690
+
+    hourly = rollups.query(path, series["id"], series["metric_name"], max_points=20,
+                           field="response_time_ms", q=(0.5,))
+    assert hourly["tier"] == "1h"
+    hours = np.asarray(timestamps) // 3_600_000 * 3_600_000
+    assert hourly["timestamp"].tolist() == sorted(set(hours.tolist()))
+    for i, hour in enumerate(hourly["timestamp"].tolist()):
+        points = np.sort(values[hours == hour])
+        assert hourly["count"][i] == len(points)
+        assert hourly["min"][i] == points[0] and hourly["max"][i] == points[-1]
+        assert np.isclose(hourly["avg"][i], points.mean())
+        median = points[(len(points) - 1) // 2]
+        assert abs(hourly["p50"][i] - median) <= rollups.SKETCH_ACCURACY * median
+
+    # The appended segment was merged into the rows rolled up before the append
+    merged = rollups.load_rollups(store)["5m"]
+    for name in os.listdir(store.directory):
+        if name.startswith("rollup-"):
+            os.remove(os.path.join(store.directory, name))
+    rebuilt = rollups.update_rollups(store)["5m"]
+    assert merged["bucket"].tolist() == rebuilt["bucket"].tolist()
+    assert merged["count"].tolist() == rebuilt["count"].tolist()
+    assert np.allclose(merged["response_time_ms.sum"], rebuilt["response_time_ms.sum"])
+
+    assert rollups.query(path, series["id"], series["metric_name"], max_points=1000,
+                         field="crash_rate")["tier"] == "raw"
+    assert rollups.select_tier(0, 30 * 86_400_000, 100) == "1d"
+
+def test_entity_pages(tmp_path):
+    """Test the line-per-entity layout, its header and paged lazy reads."""
+    print("Testing entity pages...")
+    streams.set_seed(3)
+    set_clock(1_760_000_000_000)
+    try:
+        assert generate_infrastructure_entities(out_dir=str(tmp_path), count=2500) == 2500
+    finally:
+        set_clock(None)
+    path = str(tmp_path / "infrastructure_entities.jsonl")
+    with open(path) as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == 2500 and "entity_id" in lines[0]
+    header = entities.read_header(path)
+    assert header == {"adjusted_timeframe": {"to": 1_760_000_000_000, "window_size": 900_000}, "total_hits": 2500}
+
+    page = entities.read_page(path, offset=2000, limit=400)
+    assert page["items"] == lines[2000:2400] and page["can_load_more"] and page["total_hits"] == 2500
+    assert not entities.read_page(path, offset=2400, limit=100)["can_load_more"]
+    pages = list(entities.iter_pages(path, limit=1000))
+    assert [len(p["items"]) for p in pages] == [1000, 1000, 500]
+    assert [p["can_load_more"] for p in pages] == [True, True, False]
+    assert read_entity_ids(path) == [e["entity_id"] for e in lines]
+
+    # Appends add lines and bump the header count
+    entities.write_entities(path, [{"entity_id": "host-extra"}], header["adjusted_timeframe"], append=True)
+    assert entities.read_header(path)["total_hits"] == 2501
+    assert entities.read_page(path, offset=2500)["items"] == [{"entity_id": "host-extra"}]
+
+    # The single-blob layout is still readable
+    legacy = str(tmp_path / "legacy.jsonl")
+    write_jsonl(legacy, [{"adjusted_timeframe": header["adjusted_timeframe"], "can_load_more": False,
+                          "items": lines[:3], "total_hits": 3}])
+    assert entities.read_header(legacy)["total_hits"] == 3
+    assert entities.read_page(legacy, offset=1) == {"adjusted_timeframe": header["adjusted_timeframe"],
+                                                   "can_load_more": False, "items": lines[1:3], "total_hits": 3}
+
+def test_overview_summary(tmp_path):
+    """Test that the overview summary matches the raw data and follows appends segment by segment."""
+    print("Testing overview summary...")
+    start = 1_760_000_000_000
+    out_dir = str(tmp_path)
+    try:
+        eventstore.set_enabled(True)
+        set_clock(start)
+        generate_website_metrics(out_dir=out_dir, count=3, minutes=1500)
+        generate_mobile_metrics(out_dir=out_dir, count=2, minutes=60)
+        generate_synthetic_runs(out_dir=out_dir, count=200)
+        overview.summarize(out_dir)
+        set_clock(start + 120 * 60_000)
+        incremental.append_website_metrics(out_dir=out_dir)
+    finally:
+        eventstore.set_enabled(False)
+        set_clock(None)
+
+    summary = overview.summarize(out_dir)
+    store = tsdb.open_store(os.path.join(out_dir, "website_metrics.jsonl"))
+    assert overview._totals[links.unversioned(store.directory)][1] == tuple(store.segment_numbers())
+    assert len(store.segment_numbers()) == 2
+    points = store.to_frame(fields=["value"])
+    website = summary["website_metrics"]
+    assert website["points"] == len(points) == 3 * 1620
+    assert np.isclose(website["mean"]["value"], points["value"].mean())
+    assert np.isclose(website["below"]["value"], (points["value"] < overview.UPTIME_THRESHOLD_MS).mean())
+    daily = points.groupby(points["timestamp"] // overview.DAY_MS * overview.DAY_MS)["value"].mean()
+    assert website["daily"]["timestamp"] == daily.index.tolist()
+    assert np.allclose(website["daily"]["avg"], daily.values)
+
+    # Incremental totals equal a scan from scratch
+    overview._totals.clear()
+    assert overview.summarize(out_dir)["website_metrics"] == website
+
+    mobile = tsdb.open_store(os.path.join(out_dir, "mobile_metrics.jsonl")).to_frame()
+    assert np.isclose(summary["mobile_metrics"]["below"]["crash_rate"],
+                      (mobile["crash_rate"] < overview.CRASH_THRESHOLD).mean())
+    with open(os.path.join(out_dir, "synthetic_runs.jsonl")) as f:
+        statuses = [json.loads(line)["status"] for line in f]
+    assert summary["synthetic_runs"] == {s: statuses.count(s) for s in set(statuses)}
+    assert summary["logs"] == {}
+
+def test_lttb_downsampling():
+    """Test that LTTB keeps the budget, the end points and the peaks of every series."""
+    print("Testing LTTB downsampling...")
+    import pandas as pd
+    x = np.arange(5000) * 60_000
+    y = np.sin(np.arange(5000) / 200.0)
+    y[1234], y[4321] = 50.0, -50.0
+    kept = downsample.lttb(x, y, 300)
+    assert len(kept) == 300 and kept[0] == 0 and kept[-1] == 4999
+    assert np.all(np.diff(kept) > 0)
+    assert 1234 in kept and 4321 in kept
+    assert downsample.lttb(x[:50], y[:50], 300).tolist() == list(range(50))
+
+    frame = pd.DataFrame({"id": np.repeat(["a", "b"], 5000),
+                          "timestamp": pd.to_datetime(np.tile(x, 2), unit="ms"),
+                          "value": np.tile(y, 2)})
+    points = downsample.downsample_frame(frame, "timestamp", "value", "id", 300)
+    assert points.groupby("id").size().tolist() == [300, 300]
+    assert points.index.is_monotonic_increasing
+    assert downsample.series_budget(960, 2) == 960
+    assert downsample.series_budget(960, 500) == downsample.MIN_SERIES_POINTS
+
+if __name__ == "__main__":
+    test_walk_clamps_to_bounds()
+    test_floor_walk_matches_stepwise_reference()
+    test_record_wrappers()
+    import tempfile, pathlib
+    with tempfile.TemporaryDirectory() as tmp:
+        test_streaming_write_jsonl(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_sharded_output_matches_single_run(pathlib.Path(tmp))
+    test_scale_profiles()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_append_continues_series(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_columnar_matches_jsonl(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_columnar_tenant_and_append(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_gzip_shards_and_append(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_id_allocator(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_trace_span_trees(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_timeseries_store(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_line_index_queries(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_rollup_tiers(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_event_store(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_retention_compaction(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_snapshot_staging(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_snapshot_segments(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_entity_pages(pathlib.Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_overview_summary(pathlib.Path(tmp))
+    test_lttb_downsampling()
+    print("\nAll generator tests completed.")
@@ -1,68 +1,78 @@
 import json
+import os
+from instana_synthetic import entities, snapshots
+from instana_synthetic.compression import open_dataset
+
+# Validate the published snapshot when there is one
+DATA_DIR = snapshots.data_dir()
 
 # Validate metrics_timeseries.jsonl
 print("Validating metrics_timeseries.jsonl...")
 count = 0
-with open('data/instana/metrics_timeseries.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'metrics_timeseries.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'metrics_timeseries.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/metrics_timeseries.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'metrics_timeseries.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample timeseries keys: {list(sample.keys())}')
         if 'points' in sample:
             print(f'Points count: {len(sample["points"])}')
 
-# Validate infrastructure_entities.jsonl
+# Validate infrastructure_entities.jsonl (streamed one entity at a time)
 print("\nValidating infrastructure_entities.jsonl...")
+entities_file = os.path.join(DATA_DIR, 'infrastructure_entities.jsonl')
+header = entities.read_header(entities_file)
 count = 0
-with open('data/instana/infrastructure_entities.jsonl', 'r') as f:
-    data = json.load(f)
-    count = len(data.get('items', []))
+first_item = None
+for item in entities.iter_entities(entities_file):
+    first_item = first_item or item
+    count += 1
 print(f'infrastructure_entities.jsonl: Valid JSON, item count: {count}')
+if count != header['total_hits']:
+    raise ValueError(f'header total_hits {header["total_hits"]} does not match {count} entities')
 if count > 0:
-    print(f'Sample entity keys: {list(data.keys())}')
-    if data.get('items'):
-        print(f'First item keys: {list(data["items"][0].keys())}')
+    print(f'Header keys: {list(header.keys())}')
+    print(f'First item keys: {list(first_item.keys())}')
 
 # Validate applications.jsonl
 print("\nValidating applications.jsonl...")
 count = 0
-with open('data/instana/applications.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'applications.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'applications.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/applications.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'applications.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample application keys: {list(sample.keys())}')
 
 # Validate endpoints.jsonl
 print("\nValidating endpoints.jsonl...")
 count = 0
-with open('data/instana/endpoints.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'endpoints.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'endpoints.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/endpoints.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'endpoints.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample endpoint keys: {list(sample.keys())}')
 
 # Validate issues.jsonl
 print("\nValidating issues.jsonl...")
 count = 0
-with open('data/instana/issues.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'issues.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'issues.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/issues.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'issues.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample issue keys: {list(sample.keys())}')
 
@@ -70,17 +80,13 @@ if count > 0:
 print("\nCross-file consistency checks...")
 
 # Load entity_ids from infrastructure_entities.jsonl
-entity_ids = set()
-with open('data/instana/infrastructure_entities.jsonl') as f:
-    data = json.load(f)
-    for item in data.get('items', []):
-        entity_ids.add(item['entity_id'])
+entity_ids = set(entities.iter_entity_ids(entities_file))
 
 print(f'Found {len(entity_ids)} unique entity_ids in infrastructure_entities.jsonl')
 
 # Check metrics_timeseries.jsonl entity_ids
 missing_entities = set()
-with open('data/instana/metrics_timeseries.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'metrics_timeseries.jsonl')) as f:
     for line in f:
         data = json.loads(line)
         eid = data.get('entity_id')
@@ -94,7 +100,7 @@ else:
 
 # Check issues.jsonl entity_ids
 missing_entities_issues = set()
-with open('data/instana/issues.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'issues.jsonl')) as f:
     for line in f:
         data = json.loads(line)
         eid = data.get('entity_id')
@@ -109,13 +115,13 @@ else:
 # Validate infra_topology.jsonl
 print("\nValidating infra_topology.jsonl...")
 count = 0
-with open('data/instana/infra_topology.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'infra_topology.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'infra_topology.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/infra_topology.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'infra_topology.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample topology keys: {list(sample.keys())}')
         if 'nodes' in sample:
@@ -126,7 +132,7 @@ if count > 0:
 # Validate app_topology.jsonl
 print("\nValidating app_topology.jsonl...")
 count = 0
-with open('data/instana/app_topology.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'app_topology.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
@@ -135,26 +141,26 @@ print(f'app_topology.jsonl: Valid JSON, count: {count}')
 # Validate alert_configs.jsonl
 print("\nValidating alert_configs.jsonl...")
 count = 0
-with open('data/instana/alert_configs.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'alert_configs.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'alert_configs.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/alert_configs.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'alert_configs.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample alert keys: {list(sample.keys())}')
 
 # Validate metrics_catalog.jsonl
 print("\nValidating metrics_catalog.jsonl...")
 count = 0
-with open('data/instana/metrics_catalog.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'metrics_catalog.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'metrics_catalog.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/metrics_catalog.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'metrics_catalog.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample catalog keys: {list(sample.keys())}')
         if 'metrics' in sample:
@@ -163,13 +169,13 @@ if count > 0:
 # Validate entity_types.jsonl
 print("\nValidating entity_types.jsonl...")
 count = 0
-with open('data/instana/entity_types.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'entity_types.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'entity_types.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/entity_types.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'entity_types.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample types keys: {list(sample.keys())}')
         if 'entity_types' in sample:
@@ -178,7 +184,7 @@ if count > 0:
 # Cross-file consistency for topology
 print("\nCross-file consistency for topology...")
 topo_entity_ids = set()
-with open('data/instana/infra_topology.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'infra_topology.jsonl')) as f:
     for line in f:
         data = json.loads(line)
         for node in data.get('nodes', []):
@@ -192,7 +198,7 @@ else:
 
 # Cross-file consistency for alerts
 alert_entity_ids = set()
-with open('data/instana/alert_configs.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'alert_configs.jsonl')) as f:
     for line in f:
         data = json.loads(line)
         if 'entity_id' in data:
@@ -207,26 +213,26 @@ else:
 # Validate website_config.jsonl
 print("\nValidating website_config.jsonl...")
 count = 0
-with open('data/instana/website_config.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'website_config.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'website_config.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/website_config.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'website_config.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample website config keys: {list(sample.keys())}')
 
 # Validate website_catalog.jsonl
 print("\nValidating website_catalog.jsonl...")
 count = 0
-with open('data/instana/website_catalog.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'website_catalog.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'website_catalog.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/website_catalog.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'website_catalog.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample website catalog keys: {list(sample.keys())}')
         if 'websites' in sample:
@@ -235,13 +241,13 @@ if count > 0:
 # Validate website_metrics.jsonl
 print("\nValidating website_metrics.jsonl...")
 count = 0
-with open('data/instana/website_metrics.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'website_metrics.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'website_metrics.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/website_metrics.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'website_metrics.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample website metrics keys: {list(sample.keys())}')
         if 'points' in sample:
@@ -250,65 +256,65 @@ if count > 0:
 # Validate website_analyze.jsonl
 print("\nValidating website_analyze.jsonl...")
 count = 0
-with open('data/instana/website_analyze.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'website_analyze.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'website_analyze.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/website_analyze.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'website_analyze.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample website analyze keys: {list(sample.keys())}')
 
 # Validate logs.jsonl
 print("\nValidating logs.jsonl...")
 count = 0
-with open('data/instana/logs.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'logs.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'logs.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/logs.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'logs.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample log keys: {list(sample.keys())}')
 
 # Validate synthetic_checks.jsonl
 print("\nValidating synthetic_checks.jsonl...")
 count = 0
-with open('data/instana/synthetic_checks.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'synthetic_checks.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'synthetic_checks.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/synthetic_checks.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'synthetic_checks.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample synthetic check keys: {list(sample.keys())}')
 
 # Validate synthetic_runs.jsonl
 print("\nValidating synthetic_runs.jsonl...")
 count = 0
-with open('data/instana/synthetic_runs.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'synthetic_runs.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'synthetic_runs.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/synthetic_runs.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'synthetic_runs.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample synthetic run keys: {list(sample.keys())}')
 
 # Cross-file consistency for synthetic checks and runs
 print("\nCross-file consistency for synthetic checks and runs...")
 check_ids = set()
-with open('data/instana/synthetic_checks.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'synthetic_checks.jsonl')) as f:
     for line in f:
         data = json.loads(line)
         check_ids.add(data['check_id'])
 
 missing_runs = set()
-with open('data/instana/synthetic_runs.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'synthetic_runs.jsonl')) as f:
     for line in f:
         data = json.loads(line)
         cid = data.get('check_id')
@@ -323,26 +329,26 @@ else:
 # Validate mobile_config.jsonl
 print("\nValidating mobile_config.jsonl...")
 count = 0
-with open('data/instana/mobile_config.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'mobile_config.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'mobile_config.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/mobile_config.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'mobile_config.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample mobile config keys: {list(sample.keys())}')
 
 # Validate mobile_catalog.jsonl
 print("\nValidating mobile_catalog.jsonl...")
 count = 0
-with open('data/instana/mobile_catalog.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'mobile_catalog.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'mobile_catalog.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/mobile_catalog.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'mobile_catalog.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample mobile catalog keys: {list(sample.keys())}')
         if 'mobile_apps' in sample:
@@ -351,13 +357,13 @@ if count > 0:
 # Validate mobile_metrics.jsonl
 print("\nValidating mobile_metrics.jsonl...")
 count = 0
-with open('data/instana/mobile_metrics.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'mobile_metrics.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'mobile_metrics.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/mobile_metrics.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'mobile_metrics.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample mobile metrics keys: {list(sample.keys())}')
         if 'points' in sample:
@@ -366,13 +372,13 @@ if count > 0:
 # Validate mobile_analyze.jsonl
 print("\nValidating mobile_analyze.jsonl...")
 count = 0
-with open('data/instana/mobile_analyze.jsonl') as f:
+with open_dataset(os.path.join(DATA_DIR, 'mobile_analyze.jsonl')) as f:
     for line in f:
         json.loads(line)
         count += 1
 print(f'mobile_analyze.jsonl: Valid JSON, count: {count}')
 if count > 0:
-    with open('data/instana/mobile_analyze.jsonl') as f:
+    with open_dataset(os.path.join(DATA_DIR, 'mobile_analyze.jsonl')) as f:
         sample = json.loads(next(f))
         print(f'Sample mobile analyze keys: {list(sample.keys())}')
 